@@ -0,0 +1,56 @@
+"""
+Benchmark package. Importing it points the app at a throwaway
+SQLite database so benchmarks never touch real data
+"""
+
+import argparse
+import os
+import tempfile
+import time
+
+os.environ.setdefault("TESTING", "true")
+os.environ.setdefault("FLASK_ENV", "testing")
+os.environ.setdefault("FLASK_APP", "src")
+os.environ.setdefault("FLASK_DEBUG", "false")
+os.environ.setdefault("SECRET_KEY", "benchmark")
+os.environ.setdefault("API_VERSION", "1")
+os.environ.setdefault(
+    "DATABASE_URL",
+    f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'bench.db')}"
+)
+
+
+def time_call(func, iterations: int) -> float:
+    """
+    Times <func> over <iterations> calls
+
+    Args:
+        func (callable): zero argument callable
+        iterations (int): number of calls
+
+    Returns:
+        float: mean latency in milliseconds
+    """
+    start = time.perf_counter()
+    for _ in range(iterations):
+        func()
+    return (time.perf_counter() - start) / iterations * 1000
+
+
+def parse_args(description: str, rows: int, iterations: int) -> argparse.Namespace:
+    """
+    Parses the --rows and --iterations options shared by the
+    benchmarks
+
+    Args:
+        description (str): benchmark usage text
+        rows (int): default number of rows
+        iterations (int): default number of timed calls
+
+    Returns:
+        argparse.Namespace: parsed options
+    """
+    parser = argparse.ArgumentParser(description=description)
+    parser.add_argument("--rows", type=int, default=rows)
+    parser.add_argument("--iterations", type=int, default=iterations)
+    return parser.parse_args()
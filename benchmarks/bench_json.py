@@ -0,0 +1,70 @@
+"""
+Benchmarks JSON serialization of model lists through Flask's
+default provider and the app's ModelJSONProvider, with and
+without orjson
+
+Usage:
+    python -m benchmarks.bench_json [--rows N] [--iterations N]
+
+Rows are transient Resource objects so only serialization is
+timed. Throughput is reported in rows per second.
+"""
+
+
+from flask.json.provider import DefaultJSONProvider
+
+from benchmarks import parse_args, time_call
+from src import create_app
+from src import json_provider
+from src.models.resource import Resource
+
+
+def build_rows(rows: int) -> list:
+    """
+    Builds <rows> Resource objects without a database
+
+    Args:
+        rows (int): number of rows
+
+    Returns:
+        list: Resource objects
+    """
+    return [
+        Resource(id=r, cert_id=r % 100 + 1, resource_type="video",
+                 url=f"http://example.com/video/{r}", title=f"Video {r}",
+                 image="i.png", description="An example video " * 8,
+                 site_logo="l.png", site_name="Example", has_og_data=False,
+                 complete=False, created="01/01/2000:00:00:00", updated=None)
+        for r in range(rows)
+    ]
+
+
+def main() -> None:
+    """
+    Runs the benchmark and prints the results
+    """
+    args = parse_args(__doc__, rows=10_000, iterations=10)
+
+    app = create_app()
+    rows = build_rows(args.rows)
+    default = DefaultJSONProvider(app)
+    orjson = json_provider.orjson
+    with app.app_context():
+        results = {"flask default": time_call(lambda: default.response(rows), args.iterations)}
+        json_provider.orjson = None
+        results["model provider (stdlib)"] = time_call(
+            lambda: app.json.response(rows), args.iterations
+        )
+        json_provider.orjson = orjson
+        if orjson is not None:
+            results["model provider (orjson)"] = time_call(
+                lambda: app.json.response(rows), args.iterations
+            )
+
+    print(f"{'provider':<28}{'ms':>10}{'rows/s':>14}")
+    for name, latency in results.items():
+        print(f"{name:<28}{latency:>10.2f}{args.rows / latency * 1000:>14,.0f}")
+
+
+if __name__ == "__main__":
+    main()
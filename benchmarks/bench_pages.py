@@ -0,0 +1,113 @@
+"""
+Benchmarks page latency for the HTML views now that they
+call the service layer in-process, against the sequence of
+loopback API requests the same pages used to make
+
+Usage:
+    python -m benchmarks.bench_pages [--iterations N] [--api-url URL]
+
+The "before" column adds the cost of the removed loopback
+requests to the current in-process page latency.
+
+Without --api-url the loopback requests are dispatched through
+the Flask test client, which measures the JSON encode/decode and
+routing cost but not the TCP round trip. Pass the URL of a running
+instance (e.g. http://127.0.0.1:5000/api/v1) to include it.
+"""
+
+import argparse
+import os
+
+from datetime import datetime
+
+import requests
+
+from benchmarks import time_call
+from src import create_app
+from src.db import db
+from src.models.cert import Cert
+from src.models.resource import Resource
+from src.models.section import Section
+
+RESOURCE_TYPES = ["course", "video", "article", "documentation"]
+
+
+def seed(certs: int, resources: int, sections: int) -> None:
+    """
+    Populates the database with <certs> certs, each with
+    <resources> resources per type and <sections> sections
+    per course
+
+    Args:
+        certs (int): number of certs
+        resources (int): resources per type per cert
+        sections (int): sections per course
+    """
+    now = datetime.now().strftime("%m/%d/%Y:%H:%M:%S")
+    for c in range(1, certs + 1):
+        db.session.add(Cert(
+            id=c, name=f"Cert {c}", code=f"bch-{c}", head_img="h.png",
+            badge_img="b.png", reminder=False, tags="bench", created=now,
+        ))
+        for r_type in RESOURCE_TYPES:
+            for r in range(resources):
+                resource = Resource(
+                    cert_id=c, resource_type=r_type, url=f"http://{c}/{r_type}/{r}",
+                    title=f"{r_type} {c}-{r}", image="i.png", description="bench",
+                    site_logo="l.png", site_name="bench", has_og_data=False,
+                    complete=False, created=now,
+                )
+                db.session.add(resource)
+                db.session.flush()
+                if r_type == "course":
+                    db.session.add_all([
+                        Section(
+                            cert_id=c, resource_id=resource.id, number=n,
+                            title=f"Section {n}", created=now,
+                        ) for n in range(1, sections + 1)
+                    ])
+    db.session.commit()
+
+
+def main() -> None:
+    """
+    Runs the benchmark and prints the results
+    """
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--iterations", type=int, default=50)
+    parser.add_argument("--certs", type=int, default=20)
+    parser.add_argument("--resources", type=int, default=5)
+    parser.add_argument("--sections", type=int, default=20)
+    parser.add_argument("--api-url", default=None)
+    args = parser.parse_args()
+
+    app = create_app()
+    app.config["WTF_CSRF_ENABLED"] = False
+    client = app.test_client()
+    with app.app_context():
+        seed(args.certs, args.resources, args.sections)
+
+    def loopback(path: str) -> None:
+        if args.api_url:
+            requests.get(f"{args.api_url}{path}", timeout=10).json()
+        else:
+            _ = client.get(f"/api/v{os.environ['API_VERSION']}{path}").json
+
+    # the API calls /certs and /certs/data/<id> used to make per page view
+    old_certs = ["/cert"]
+    old_data = ["/cert/1", "/resource", "/section", "/resource",
+                "/resource", "/resource", "/resource"]
+
+    print(f"{'page':<16}{'in-process (ms)':>18}{'loopback (ms)':>16}{'before (ms)':>14}")
+    for page, calls in (("/certs", old_certs), ("/certs/data/1", old_data)):
+        in_process = time_call(lambda p=page: client.get(p), args.iterations)
+        api_cost = time_call(
+            lambda c=calls: [loopback(path) for path in c],
+            args.iterations
+        )
+        before = in_process + api_cost
+        print(f"{page:<16}{in_process:>18.2f}{api_cost:>16.2f}{before:>14.2f}")
+
+
+if __name__ == "__main__":
+    main()
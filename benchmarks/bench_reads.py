@@ -0,0 +1,105 @@
+"""
+Benchmarks the read-only row path used by the list endpoints
+and pages against loading full ORM objects for the same rows
+
+Usage:
+    python -m benchmarks.bench_reads [--rows N] [--iterations N]
+
+For each path the table of Resources is read in full. The
+session is cleared before every read so ORM objects are always
+built from scratch. Latency is reported per row. Allocations
+are the memory blocks still held while the result is alive and
+the peak traced memory during the read, both per row.
+"""
+
+import sys
+import tracemalloc
+
+from datetime import datetime
+
+from sqlalchemy import insert
+
+from benchmarks import parse_args, time_call
+from src import create_app
+from src.db import db
+from src.models.resource import Resource
+from src.services.resource import get_all_resources
+
+
+def seed(rows: int) -> None:
+    """
+    Bulk inserts <rows> Resources on a single Cert
+
+    Args:
+        rows (int): number of rows
+    """
+    now = datetime.now().strftime("%m/%d/%Y:%H:%M:%S")
+    db.session.execute(insert(Resource), [
+        {"cert_id": 1, "resource_type": "article", "url": f"http://example.com/{r}",
+         "title": f"Article {r}", "image": "i.png", "description": "An article " * 8,
+         "site_logo": "l.png", "site_name": "Example", "has_og_data": False,
+         "complete": False, "created": now}
+        for r in range(rows)
+    ])
+    db.session.commit()
+
+
+def load_objects() -> list:
+    """
+    Reads every Resource as an ORM object
+
+    Returns:
+        list: Resource objects
+    """
+    return Resource.query.all()
+
+
+def allocations(func) -> tuple:
+    """
+    Measures the memory blocks held by the result of <func>
+    and the peak memory traced while it runs
+
+    Args:
+        func (callable): zero argument callable
+
+    Returns:
+        tuple: retained block count and peak bytes
+    """
+    db.session.remove()
+    tracemalloc.start()
+    blocks = sys.getallocatedblocks()
+    result = func()
+    retained = sys.getallocatedblocks() - blocks
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del result
+    return retained, peak
+
+
+def main() -> None:
+    """
+    Runs the benchmark and prints the results
+    """
+    args = parse_args(__doc__, rows=10_000, iterations=10)
+
+    app = create_app()
+    paths = {
+        "orm objects": load_objects,
+        "rows": get_all_resources,
+    }
+    print(f"{'path':<14}{'us/row':>10}{'blocks/row':>12}{'peak B/row':>12}")
+    with app.app_context():
+        seed(args.rows)
+        for name, func in paths.items():
+            def read(f=func) -> list:
+                db.session.remove()
+                return f()
+
+            latency = time_call(read, args.iterations) * 1000 / args.rows
+            blocks, peak = allocations(func)
+            print(f"{name:<14}{latency:>10.2f}{blocks / args.rows:>12.1f}"
+                  f"{peak / args.rows:>12.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,141 @@
+"""
+Benchmarks restoring an export against replaying it one row
+at a time through the create services behind the POST routes
+
+Usage:
+    python -m benchmarks.bench_restore [--rows N] [--iterations N]
+
+The export holds 10 Certs, a course for every 100 Sections and
+the Sections themselves, written to a temporary NDJSON file.
+The schema is recreated before every run. The replay is timed on at
+most REPLAY_ROWS Sections as it is far slower. Throughput is
+reported in rows per second.
+"""
+
+import io
+import json
+import os
+import tempfile
+import time
+
+from sqlalchemy import text
+
+from benchmarks import parse_args
+from src import create_app
+from src.db import db
+from src.migrations import upgrade
+from src.models.cert import Cert
+from src.models.resource import Resource
+from src.models.section import Section
+from src.services import section as section_service
+from src.services.restore import restore
+
+REPLAY_ROWS = 2000
+
+
+def write_export(path: str, rows: int) -> int:
+    """
+    Writes an export of <rows> Sections with their Certs and
+    courses to <path>
+
+    Args:
+        path (str): file to write
+        rows (int): number of Sections
+
+    Returns:
+        int: number of records written
+    """
+    courses = max(rows // 100, 1)
+    records = 0
+    with open(path, "w", encoding="utf-8") as file:
+        def write(table: str, data: dict) -> None:
+            nonlocal records
+            file.write(json.dumps({"table": table, "data": data}) + "\n")
+            records += 1
+
+        for c in range(1, 11):
+            write("certs", {"id": c, "name": f"Cert {c}", "code": f"crt-{c}",
+                            "head_img": "h.png", "badge_img": "b.png", "tags": "bench",
+                            "created": "01/01/2000"})
+        for r in range(1, courses + 1):
+            write("resources", {"id": r, "cert_id": r % 10 + 1, "resource_type": "course",
+                                "url": f"http://example.com/{r}", "title": f"Course {r}",
+                                "image": "i.png", "description": "A course", "site_logo": "l.png",
+                                "site_name": "Example", "created": "01/01/2000"})
+        for s in range(1, rows + 1):
+            r = s % courses + 1
+            write("sections", {"id": s, "cert_id": r % 10 + 1, "resource_id": r,
+                               "number": s, "title": f"Lecture {s}", "complete": False,
+                               "cards_made": False, "created": "01/01/2000"})
+    return records
+
+
+def reset() -> None:
+    """
+    Recreates the schema so every run restores into a new
+    database. Deleting the rows instead would leave the search
+    indexes much slower to insert into than they are on a
+    fresh instance
+    """
+    for model in (Cert, Resource, Section):
+        db.session.execute(text(f"DROP TABLE IF EXISTS {model.__tablename__}_fts"))
+    db.session.commit()
+    db.drop_all()
+    db.create_all()
+    upgrade()
+
+
+def replay(path: str) -> int:
+    """
+    Restores the Certs and courses of the export, then creates
+    up to REPLAY_ROWS of its Sections one at a time through the
+    section service. The parents are restored into empty tables,
+    so they keep their exported IDs
+
+    Args:
+        path (str): export file
+
+    Returns:
+        int: number of Sections created
+    """
+    parents = []
+    sections = []
+    with open(path, encoding="utf-8") as file:
+        for line in file:
+            if '"table": "sections"' not in line:
+                parents.append(line)
+            elif len(sections) < REPLAY_ROWS:
+                sections.append(json.loads(line)["data"])
+    restore(io.StringIO("".join(parents)))
+    for section in sections:
+        section_service.create_section(section)
+    return len(sections)
+
+
+def main() -> None:
+    """
+    Runs the benchmark and prints the results
+    """
+    args = parse_args(__doc__, rows=100_000, iterations=3)
+
+    app = create_app()
+    path = os.path.join(tempfile.mkdtemp(), "export.ndjson")
+    records = write_export(path, args.rows)
+    print(f"{'path':<10}{'rows':>10}{'seconds':>10}{'rows/s':>12}")
+    with app.app_context():
+        for _ in range(args.iterations):
+            reset()
+            start = time.perf_counter()
+            with open(path, encoding="utf-8") as file:
+                restore(file)
+            elapsed = time.perf_counter() - start
+            print(f"{'restore':<10}{records:>10}{elapsed:>10.2f}{records / elapsed:>12.0f}")
+        reset()
+        start = time.perf_counter()
+        count = replay(path)
+        elapsed = time.perf_counter() - start
+        print(f"{'replay':<10}{count:>10}{elapsed:>10.2f}{count / elapsed:>12.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+"""
+Benchmarks library search latency against a large number
+of resources and sections
+
+Usage:
+    python -m benchmarks.bench_search [--rows N] [--iterations N]
+
+Half of the rows are resources spread over 100 certs and the
+other half are course sections. Each query is timed through the
+search service and through the API endpoint.
+"""
+
+import os
+
+from datetime import datetime
+
+from sqlalchemy import insert
+
+from benchmarks import parse_args, time_call
+from src import create_app
+from src.db import db
+from src.models.cert import Cert
+from src.models.resource import Resource
+from src.models.section import Section
+from src.services.search import search_library
+
+CERTS = 100
+WORDS = ["network", "security", "cloud", "linux", "python", "storage", "identity"]
+QUERIES = ["security", "cloud lin", "python 42", "example.com/video", "zzz"]
+
+
+def seed(rows: int) -> None:
+    """
+    Bulk inserts <rows> resources and sections
+
+    Args:
+        rows (int): total number of rows
+    """
+    now = datetime.now().strftime("%m/%d/%Y:%H:%M:%S")
+    db.session.execute(insert(Cert), [
+        {"id": c, "name": f"Cert {c}", "code": f"bch-{c}", "head_img": "h.png",
+         "badge_img": "b.png", "reminder": False, "tags": "bench", "created": now}
+        for c in range(1, CERTS + 1)
+    ])
+    half = rows // 2
+    db.session.execute(insert(Resource), [
+        {"cert_id": r % CERTS + 1, "resource_type": "video",
+         "url": f"http://example.com/video/{r}",
+         "title": f"{WORDS[r % len(WORDS)]} {WORDS[r // 7 % len(WORDS)]} {r}",
+         "image": "i.png", "description": f"about {WORDS[r // 3 % len(WORDS)]}",
+         "site_logo": "l.png", "site_name": "Example", "has_og_data": False,
+         "complete": False, "created": now}
+        for r in range(half)
+    ])
+    db.session.execute(insert(Section), [
+        {"cert_id": s % CERTS + 1, "resource_id": s % half + 1, "number": s,
+         "title": f"{WORDS[s % len(WORDS)]} section {s}", "created": now}
+        for s in range(half)
+    ])
+    db.session.commit()
+
+
+def main() -> None:
+    """
+    Runs the benchmark and prints the results
+    """
+    args = parse_args(__doc__, rows=100_000, iterations=20)
+
+    app = create_app()
+    client = app.test_client()
+    with app.app_context():
+        seed(args.rows)
+
+    print(f"{'query':<20}{'service (ms)':>14}{'api (ms)':>10}")
+    for query in QUERIES:
+        with app.app_context():
+            service = time_call(lambda q=query: search_library(q), args.iterations)
+        api = time_call(
+            lambda q=query: client.get(f"/api/v{os.environ['API_VERSION']}/search?q={q}"),
+            args.iterations
+        )
+        print(f"{query:<20}{service:>14.2f}{api:>10.2f}")
+
+
+if __name__ == "__main__":
+    main()
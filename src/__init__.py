@@ -4,15 +4,19 @@ Flask main module
 
 from flask import Flask, Response
 
+from src.compression import compress_response
 from src.config import Config
 from src.api import api_bp
 from src.core.views import core_bp
 from src.data.views import data_bp
 from src.errors.handlers import error_bp
 from src.certs.views import cert_bp
+from src.cli import export_command, restore_command
 from src.content.views import content_bp
 
 from src.db import db
+from src.json_provider import ModelJSONProvider
+from src.migrations import upgrade
 
 
 def create_app() -> Flask:
@@ -24,6 +28,7 @@ def create_app() -> Flask:
         Flask: Flask app instance
     """
     application = Flask(__name__)
+    application.json = ModelJSONProvider(application)
     app_config = Config()
     application.config.from_object(app_config)
     application.config["SQLALCHEMY_TRACK_MODIFICATIONS"] = False
@@ -36,10 +41,15 @@ def create_app() -> Flask:
     application.register_blueprint(cert_bp)
     application.register_blueprint(content_bp)
 
+    # register CLI commands
+    application.cli.add_command(export_command)
+    application.cli.add_command(restore_command)
+
     # create DB tables
     with application.app_context():
         db.init_app(application)
         db.create_all()
+        upgrade()
 
     # additional security headers in responses
     @application.after_request
@@ -66,4 +76,7 @@ def create_app() -> Flask:
         response.headers['X-Frame-Options'] = 'SAMEORIGIN'
         return response
 
+    # compress responses, run before the security headers are added
+    application.after_request(compress_response)
+
     return application
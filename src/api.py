@@ -4,14 +4,16 @@ Module defining an API for all CRUD operations
 
 import os
 
-from datetime import datetime
+from flask import Blueprint, current_app, jsonify, Response, request, stream_with_context
+from werkzeug.exceptions import HTTPException
 
-from flask import Blueprint, jsonify, Response, request
-
-from src.db import db
-from src.models.cert import Cert
-from src.models.resource import Resource
-from src.models.section import Section
+from src.services import batch as batch_service
+from src.services import cert as cert_service
+from src.services import export as export_service
+from src.services import resource as resource_service
+from src.services import search as search_service
+from src.services import section as section_service
+from src.util.conditional import conditional
 
 api_bp = Blueprint(
     name="api",
@@ -20,24 +22,142 @@ api_bp = Blueprint(
 )
 
 
+def to_bool(value: str) -> bool:
+    """
+    Converts a query string flag to a bool
+
+    Args:
+        value (str): query string value
+
+    Raises:
+        ValueError: if the value is not a recognised flag
+
+    Returns:
+        bool: parsed flag
+    """
+    if value.lower() in ("true", "1"):
+        return True
+    if value.lower() in ("false", "0"):
+        return False
+    raise ValueError(value)
+
+
+RESOURCE_FILTERS = {
+    "cert_id": int,
+    "resource_type": str,
+    "complete": to_bool,
+    "has_og_data": to_bool,
+}
+
+SECTION_FILTERS = {
+    "cert_id": int,
+    "resource_id": int,
+    "complete": to_bool,
+    "cards_made": to_bool,
+}
+
+
+def filter_args(fields: dict) -> dict:
+    """
+    Reads the filters named in <fields> from the request
+    query string and converts each value
+
+    Args:
+        fields (dict): mapping of filter name to converter
+
+    Raises:
+        ValueError: if a filter value cannot be converted
+
+    Returns:
+        dict: mapping of filter name to converted value
+    """
+    filters = {}
+    for field, convert in fields.items():
+        if field in request.args:
+            try:
+                filters[field] = convert(request.args[field])
+            except ValueError as e:
+                raise ValueError(f"Invalid value for '{field}'") from e
+    return filters
+
+
+def field_args() -> list:
+    """
+    Reads the comma separated column names sent as 'fields'
+    to return only those columns of each row
+
+    Returns:
+        list: column names or None if 'fields' was not sent
+    """
+    if "fields" not in request.args:
+        return None
+    return [f.strip() for f in request.args["fields"].split(",") if f.strip()]
+
+
+def is_paginated() -> bool:
+    """
+    Checks if the request asks for a paginated list. Clients
+    that send neither 'limit' nor 'after' get the full list
+
+    Returns:
+        bool: True if pagination parameters were sent
+    """
+    return "limit" in request.args or "after" in request.args
+
+
+def page_args() -> dict:
+    """
+    Reads the keyset pagination parameters from the request
+
+    Raises:
+        ValueError: if 'limit' or 'after' is not a positive integer
+
+    Returns:
+        dict: 'limit' and 'after' values, None for those not sent
+    """
+    page = {"limit": None, "after": None}
+    for field in page:
+        if field in request.args:
+            try:
+                page[field] = int(request.args[field])
+            except ValueError as e:
+                raise ValueError(f"Invalid value for '{field}'") from e
+            if page[field] < 1:
+                raise ValueError(f"Invalid value for '{field}'")
+    return page
+
+
 # =============== Cert CRUD Ops ===============
 
 @api_bp.route("/cert")
+@conditional("certs")
 def get_all_certs() -> Response:
     """
-    Gets all Certs from the database
+    Gets all Certs from the database. Sending 'limit'
+    and/or 'after' returns a single page of Certs along
+    with a 'next' cursor to pass as 'after'. Sending
+    'fields' returns only those columns
 
     Returns:
         Response: Flask Response object
     """
-    certs = Cert.query.all()
-    return jsonify(certs)
+    try:
+        if is_paginated():
+            return jsonify(cert_service.get_certs_page(**page_args(), fields=field_args()))
+        return jsonify(cert_service.get_all_certs(field_args()))
+    except ValueError as e:
+        return jsonify({
+            "message": str(e),
+            "status": 400,
+        })
 
 
 @api_bp.route("/cert/<int:cert_id>")
+@conditional("certs")
 def get_cert(cert_id: int) -> Response:
     """
-    Gets a Cert from the database by ID
+    Gets a Cert from the database by ID. Sending
+    'fields' returns only those columns
 
     Args:
         int (cert_id): id of resource
@@ -45,8 +165,36 @@ def get_cert(cert_id: int) -> Response:
     Returns:
         Response: Flask Response object
     """
-    cert = Cert.query.filter_by(id=cert_id).first()
-    return jsonify(cert)
+    try:
+        return jsonify(cert_service.get_cert_record(cert_id, field_args()))
+    except ValueError as e:
+        return jsonify({
+            "message": str(e),
+            "status": 400,
+        })
+
+
+@api_bp.route("/cert/<int:cert_id>/bundle")
+@conditional("certs", "resources", "sections")
+def get_cert_bundle(cert_id: int) -> Response:
+    """
+    Gets a Cert along with its Resources grouped by
+    type, its Sections and the Resources available
+    for import
+
+    Args:
+        int (cert_id): id of cert
+
+    Returns:
+        Response: Flask Response object
+    """
+    bundle = cert_service.get_cert_bundle(cert_id)
+    if not bundle:
+        return jsonify({
+            "message": "Cert not found",
+            "status": 404,
+        })
+    return jsonify(bundle)
 
 
 @api_bp.route("/cert", methods=["POST"])
@@ -58,23 +206,7 @@ def post_cert() -> Response:
     Returns:
         Response: Flask Response object
     """
-    data = request.get_json()
-    cert = Cert(
-        name=data["name"],
-        code=data["code"],
-        head_img=data["head_img"],
-        badge_img=data["badge_img"],
-        exam_date=None,
-        reminder=False,
-        tags=data["tags"],
-        created=datetime.now().strftime("%d/%m/%Y"),
-    )
-    db.session.add(cert)
-    db.session.commit()
-    return jsonify({
-        "message": "Cert created successfully",
-        "status": 200,
-    })
+    return jsonify(cert_service.create_cert(request.get_json()))
 
 
 @api_bp.route("/cert/<int:cert_id>", methods=["PUT"])
@@ -89,30 +221,21 @@ def put_cert(cert_id: int) -> Response:
     Returns:
         Response: Flask Response object
     """
-    cert = Cert.query.filter_by(id=cert_id).first()
-    if not cert:
-        return jsonify({
-            "message": "Cert not found",
-            "status": 404,
-        })
-    data = request.get_json()
-    cert.name = data["name"]
-    cert.code = data["code"]
-    if data.get("head_img"):
-        cert.head_img = data["head_img"]
-    if data.get("badge_img"):
-        cert.badge_img = data["badge_img"]
-    if data.get("exam_date") is not None:
-        cert.exam_date = data["exam_date"]
-    if data.get("reminder") is not None:
-        cert.reminder = data["reminder"]
-    cert.tags = data["tags"]
-    db.session.add(cert)
-    db.session.commit()
-    return jsonify({
-        "message": "Cert updated successfully",
-        "status": 200,
-    })
+    return jsonify(cert_service.update_cert(cert_id, request.get_json()))
+
+
+@api_bp.route("/cert/<int:cert_id>", methods=["PATCH"])
+def patch_cert(cert_id: int) -> Response:
+    """
+    Updates only the Cert fields sent in the JSON body
+
+    Args:
+        int (cert_id): id of cert
+
+    Returns:
+        Response: Flask Response object
+    """
+    return jsonify(cert_service.patch_cert(cert_id, request.get_json()))
 
 
 @api_bp.route("/cert/<int:cert_id>", methods=["DELETE"])
@@ -126,38 +249,46 @@ def delete_cert(cert_id: int) -> Response:
     Returns:
         Response: Flask Response object
     """
-    cert = Cert.query.filter_by(id=cert_id).first()
-    if not cert:
-        return jsonify({
-            "message": "Cert not found",
-            "status": 404,
-        })
-    Cert.query.filter_by(id=cert_id).delete()
-    db.session.commit()
-    return jsonify({
-        "message": "Cert deleted successfully",
-        "status": 200
-    })
+    return jsonify(cert_service.delete_cert(cert_id))
 
 
 # =============== Resource CRUD Ops ===============
 
 @api_bp.route("/resource")
+@conditional("resources")
 def get_all_resources() -> Response:
     """
-    Gets all Resources from the database
+    Gets all Resources from the database. Sending 'limit'
+    and/or 'after' returns a single page of Resources along
+    with a 'next' cursor to pass as 'after'. Any of the
+    names in RESOURCE_FILTERS can be sent to filter the results
+    and sending 'fields' returns only those columns
 
     Returns:
         Response: Flask Response object
     """
-    resources = Resource.query.all()
-    return jsonify(resources)
+    try:
+        filters = filter_args(RESOURCE_FILTERS)
+        if is_paginated():
+            return jsonify(resource_service.get_resources_page(
+                **page_args(),
+                filters=filters,
+                fields=field_args()
+            ))
+        return jsonify(resource_service.get_all_resources(filters, field_args()))
+    except ValueError as e:
+        return jsonify({
+            "message": str(e),
+            "status": 400,
+        })
 
 
 @api_bp.route("/resource/<int:resource_id>")
+@conditional("resources")
 def get_resource(resource_id: int) -> Response:
     """
-    Gets a Resource from the database by ID
+    Gets a Resource from the database by ID. Sending
+    'fields' returns only those columns
 
     Args:
         int (resource_id): id of resource
@@ -165,8 +296,13 @@ def get_resource(resource_id: int) -> Response:
     Returns:
         Response: Flask Response object
     """
-    resource = Resource.query.filter_by(id=resource_id).first()
-    return jsonify(resource)
+    try:
+        return jsonify(resource_service.get_resource_record(resource_id, field_args()))
+    except ValueError as e:
+        return jsonify({
+            "message": str(e),
+            "status": 400,
+        })
 
 
 @api_bp.route("/resource", methods=["POST"])
@@ -174,32 +310,23 @@ def post_resource() -> Response:
     """
     Creates a Resource
 
+    Returns:
+        Response: Flask Response object
+    """
+    return jsonify(resource_service.create_resource(request.get_json()))
+
+
+@api_bp.route("/resource/import", methods=["POST"])
+def import_resources() -> Response:
+    """
+    Copies existing Resources into a Cert. Expects JSON
+    with a 'cert_id' and a list of 'resource_ids'
+
     Returns:
         Response: Flask Response object
     """
     data = request.get_json()
-    # add default images if none provided
-    image = data["image"] if data.get("image") else "default_image.jpg"
-    logo = data["site_logo"] if data.get("site_logo") else "default_logo.png"
-    resource = Resource(
-        cert_id=data["cert_id"],
-        resource_type=data["resource_type"],
-        url=data["url"],
-        title=data["title"],
-        image=image,
-        description=data["description"],
-        site_logo=logo,
-        site_name=data["site_name"],
-        has_og_data=data["has_og_data"],
-        complete=data["complete"],
-        created=datetime.now().strftime("%m/%d/%Y:%H:%M:%S"),
-    )
-    db.session.add(resource)
-    db.session.commit()
-    return jsonify({
-        "message": "Resource created successfully",
-        "status": 200,
-    })
+    return jsonify(resource_service.import_resources(data["cert_id"], data["resource_ids"]))
 
 
 @api_bp.route("/resource/<int:resource_id>", methods=["PUT"])
@@ -213,30 +340,21 @@ def put_resource(resource_id: int) -> Response:
     Returns:
         Response: Flask Response object
     """
-    data = request.get_json()
-    resource = Resource.query.filter_by(id=resource_id).first()
-    if not resource:
-        return jsonify({
-            "message": "Resource not found",
-            "status": 404,
-        })
-    # add default images if none provided
-    image = data["image"] if data.get("image") else "default_image.jpg"
-    logo = data["site_logo"] if data.get("site_logo") else "default_logo.png"
-    resource.resource_type = data["resource_type"]
-    resource.url = data["url"]
-    resource.title = data["title"]
-    resource.image = image
-    resource.description = data["description"]
-    resource.site_logo = logo
-    resource.site_name = data["site_name"]
-    resource.complete = data["complete"]
-    resource.updated = datetime.now().strftime("%m/%d/%Y:%H:%M:%S")
-    db.session.commit()
-    return jsonify({
-        "message": "Resource updated successfully",
-        "status": 200,
-    })
+    return jsonify(resource_service.update_resource(resource_id, request.get_json()))
+
+
+@api_bp.route("/resource/<int:resource_id>", methods=["PATCH"])
+def patch_resource(resource_id: int) -> Response:
+    """
+    Updates only the Resource fields sent in the JSON body
+
+    Args:
+        int (resource_id): id of resource
+
+    Returns:
+        Response: Flask Response object
+    """
+    return jsonify(resource_service.patch_resource(resource_id, request.get_json()))
 
 
 @api_bp.route("/resource/<int:resource_id>", methods=["DELETE"])
@@ -250,37 +368,46 @@ def delete_resource(resource_id: int) -> Response:
     Returns:
         Response: Flask Response object
     """
-    deletions = Resource.query.filter_by(id=resource_id).delete()
-    if deletions > 0:
-        db.session.commit()
-        return jsonify({
-            "message": "Resource deleted successfully",
-            "status": 200
-        })
-    return jsonify({
-        "message": "Resource not found",
-        "status": 404,
-    })
+    return jsonify(resource_service.delete_resource(resource_id))
 
 
 # =============== Section CRUD Ops ===============
 
 @api_bp.route("/section")
+@conditional("sections")
 def get_all_sections() -> Response:
     """
-    Gets all Sections from the database
+    Gets all Sections from the database. Sending 'limit'
+    and/or 'after' returns a single page of Sections along
+    with a 'next' cursor to pass as 'after'. Any of the
+    names in SECTION_FILTERS can be sent to filter the results
+    and sending 'fields' returns only those columns
 
     Returns:
         Response: Flask Response object
     """
-    sections = Section.query.all()
-    return jsonify(sections)
+    try:
+        filters = filter_args(SECTION_FILTERS)
+        if is_paginated():
+            return jsonify(section_service.get_sections_page(
+                **page_args(),
+                filters=filters,
+                fields=field_args()
+            ))
+        return jsonify(section_service.get_all_sections(filters, field_args()))
+    except ValueError as e:
+        return jsonify({
+            "message": str(e),
+            "status": 400,
+        })
 
 
 @api_bp.route("/section/<int:section_id>")
+@conditional("sections")
 def get_section(section_id: int) -> Response:
     """
-    Gets a Section from the database by ID
+    Gets a Section from the database by ID. Sending
+    'fields' returns only those columns
 
     Args:
         int (section_id): id of resource
@@ -288,8 +415,13 @@ def get_section(section_id: int) -> Response:
     Returns:
         Response: Flask Response object
     """
-    section = Section.query.filter_by(id=section_id).first()
-    return jsonify(section)
+    try:
+        return jsonify(section_service.get_section_record(section_id, field_args()))
+    except ValueError as e:
+        return jsonify({
+            "message": str(e),
+            "status": 400,
+        })
 
 
 @api_bp.route("/section", methods=["POST"])
@@ -297,23 +429,43 @@ def post_section() -> Response:
     """
     Creates a Section
 
+    Returns:
+        Response: Flask Response object
+    """
+    return jsonify(section_service.create_section(request.get_json()))
+
+
+@api_bp.route("/section/bulk", methods=["POST"])
+def post_sections() -> Response:
+    """
+    Creates many Sections on a course in one transaction.
+    Expects JSON with a 'cert_id', a 'resource_id' and a
+    list of 'sections', each with a 'number' and 'title'.
+    Nothing is created if any row fails validation and the
+    errors are returned by row
+
     Returns:
         Response: Flask Response object
     """
     data = request.get_json()
-    section = Section(
-        cert_id=data["cert_id"],
-        resource_id=data["resource_id"],
-        number=data["number"],
-        title=data["title"],
-        created=datetime.now().strftime("%m/%d/%Y:%H:%M:%S"),
-    )
-    db.session.add(section)
-    db.session.commit()
-    return jsonify({
-        "message": "Section created successfully",
-        "status": 200,
-    })
+    return jsonify(section_service.create_sections(
+        data["cert_id"],
+        data["resource_id"],
+        data.get("sections")
+    ))
+
+
+@api_bp.route("/section/progress", methods=["POST"])
+def post_section_progress() -> Response:
+    """
+    Applies many Section progress updates in one statement.
+    Expects JSON with a list of 'sections', each with a
+    'section_id' and the 'complete' and/or 'cards_made' flags
+
+    Returns:
+        Response: Flask Response object
+    """
+    return jsonify(section_service.update_progress(request.get_json().get("sections")))
 
 
 @api_bp.route("/section/<int:section_id>", methods=["PUT"])
@@ -327,23 +479,21 @@ def put_section(section_id: int) -> Response:
     Returns:
         Response: Flask Response object
     """
-    data = request.get_json()
-    section = Section.query.filter_by(id=section_id).first()
-    if not section:
-        return jsonify({
-            "message": "Section not found",
-            "status": 404,
-        })
-    section.number = data["number"]
-    section.title = data["title"]
-    section.cards_made = data["cards_made"]
-    section.complete = data["complete"]
-    section.updated = datetime.now().strftime("%m/%d/%Y:%H:%M:%S")
-    db.session.commit()
-    return jsonify({
-        "message": "Section updated successfully",
-        "status": 200,
-    })
+    return jsonify(section_service.update_section(section_id, request.get_json()))
+
+
+@api_bp.route("/section/<int:section_id>", methods=["PATCH"])
+def patch_section(section_id: int) -> Response:
+    """
+    Updates only the Section fields sent in the JSON body
+
+    Args:
+        int (section_id): id of section
+
+    Returns:
+        Response: Flask Response object
+    """
+    return jsonify(section_service.patch_section(section_id, request.get_json()))
 
 
 @api_bp.route("/section/<int:section_id>", methods=["DELETE"])
@@ -357,14 +507,137 @@ def delete_section(section_id: int) -> Response:
     Returns:
         Response: Flask Response object
     """
-    deletions = Section.query.filter_by(id=section_id).delete()
-    if deletions > 0:
-        db.session.commit()
+    return jsonify(section_service.delete_section(section_id))
+
+
+# =============== Search ===============
+
+@api_bp.route("/search")
+@conditional("resources", "sections")
+def search() -> Response:
+    """
+    Searches Resources by title, description, site name
+    or URL and Sections by title across all Certs. The
+    search term is sent as 'q' and 'limit' caps the number
+    of hits of each kind
+
+    Returns:
+        Response: Flask Response object
+    """
+    query = request.args.get("q", "").strip()
+    if not query:
+        return jsonify({
+            "message": "Missing search term 'q'",
+            "status": 400,
+        })
+    limit = request.args.get("limit", search_service.SEARCH_LIMIT, type=int)
+    limit = min(max(limit, 1), search_service.MAX_SEARCH_LIMIT)
+    return jsonify(search_service.search_library(query, limit))
+
+
+# =============== Batch ===============
+
+def execute_operation(method: str, path: str, body: object) -> tuple:
+    """
+    Runs a single batch operation through the API route
+    matching <method> and <path> as if it were its own request.
+    HTTP errors and invalid bodies raised by the route are
+    returned as a failed result, so the batch reports which
+    operation failed and rolls back
+
+    Args:
+        method (str): HTTP method
+        path (str): path relative to the API root
+        body (object): JSON body or None
+
+    Returns:
+        tuple: HTTP status code and JSON result
+    """
+    with current_app.test_request_context(
+        f"{api_bp.url_prefix}{path}",
+        method=method,
+        json=body
+    ):
+        if request.routing_exception is not None:
+            error = request.routing_exception
+            return error.code, {
+                "message": error.name,
+                "status": error.code,
+            }
+        if not request.endpoint.startswith(f"{api_bp.name}.") or \
+                request.endpoint == f"{api_bp.name}.batch":
+            return 400, {
+                "message": "Operation not allowed in a batch",
+                "status": 400,
+            }
+        try:
+            response = current_app.make_response(current_app.dispatch_request())
+        except HTTPException as e:
+            return e.code, {
+                "message": e.name,
+                "status": e.code,
+            }
+        except KeyError as e:
+            return 400, {
+                "message": f"Missing field: {e.args[0]}",
+                "status": 400,
+            }
+        except (ValueError, TypeError) as e:
+            return 400, {
+                "message": f"Invalid body: {e}",
+                "status": 400,
+            }
+        return response.status_code, response.get_json()
+
+
+@api_bp.route("/batch", methods=["POST"])
+def batch() -> Response:
+    """
+    Runs a list of API operations in order in a single
+    transaction. Expects JSON with a list of 'operations',
+    each with a 'method', a 'path' relative to the API root
+    and an optional 'body'. Values returned by earlier
+    operations are referenced as "$<index>.<key>", e.g.
+    {"resource_id": "$0.id"}. Nothing is saved if any
+    operation fails
+
+    Returns:
+        Response: Flask Response object
+    """
+    data = request.get_json()
+    return jsonify(batch_service.run_batch(data.get("operations"), execute_operation))
+
+
+# =============== Export ===============
+
+@api_bp.route("/export")
+def export() -> Response:
+    """
+    Streams every Cert, Resource and Section as NDJSON, one
+    row per line. Sending 'gzip=true' downloads the export
+    as a gzip file
+
+    Returns:
+        Response: Flask Response object
+    """
+    try:
+        compress = to_bool(request.args.get("gzip", "false"))
+    except ValueError:
         return jsonify({
-            "message": "Section deleted successfully",
-            "status": 200
+            "message": "Invalid value for 'gzip'",
+            "status": 400,
         })
-    return jsonify({
-        "message": "Section not found",
-        "status": 404,
-    })
+    if compress:
+        response = Response(
+            stream_with_context(export_service.export_gzip()),
+            mimetype="application/gzip"
+        )
+        filename = "export.ndjson.gz"
+    else:
+        response = Response(
+            stream_with_context(export_service.export_lines()),
+            mimetype="application/x-ndjson"
+        )
+        filename = "export.ndjson"
+    response.headers["Content-Disposition"] = f"attachment; filename={filename}"
+    return response
@@ -2,25 +2,35 @@
 Post app views module
 """
 
-import os
-
-import requests
-
 from flask import Blueprint, redirect, render_template, Response, request, url_for
 
 from src.content.forms import CertForm
 from src.models.cert import Cert
 
+from src.services import cert as cert_service
+from src.services import search as search_service
+from src.util.conditional import conditional
+
 cert_bp = Blueprint(
     "certs",
     __name__,
     template_folder="templates"
 )
 
-API_URL = f"http://127.0.0.1:5000/api/v{os.environ["API_VERSION"]}"
+RESULTS_PER_PAGE = 20
+
+# library headings for each type of hit
+TYPE_LABELS = {
+    "course": "Courses",
+    "video": "Videos",
+    "article": "Articles",
+    "documentation": "Documentation",
+    "section": "Sections",
+}
 
 
 @cert_bp.route("/certs")
+@conditional("certs", page=True)
 def certs() -> Response:
     """
     Returns the certs template with data
@@ -30,8 +40,7 @@ def certs() -> Response:
         Response: app response object
     """
     form = CertForm()
-    response = requests.get(f"{API_URL}/cert", timeout=2)
-    data = response.json()
+    data = cert_service.get_all_certs()
     return render_template("certs.html", certs=data, form=form, title="CT: Certs")
 
 
@@ -48,6 +57,8 @@ def search() -> Response:
         if not params:
             message = "Please provide a term to search for"
             return render_template("search.html", message=message, title="CT: Search")
+        if request.form.get("scope") == "library":
+            return redirect(url_for("certs.library", search=params), code=307)
         return redirect(url_for("certs.results", search=params), code=307)
     return render_template("search.html", title="CT: Search")
 
@@ -55,7 +66,8 @@ def search() -> Response:
 @cert_bp.route("/results", methods=["GET", "POST"])
 def results() -> Response:
     """
-    Returns the results template
+    Returns the results template with a page of ranked
+    search results
 
     Args:
         result (list): list of search results
@@ -63,13 +75,43 @@ def results() -> Response:
         Response: app response object
     """
     form = CertForm()
-    if request.method == "POST":
-        query = request.args.get("search")
-        result = Cert.find(query)
+    query = request.args.get("search")
+    if request.method == "POST" or query:
+        page = max(request.args.get("page", 1, type=int), 1)
+        # fetch one extra result to find out if another page exists
+        result = Cert.find(
+            query,
+            limit=RESULTS_PER_PAGE + 1,
+            offset=(page - 1) * RESULTS_PER_PAGE
+        )
         return render_template(
             "results.html",
             query=query,
-            certs=result,
+            certs=result[:RESULTS_PER_PAGE],
+            page=page,
+            has_next=len(result) > RESULTS_PER_PAGE,
             form=form,
             title="CT: Results")
     return render_template("search.html", title="CT: Search")
+
+
+@cert_bp.route("/library", methods=["GET", "POST"])
+def library() -> Response:
+    """
+    Returns the library template with the Resources and
+    Sections matching the search term, grouped by type
+    and cert
+
+    Returns:
+        Response: app response object
+    """
+    query = request.args.get("search")
+    if not query:
+        return render_template("search.html", title="CT: Search")
+    hits = search_service.search_library(query)
+    return render_template(
+        "library.html",
+        query=query,
+        **search_service.group_hits(hits),
+        labels=TYPE_LABELS,
+        title="CT: Library")
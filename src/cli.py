@@ -0,0 +1,84 @@
+"""
+Module defining the app's flask CLI commands
+"""
+
+import gzip
+import os
+import sys
+
+import click
+
+from flask.cli import with_appcontext
+
+from src.services import export as export_service
+from src.services import restore as restore_service
+
+
+@click.command("export")
+@click.option("--output", "-o", type=click.Path(dir_okay=False), default=None,
+              help="File to write to instead of stdout.")
+@click.option("--gzip", "compress", is_flag=True, help="Compress the export with gzip.")
+@with_appcontext
+def export_command(output: str, compress: bool) -> None:
+    """
+    Exports every Cert, Resource and Section as NDJSON
+    \f
+    Args:
+        output (str): path of the file to write or None for stdout
+        compress (bool): True to write a gzip file
+    """
+    if compress:
+        chunks = export_service.export_gzip()
+    else:
+        chunks = (line.encode() for line in export_service.export_lines())
+    if output is None:
+        for chunk in chunks:
+            sys.stdout.buffer.write(chunk)
+        sys.stdout.buffer.flush()
+        return
+    with open(output, "wb") as file:
+        for chunk in chunks:
+            file.write(chunk)
+
+
+@click.command("restore")
+@click.argument("path", type=click.Path(exists=True, dir_okay=False))
+@click.option("--checkpoint", type=click.Path(dir_okay=False), default=None,
+              help="File recording progress, to resume an interrupted restore.")
+@click.option("--batch-size", type=click.IntRange(min=1),
+              default=restore_service.RESTORE_BATCH_SIZE, help="Records written per batch.")
+@with_appcontext
+def restore_command(path: str, checkpoint: str, batch_size: int) -> None:
+    """
+    Restores an NDJSON or JSON export, optionally gzipped
+    \f
+    Args:
+        path (str): path of the export
+        checkpoint (str): path of the progress file or None
+        batch_size (int): records written per batch
+    """
+    start = 0
+    if checkpoint and os.path.exists(checkpoint):
+        with open(checkpoint, encoding="utf-8") as file:
+            start = int(file.read().strip() or 0)
+        click.echo(f"Resuming after {start} records", err=True)
+
+    def progress(done: int, counts: dict) -> None:
+        if checkpoint:
+            with open(checkpoint, "w", encoding="utf-8") as file:
+                file.write(str(done))
+        restored = sum(counts["restored"].values())
+        click.echo(f"{done} records done, {restored} rows restored", err=True)
+
+    with open(path, "rb") as file:
+        compressed = file.read(2) == b"\x1f\x8b"
+    opener = gzip.open if compressed else open
+    with opener(path, "rt", encoding="utf-8") as file:
+        result = restore_service.restore(file, start, progress, batch_size)
+    for error in result.get("errors", []):
+        click.echo(f"Line {error['line']}: {error['message']}", err=True)
+    click.echo(result["message"], err=True)
+    if result["status"] != 200:
+        sys.exit(1)
+    if checkpoint and os.path.exists(checkpoint):
+        os.remove(checkpoint)
@@ -0,0 +1,155 @@
+"""
+Module compressing responses with the best encoding the
+client accepts. Brotli is used when the brotli package is
+installed and gzip otherwise. Streamed responses are
+compressed chunk by chunk as they are sent
+"""
+
+import gzip
+import zlib
+
+from typing import Iterator
+
+from flask import current_app, request, Response
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+# encodings in order of preference
+ENCODINGS = ("br", "gzip") if brotli else ("gzip",)
+
+# statuses without a body to compress
+NO_BODY = (204, 206, 304)
+
+
+def etag_variants(etag: str) -> tuple:
+    """
+    Gets the entity tags a response tagged <etag> is sent
+    with, one for each content encoding
+
+    Args:
+        etag (str): entity tag of the uncompressed response
+
+    Returns:
+        tuple: entity tags for every encoding
+    """
+    return (etag, *(f"{etag}-{encoding}" for encoding in ENCODINGS))
+
+
+def compressor(encoding: str) -> tuple:
+    """
+    Creates an incremental compressor for <encoding>
+
+    Args:
+        encoding (str): "br" or "gzip"
+
+    Returns:
+        tuple: functions compressing a chunk and flushing the
+               end of the stream
+    """
+    config = current_app.config
+    if encoding == "br":
+        stream = brotli.Compressor(quality=config["COMPRESS_BR_LEVEL"])
+        return stream.process, stream.finish
+    # wbits of 31 writes a gzip header and trailer
+    stream = zlib.compressobj(config["COMPRESS_LEVEL"], zlib.DEFLATED, 31)
+    return stream.compress, stream.flush
+
+
+def compress_stream(chunks: Iterator[bytes], stream: tuple) -> Iterator[bytes]:
+    """
+    Compresses a streamed body one chunk at a time. The body
+    is consumed after the request has ended, so the compressor
+    is created up front
+
+    Args:
+        chunks (Iterator[bytes]): body chunks
+        stream (tuple): functions returned by compressor()
+
+    Yields:
+        bytes: compressed chunks
+    """
+    process, finish = stream
+    for chunk in chunks:
+        data = process(chunk)
+        if data:
+            yield data
+    yield finish()
+
+
+def compress(data: bytes, encoding: str) -> bytes:
+    """
+    Compresses a complete body
+
+    Args:
+        data (bytes): body
+        encoding (str): "br" or "gzip"
+
+    Returns:
+        bytes: compressed body
+    """
+    config = current_app.config
+    if encoding == "br":
+        return brotli.compress(data, quality=config["COMPRESS_BR_LEVEL"])
+    return gzip.compress(data, compresslevel=config["COMPRESS_LEVEL"], mtime=0)
+
+
+def compressible(response: Response) -> bool:
+    """
+    Checks if <response> has a body of a type that may be
+    compressed and has not been encoded already
+
+    Args:
+        response (Response): HTTP response
+
+    Returns:
+        bool: True if the response may be compressed
+    """
+    if response.status_code < 200 or response.status_code in NO_BODY:
+        return False
+    if response.direct_passthrough or "Content-Encoding" in response.headers:
+        return False
+    if "no-transform" in response.headers.get("Cache-Control", ""):
+        return False
+    return response.mimetype in current_app.config["COMPRESS_MIMETYPES"]
+
+
+def compress_response(response: Response) -> Response:
+    """
+    Compresses <response> if its type is in COMPRESS_MIMETYPES
+    and the client accepts a supported encoding. Bodies smaller
+    than COMPRESS_MIN_SIZE are sent as they are. Streamed bodies
+    are always compressed as their size is not known up front.
+    Files sent directly from disk are left to the web server
+
+    Args:
+        response (Response): HTTP response
+
+    Returns:
+        Response: the compressed or original response
+    """
+    config = current_app.config
+    if not compressible(response):
+        return response
+    streamed = response.is_streamed
+    if not streamed and response.calculate_content_length() < config["COMPRESS_MIN_SIZE"]:
+        return response
+    response.vary.add("Accept-Encoding")
+    encoding = request.accept_encodings.best_match(ENCODINGS)
+    if not encoding:
+        return response
+    if streamed:
+        response.response = compress_stream(
+            response.iter_encoded(),
+            compressor(encoding)
+        )
+        response.headers.pop("Content-Length", None)
+    else:
+        response.set_data(compress(response.get_data(), encoding))
+    response.headers["Content-Encoding"] = encoding
+    etag, weak = response.get_etag()
+    if etag:
+        response.set_etag(f"{etag}-{encoding}", weak)
+    return response
@@ -83,13 +83,36 @@ class SectionForm(FlaskForm):
 
 class SectionImportForm(FlaskForm):
     """
-    Defines a form for importing sections as JSON
+    Defines a form for importing sections as JSON, NDJSON
+    or CSV, either pasted as text or uploaded as a file
     """
     text_area = TextAreaField(
         "Section data JSON",
-        validators=[validators.DataRequired()]
+        validators=[validators.Optional()]
+    )
+    file = FileField(
+        "Or upload a file",
+        validators=[FileAllowed(
+            ["json", "ndjson", "jsonl", "csv", "txt"],
+            "Section data files only (json, ndjson, jsonl, csv, txt)"
+        )]
     )
 
+    def validate(self, extra_validators=None) -> bool:
+        """
+        Validates the form, requiring either pasted text
+        or an uploaded file
+
+        Args:
+            extra_validators (dict): additional field validators
+
+        Returns:
+            bool: True if the form is valid
+        """
+        if not super().validate(extra_validators):
+            return False
+        return bool(self.text_area.data or self.file.data)
+
 
 class EmailReminderForm(FlaskForm):
     """
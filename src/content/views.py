@@ -3,31 +3,33 @@ View module for new cert creation
 """
 
 import datetime
-import json
-import os
+import io
 
-import requests
 
-from flask import Blueprint, flash, redirect, render_template, request, Response, url_for
+from flask import Blueprint, current_app, flash, jsonify, redirect, render_template, request
+from flask import Response, url_for
+from flask_wtf.csrf import validate_csrf
+from wtforms import ValidationError
 
 from src.content.forms import CertForm, ResourceForm, SectionForm, SectionImportForm
 
-from src.models.cert import Cert
-from src.models.resource import Resource
-from src.models.section import Section
+from src.services import cert as cert_service
+from src.services import resource as resource_service
+from src.services import section as section_service
 
 from src.util.file import create_exam_reminder, delete_exam_reminder
 from src.util.image import handle_image_upload, DEFAULT_BADGE, DEFAULT_HEAD, PROJECT_ROOT
 from src.util.open_graph import handle_og_data
 
+# number of per-line import errors flashed to the user
+MAX_FLASHED_ERRORS = 10
+
 content_bp = Blueprint(
     "content",
     __name__,
     template_folder="templates"
 )
 
-API_URL = f"http://127.0.0.1:5000/api/v{os.environ["API_VERSION"]}"
-
 
 ###########################
 ##### CERT OPERATIONS #####
@@ -44,53 +46,46 @@ def create_cert() -> Response:
     """
     form = CertForm()
     if request.method == "POST" and form.validate_on_submit():
-        failed_constraint = Cert.exists(form.name.data, form.code.data)
-        if failed_constraint:
-            flash(f"{failed_constraint} must be unique", "error")
+        # create cert data object with the default images
+        cert_data = {
+            "name": form.data["name"],
+            "code": form.data["code"],
+            "tags": form.data["tags"],
+            "head_img": DEFAULT_HEAD,
+            "badge_img": DEFAULT_BADGE,
+        }
+        # create the cert first so a unique constraint failure is
+        # caught before any uploads are written to the cert directory
+        data = cert_service.create_cert(cert_data)
+        if data["status"] == 409:
+            flash(f"{data["message"]}", "error")
             return render_template(
                 "new_cert.html",
                 form=form,
                 data=form.data,
-                failed=failed_constraint,
+                failed=data["field"],
                 title="CT: Create"
             )
-        # create cert data object
-        cert_data = {
-            "name": form.data["name"],
-            "code": form.data["code"],
-            "tags": form.data["tags"],
-        }
+        if data["status"] != 200:
+            flash("Create cert failed", "error")
+            return render_template("new_cert.html", form=form, title="CT: Create")
         # handle image uploads
         cert_dir = form.data["code"].lower().replace("-", "")
-        # save head image file if provided else use default
+        images = {}
         if form.head_img.data:
-            cert_data["head_img"] = handle_image_upload(
+            images["head_img"] = handle_image_upload(
                 form.head_img.data,
                 cert_dir
             )
-        else:
-            cert_data["head_img"] = DEFAULT_HEAD
-        # save badge image file if provided else use default
         if form.badge_img.data:
-            cert_data["badge_img"] = handle_image_upload(
+            images["badge_img"] = handle_image_upload(
                 form.badge_img.data,
                 cert_dir
             )
-        else:
-            cert_data["badge_img"] = DEFAULT_BADGE
-        # create the cert
-        response = requests.post(
-            url=f"{API_URL}/cert",
-            data=json.dumps(cert_data),
-            headers={"Content-Type": "application/json"},
-            timeout=2
-        )
-        data = response.json()
-        if data["status"] == 200:
-            flash(f"{data["message"]}", "message")
-            return redirect(url_for("certs.certs"), 302)
-        flash("Create cert failed", "error")
-        return render_template("new_cert.html", form=form, title="CT: Create")
+        if images:
+            cert_service.update_cert(data["id"], {**cert_data, **images})
+        flash(f"{data["message"]}", "message")
+        return redirect(url_for("certs.certs"), 302)
     if form.head_img.errors or form.badge_img.errors:
         flash("Image uploads only (jpg, jpeg, png, svg)", "error")
     return render_template("new_cert.html", form=form, title="CT: Create")
@@ -129,13 +124,7 @@ def update_cert(cert_id: int) -> Response:
                 form.badge_img.data,
                 cert_dir
             )
-        response = requests.put(
-            url=f"{API_URL}/cert/{cert_id}",
-            data=json.dumps(cert_data),
-            headers={"Content-Type": "application/json"},
-            timeout=2
-        )
-        data = response.json()
+        data = cert_service.patch_cert(cert_id, cert_data)
         if data["status"] == 200:
             flash(f"{data["message"]}", "message")
         else:
@@ -161,18 +150,9 @@ def update_cert_exam_date() -> Response:
         flash("Please provide a valid date", "error")
         return redirect(url_for('data.cert_data', cert_id=cert_id), 302)
     # set new date
-    cert = requests.get(f"{API_URL}/cert/{cert_id}", timeout=2)
-    data = cert.json()
     date_values = exam_date.split("-")
     date_values.reverse()
-    data["exam_date"] = "/".join(date_values)
-    response = requests.put(
-        url=f"{API_URL}/cert/{cert_id}",
-        data=json.dumps(data),
-        headers={"Content-Type": "application/json"},
-        timeout=2
-    )
-    data = response.json()
+    data = cert_service.patch_cert(cert_id, {"exam_date": "/".join(date_values)})
     if data["status"] == 200:
         flash(f"{data["message"]}", "message")
     else:
@@ -195,9 +175,8 @@ def update_cert_exam_reminder() -> Response:
     if not starting_from:
         flash("Please provide a valid date", "error")
         return redirect(url_for('data.cert_data', cert_id=cert_id), 302)
-    # get the cert data from the API
-    response = requests.get(f"{API_URL}/cert/{cert_id}", timeout=2)
-    data = response.json()
+    # get the details written to the reminder
+    data = cert_service.get_cert_record(cert_id, ["name", "code", "exam_date"])._asdict()
     # read correct data file
     if request.form.get("testing"):
         data_file = f"{PROJECT_ROOT}/tests/test_data.json"
@@ -215,13 +194,7 @@ def update_cert_exam_reminder() -> Response:
             flash("Email reminder not set", "error")
             return redirect(url_for('data.cert_data', cert_id=cert_id), 302)
         # update the reminder field
-        data["reminder"] = False
-        requests.put(
-            f"{API_URL}/cert/{cert_id}",
-            data=json.dumps(data),
-            headers={"Content-Type": "application/json"},
-            timeout=2,
-        )
+        cert_service.patch_cert(cert_id, {"reminder": False})
         flash("Email reminder deleted", "message")
         return redirect(url_for('data.cert_data', cert_id=cert_id), 302)
     # create cert object and update the appropriate file
@@ -234,13 +207,7 @@ def update_cert_exam_reminder() -> Response:
         "starting_from": starting_from
     })
     # update the reminder field
-    data["reminder"] = True
-    requests.put(
-        f"{API_URL}/cert/{cert_id}",
-        data=json.dumps(data),
-        headers={"Content-Type": "application/json"},
-        timeout=2,
-    )
+    cert_service.patch_cert(cert_id, {"reminder": True})
     flash("Email reminder set", "message")
     return redirect(url_for('data.cert_data', cert_id=cert_id), 302)
 
@@ -258,14 +225,6 @@ def create_resource() -> None:
     form = ResourceForm()
     cert_id = request.form["cert_id"]
     if form.validate_on_submit():
-        failed_constraint = Resource.exists(
-            cert_id,
-            form.title.data,
-            form.url.data
-        )
-        if failed_constraint:
-            flash(f"{failed_constraint} must be unique", "error")
-            return redirect(url_for('data.cert_data', cert_id=cert_id), 302)
         has_og_data = request.form.get("has_og_data", None)
         # construct the data
         cert_data = {
@@ -279,9 +238,8 @@ def create_resource() -> None:
             "site_name": form.site_name.data,
         }
         # handle images by checking for Open Graph data or image upload
-        response = requests.get(url=f"{API_URL}/cert/{cert_id}", timeout=2)
-        data = response.json()
-        cert_dir = data["code"].lower().replace("-", "")
+        cert = cert_service.get_cert(cert_id)
+        cert_dir = cert.code.lower().replace("-", "")
         if form.image.data:
             cert_data["image"] = handle_image_upload(
                 form.image.data,
@@ -296,15 +254,11 @@ def create_resource() -> None:
         # check if OG image was provided
         if request.form.get("image"):
             cert_data["image"] = request.form["image"]
-        response = requests.post(
-            url=f"{API_URL}/resource",
-            data=json.dumps(cert_data),
-            headers={"Content-Type": "application/json"},
-            timeout=2
-        )
-        data = response.json()
+        data = resource_service.create_resource(cert_data)
         if data["status"] == 200:
             flash(f"{data["message"]}", "message")
+        elif data["status"] == 409:
+            flash(f"{data["message"]}", "error")
         else:
             flash("Create resource failed", "error")
         return redirect(url_for('data.cert_data', cert_id=cert_id), 302)
@@ -331,21 +285,18 @@ def import_resource() -> Response:
     if not resources:
         flash("No resources selected for import", "error")
         return redirect(url_for('data.cert_data', cert_id=cert_id), 302)
-    # get resources and create new entries with the new cert ID
-    for resource_id in resources:
-        response = requests.get(
-            f"{API_URL}/resource/{resource_id}",
-            timeout=2
-        )
-        data = response.json()
-        data["cert_id"] = cert_id
-        requests.post(
-            f"{API_URL}/resource",
-            data=json.dumps(data),
-            headers={"Content-Type": "application/json"},
-            timeout=2
+    # copy the selected resources into the cert in one statement
+    result = resource_service.import_resources(cert_id, resources)
+    if result["status"] != 200:
+        flash(result["message"], "error")
+    elif result["skipped"]:
+        flash(
+            f"{result['imported']} imported, {len(result['skipped'])} skipped as "
+            "they are missing or already on this cert",
+            "error"
         )
-    flash("Resources imported successfully", "message")
+    else:
+        flash("Resources imported successfully", "message")
     return redirect(url_for('data.cert_data', cert_id=cert_id), 302)
 
 
@@ -362,17 +313,10 @@ def update_resource(resource_id: int) -> Response:
     """
     form = ResourceForm()
     cert_id = request.form["cert_id"]
-    # get the existing data to update - API requires all attributes present
-    response = requests.get(
-        f"{API_URL}/resource/{resource_id}",
-        timeout=2
-    )
-    db_data = response.json()
     if form.validate_on_submit():
         # fetch cert code for image uploads
-        response = requests.get(url=f"{API_URL}/cert/{cert_id}", timeout=2)
-        data = response.json()
-        cert_dir = data["code"].lower().replace("-", "")
+        cert = cert_service.get_cert(cert_id)
+        cert_dir = cert.code.lower().replace("-", "")
         # create the new data dictionary and update values
         resource_data = {
             "resource_type": form.resource_type.data,
@@ -392,20 +336,13 @@ def update_resource(resource_id: int) -> Response:
                 cert_dir,
                 logo=True
             )
-        # merge the updated form data
-        db_data.update(resource_data)
-        response = requests.put(
-            url=f"{API_URL}/resource/{resource_id}",
-            data=json.dumps(db_data),
-            headers={"Content-Type": "application/json"},
-            timeout=2
-        )
-        data = response.json()
+        # only the submitted fields are updated
+        data = resource_service.patch_resource(resource_id, resource_data)
         if data["status"] == 200:
             flash(f"{data["message"]}", "message")
         else:
             flash(f"{data["message"]}", "error")
-        return redirect(url_for("data.cert_data", cert_id=db_data["cert_id"]), 302)
+        return redirect(url_for("data.cert_data", cert_id=cert_id), 302)
     return Response(status=204)
 
 
@@ -423,16 +360,9 @@ def update_resource_complete() -> Response:
         flash("Only course type resources can be marked complete", "error")
         return redirect(url_for('data.cert_data', cert_id=cert_id), 302)
     resource_id = request.form["resource_id"]
-    response = requests.get(url=f"{API_URL}/resource/{resource_id}", timeout=2)
-    resource_data = response.json()
-    resource_data["complete"] = bool(request.form["complete"] == 'True')
-    response = requests.put(
-        url=f"{API_URL}/resource/{resource_id}",
-        data=json.dumps(resource_data),
-        headers={"Content-Type": "application/json"},
-        timeout=2,
-    )
-    data = response.json()
+    data = resource_service.patch_resource(resource_id, {
+        "complete": request.form["complete"] == "True"
+    })
     if data["status"] == 200:
         flash(f"{data["message"]}", "message")
     else:
@@ -445,31 +375,6 @@ def update_resource_complete() -> Response:
 ##############################
 
 
-def has_import_errors(sections: list) -> bool:
-    """
-    Handles errors that may occur during the import
-    of sections from a JSON file
-
-    Args:
-        sections (list): list of section objects
-
-    Returns:
-        bool: True if errors found, False otherwise
-    """
-    if not isinstance(sections, list):
-        flash("List of 'sections' not found", "error")
-        return True
-    # check all list objects have the correct fields
-    for section in sections:
-        if len(section) != 2:
-            flash("Invalid number of section fields found", "error")
-            return True
-        if "number" not in section or "title" not in section:
-            flash("Incorrect section fields found", "error")
-            return True
-    return False
-
-
 @content_bp.route("/create/section", methods=["POST"])
 def create_section() -> None:
     """
@@ -478,34 +383,28 @@ def create_section() -> None:
     """
     cert_id = request.form["cert_id"]
     import_form = SectionImportForm()
-    # handle JSON import option first
+    # handle JSON, NDJSON or CSV import option first
     if import_form.validate_on_submit():
+        if import_form.file.data:
+            stream = io.TextIOWrapper(import_form.file.data.stream, encoding="utf-8", newline="")
+        else:
+            stream = io.StringIO(import_form.text_area.data, newline="")
         try:
-            data = json.loads(import_form.text_area.data)
-            # check sections list exists
-            sections = data.get("sections", None)
-            # handle errors
-            if has_import_errors(sections):
-                return redirect(url_for('data.cert_data', cert_id=cert_id), 302)
-            # if all tests pass create each section
-            for section in sections:
-                data = {
-                    "cert_id": cert_id,
-                    "resource_id": request.form["resource_id"],
-                    "number": section["number"],
-                    "title": section["title"]
-                }
-                requests.post(
-                    url=f"{API_URL}/section",
-                    data=json.dumps(data),
-                    headers={"Content-Type": "application/json"},
-                    timeout=2
-                )
-            flash("JSON imported successfully", "message")
+            result = section_service.import_sections(
+                cert_id,
+                request.form["resource_id"],
+                stream
+            )
+        except UnicodeDecodeError:
+            flash("Section file must be UTF-8 encoded", "error")
             return redirect(url_for('data.cert_data', cert_id=cert_id), 302)
-        except json.JSONDecodeError:
-            flash("JSON improperly formatted", "error")
+        if result["status"] != 200:
+            flash(result["message"], "error")
+            for error in result["errors"][:MAX_FLASHED_ERRORS]:
+                flash(f"Line {error['line']}: {error['message']}", "error")
             return redirect(url_for('data.cert_data', cert_id=cert_id), 302)
+        flash(result["message"], "message")
+        return redirect(url_for('data.cert_data', cert_id=cert_id), 302)
     # handle single section upload
     form = SectionForm()
     if form.validate_on_submit():
@@ -514,13 +413,7 @@ def create_section() -> None:
             "resource_id": request.form["resource_id"],
             **form.data
         }
-        response = requests.post(
-            url=f"{API_URL}/section",
-            data=json.dumps(resource_data),
-            headers={"Content-Type": "application/json"},
-            timeout=2
-        )
-        data = response.json()
+        data = section_service.create_section(resource_data)
         if data["status"] == 200:
             flash(f"{data["message"]}", "message")
         else:
@@ -537,26 +430,45 @@ def update_section() -> Response:
     form = SectionForm()
     if form.validate_on_submit():
         section_id = request.form["section-id"]
-        section = requests.get(f"{API_URL}/section/{section_id}", timeout=2)
-        section_data = section.json()
-        section_data["number"] = form.number.data
-        section_data["title"] = form.title.data
-        section_data["cards_made"] = form.cards_made.data
-        section_data["complete"] = form.complete.data
-        requests.put(
-            url=f"{API_URL}/section/{section_id}",
-            data=json.dumps(section_data),
-            headers={"Content-Type": "application/json"},
-            timeout=2
-        )
+        section_data = {
+            "number": form.number.data,
+            "title": form.title.data,
+        }
         updated = request.form.get("updated", None)
         if updated == "true":
+            # the edit form only carries the number and title
+            section_service.patch_section(section_id, section_data)
             flash("Section updated successfully", "message")
-            return redirect(url_for("data.cert_data", cert_id=section_data["cert_id"]), 302)
+            return redirect(url_for("data.cert_data", cert_id=request.form["cert_id"]), 302)
+        section_data["cards_made"] = form.cards_made.data
+        section_data["complete"] = form.complete.data
+        section_service.patch_section(section_id, section_data)
         return Response(status=204)
     return Response(status=204)
 
 
+@content_bp.route("/update/sections", methods=["POST"])
+def update_sections() -> Response:
+    """
+    Applies a batch of section progress changes queued by
+    the course cards. The CSRF token is sent in the
+    'X-CSRFToken' header as there is no form to validate
+
+    Returns:
+        Response: Flask Response object
+    """
+    if current_app.config.get("WTF_CSRF_ENABLED", True):
+        try:
+            validate_csrf(request.headers.get("X-CSRFToken"))
+        except ValidationError:
+            return jsonify({
+                "message": "Invalid CSRF token",
+                "status": 400,
+            }), 400
+    result = section_service.update_progress(request.get_json().get("sections"))
+    return jsonify(result), result["status"]
+
+
 #############################
 ##### DELETE OPERATIONS #####
 #############################
@@ -576,11 +488,11 @@ def delete(resource_id: int) -> Response:
     """
     resource_type = request.form["type"]
     if resource_type == "cert":
-        response = Cert.delete(resource_id)
+        response = cert_service.delete_cert(resource_id)
     elif resource_type == "section":
-        response = Section.delete(resource_id)
+        response = section_service.delete_section(resource_id)
     else:
-        response = Resource.delete(resource_id)
+        response = resource_service.delete_resource(resource_id)
     flash(
         f"{response["message"]}",
         "message" if response["status"] == 200 else "error"
@@ -3,14 +3,13 @@ User created routes for new certs
 """
 
 import json
-import os
-
-import requests
 
 from flask import abort, Blueprint, render_template, Response, request
 
 from src.content.forms import EmailReminderForm, ResourceForm, SectionForm, SectionImportForm
-from src.models.cert import Cert
+
+from src.services import cert as cert_service
+from src.util.conditional import conditional
 
 data_bp = Blueprint(
     "data",
@@ -19,80 +18,14 @@ data_bp = Blueprint(
     url_prefix="/certs/data"
 )
 
-API_URL = f"http://127.0.0.1:5000/api/v{os.environ["API_VERSION"]}"
-
 
-def get_cert_resources(cert: Cert, resource_type: str) -> dict:
+def fetch_cert(bundle: dict, forms: tuple, og_data=None) -> str:
     """
-    Requests resources of type <resource_type> from the API
+    Renders the cert data template using the data fields
+    in the cert bundle
 
     Args:
-        cert (Cert): cert to fetch resources for
-        resource_type (str): type of resource to fetch 
-
-    Returns:
-        dict: JSON response
-    """
-    if resource_type == "section":
-        response = requests.get(f"{API_URL}/section", timeout=2)
-        return response.json()
-    response = requests.get(f"{API_URL}/resource", timeout=2)
-    data = response.json()
-    return [r for r in data if r["cert_id"] == cert["id"] and r["resource_type"] == resource_type]
-
-
-def get_importable_resources(cert: Cert) -> list:
-    """
-    Gets all resources from the API and returns those whose
-    which match the following criteria:
-
-    - do not have a matching cert ID to the cert passed in
-    - do not exist on the cert already
-    - are not duplicate resources from multiple certs 
-        - only a single resource data set is returned
-
-    Args:
-        cert (Cert): cert ID to exclude from results
-
-    Returns:
-        list: list of available resources to import into a cert
-    """
-    # get all resources
-    response = requests.get(f"{API_URL}/resource", timeout=2)
-    data = response.json()
-    # get this certs resources
-    cert_r = [r for r in data if r["cert_id"] == cert["id"]]
-    # exclude resources already on this cert
-    not_cert_r = [r for r in data if r["cert_id"] != cert["id"]]
-    # remove duplicates
-    r_dict = {}
-    for i, r in enumerate(not_cert_r):
-        if r["title"] not in r_dict:
-            r_dict[r["title"]] = i
-    # filtered list of unique resources
-    filtered = [not_cert_r[i] for i in r_dict.values()]
-    # return remaining resources
-    importable = []
-    for fr in filtered:
-        # check if resource is in cert_r
-        exists = False
-        for r in cert_r:
-            if fr["title"] == r["title"]:
-                exists = True
-                break
-        if not exists:
-            importable.append(fr)
-    return importable
-
-
-def fetch_cert(cert: Cert, tags: list, forms: tuple, og_data=None) -> str:
-    """
-    Fetches the cert data and returns the template with
-    the data fields updated
-
-    Args:
-        cert (Cert): Cert object
-        tags (list): list of Cert tags
+        bundle (dict): cert bundle from the cert service
         forms (tuple): creation forms
         og_data (None | dict): data pulled from opengraph
 
@@ -105,12 +38,9 @@ def fetch_cert(cert: Cert, tags: list, forms: tuple, og_data=None) -> str:
     else:
         og_result = None
         og_data_sent = None
-    courses = get_cert_resources(cert, "course")
-    sections = get_cert_resources(cert, "section")
-    videos = get_cert_resources(cert, "video")
-    articles = get_cert_resources(cert, "article")
-    documents = get_cert_resources(cert, "documentation")
-    importable_resources = get_importable_resources(cert)
+    cert = bundle["cert"]
+    resources = bundle["resources"]
+    importable = bundle["importable"]
     email_reminder_form, resource_form, section_form, section_import_form = forms
     return render_template(
         template_name_or_list="cert_data.html",
@@ -119,25 +49,26 @@ def fetch_cert(cert: Cert, tags: list, forms: tuple, og_data=None) -> str:
         section_form=section_form,
         section_import_form=section_import_form,
         cert=cert,
-        tags=tags,
-        course_data=courses,
-        section_data=sections,
-        video_data=videos,
-        article_data=articles,
-        document_data=documents,
+        tags=cert.tags,
+        course_data=resources["course"],
+        section_data=bundle["sections"],
+        video_data=resources["video"],
+        article_data=resources["article"],
+        document_data=resources["documentation"],
         resources={
-            # courses are excluded as duplicating the section data is not beneficial
-            "videos": [r for r in importable_resources if r["resource_type"] == "video"],
-            "articles": [r for r in importable_resources if r["resource_type"] == "article"],
-            "documents": [r for r in importable_resources if r["resource_type"] == "documentation"],
+            "courses": importable["course"],
+            "videos": importable["video"],
+            "articles": importable["article"],
+            "documents": importable["documentation"],
         },
-        title=f"CT: {cert["name"]}",
+        title=f"CT: {cert.name}",
         og_data=og_result,
         has_og_data=og_data_sent,
     )
 
 
 @data_bp.route("/<int:cert_id>", methods=["GET", "POST"])
+@conditional("certs", "resources", "sections", page=True)
 def cert_data(cert_id: int) -> Response:
     """
     Returns the cert_data template with the data for the
@@ -153,31 +84,16 @@ def cert_data(cert_id: int) -> Response:
     section_form = SectionForm()
     section_import_form = SectionImportForm()
     email_reminder_form = EmailReminderForm()
-    cert = requests.get(f"{API_URL}/cert/{cert_id}", timeout=2)
-    data = cert.json()
-    if not data:
+    bundle = cert_service.get_cert_bundle(cert_id)
+    if not bundle:
         abort(404)
-    og_data = request.args.get("og_data", None)
-    cert_obj = Cert.query.filter_by(id=data["id"]).first()
-    if og_data:
-        return fetch_cert(
-            cert=data,
-            tags=cert_obj.tags,
-            forms=(
-                email_reminder_form,
-                resource_form,
-                section_form,
-                section_import_form
-            ),
-            og_data=og_data
-        )
     return fetch_cert(
-        cert=data,
-        tags=cert_obj.tags,
+        bundle=bundle,
         forms=(
             email_reminder_form,
             resource_form,
             section_form,
             section_import_form
         ),
+        og_data=request.args.get("og_data", None)
     )
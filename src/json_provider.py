@@ -0,0 +1,139 @@
+"""
+Module providing the JSON provider used by jsonify(). Models
+are serialized straight from their column attributes rather
+than through dataclasses.asdict(), which deep-copies every
+row. Read-only rows are serialized as dicts. Documents are
+encoded with orjson when it is installed, falling back to
+the standard library otherwise
+"""
+
+import dataclasses
+
+from functools import cache
+from operator import attrgetter
+from typing import Any, Callable
+
+from flask import Response
+from flask.json.provider import DefaultJSONProvider
+from sqlalchemy import Row
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+@cache
+def field_getter(cls: type) -> tuple:
+    """
+    Gets the dataclass field names of <cls> and a getter
+    reading all of them from an instance in one call
+
+    Args:
+        cls (type): dataclass type
+
+    Returns:
+        tuple: field names and attribute getter
+    """
+    names = tuple(field.name for field in dataclasses.fields(cls))
+    getter = attrgetter(*names)
+    if len(names) == 1:
+        return names, lambda obj: (getter(obj),)
+    return names, getter
+
+
+def row_dict(obj: Any) -> dict:
+    """
+    Converts a dataclass instance such as a model object to a
+    dict of its fields. Values are not copied, unlike
+    dataclasses.asdict()
+
+    Args:
+        obj (Any): dataclass instance
+
+    Returns:
+        dict: field values keyed by name
+    """
+    names, getter = field_getter(type(obj))
+    return dict(zip(names, getter(obj)))
+
+
+def default(obj: Any) -> Any:
+    """
+    Converts values the encoder does not support natively
+
+    Args:
+        obj (Any): value to convert
+
+    Returns:
+        Any: serializable value
+    """
+    if isinstance(obj, Row):
+        return obj._asdict()
+    if dataclasses.is_dataclass(obj) and not isinstance(obj, type):
+        return row_dict(obj)
+    return DefaultJSONProvider.default(obj)
+
+
+class ModelJSONProvider(DefaultJSONProvider):
+    """
+    JSON provider serializing model objects from their
+    columns, encoding with orjson when available. Keys are
+    sorted and non-string keys converted as with the default
+    provider, so both encoders produce equivalent documents
+    """
+
+    default: Callable[[Any], Any] = staticmethod(default)
+
+    def options(self, response: bool = False) -> int:
+        """
+        Gets the orjson options matching the provider settings.
+        As with the default provider only responses are indented
+
+        Args:
+            response (bool): True if encoding a response body
+
+        Returns:
+            int: orjson option flags
+        """
+        option = orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATACLASS \
+            | orjson.OPT_PASSTHROUGH_DATETIME
+        if self.sort_keys:
+            option |= orjson.OPT_SORT_KEYS
+        if response and ((self.compact is None and self._app.debug) or self.compact is False):
+            option |= orjson.OPT_INDENT_2
+        return option
+
+    def dumps(self, obj: Any, **kwargs: Any) -> str:
+        """
+        Serializes <obj> to a JSON string. Calls passing encoder
+        arguments use the standard library
+
+        Args:
+            obj (Any): value to serialize
+            kwargs (Any): arguments for json.dumps()
+
+        Returns:
+            str: JSON document
+        """
+        if orjson is None or kwargs:
+            return super().dumps(obj, **kwargs)
+        return orjson.dumps(obj, default=self.default, option=self.options()).decode()
+
+    def response(self, *args: Any, **kwargs: Any) -> Response:
+        """
+        Serializes the arguments to a JSON response. The encoded
+        bytes are used as the body without decoding them first
+
+        Args:
+            args (Any): value to serialize
+            kwargs (Any): value to serialize as keyword arguments
+
+        Returns:
+            Response: response with the application/json mimetype
+        """
+        if orjson is None:
+            return super().response(*args, **kwargs)
+        obj = self._prepare_response_obj(args, kwargs)
+        body = orjson.dumps(obj, default=self.default, option=self.options(response=True))
+        return self._app.response_class(body + b"\n", mimetype=self.mimetype)
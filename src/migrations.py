@@ -0,0 +1,103 @@
+"""
+Module applying schema changes that db.create_all()
+does not make to an existing database
+"""
+
+from flask import current_app
+from sqlalchemy import inspect, text
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.schema import AddConstraint
+
+from src.db import db
+from src.search import create_search_index, SEARCH_INDEXES
+from src.versions import create_version_triggers, VERSIONED_TABLES
+
+
+def create_missing_indexes() -> None:
+    """
+    Creates any index declared on the models that does not
+    exist in the database yet. db.create_all() only creates
+    indexes along with new tables, so databases created before
+    an index was declared are brought up to date here. Uses
+    plain CREATE INDEX so it runs on SQLite and PostgreSQL.
+
+    A unique index cannot be built while duplicate rows exist,
+    so it is skipped with a warning until they are removed
+    """
+    for table in db.metadata.sorted_tables:
+        for index in table.indexes:
+            try:
+                index.create(db.engine, checkfirst=True)
+            except IntegrityError:
+                current_app.logger.warning(
+                    "Skipped unique index %s: duplicate rows in %s",
+                    index.name,
+                    table.name
+                )
+
+
+def cascade_foreign_keys() -> None:
+    """
+    Recreates foreign keys that exist without the ON DELETE
+    CASCADE declared on the models. SQLite cannot alter a
+    constraint in place, so this only runs on PostgreSQL.
+
+    The new constraint is validated against the existing rows,
+    so orphaned rows keep the old constraint with a warning
+    until they are removed
+    """
+    if db.engine.dialect.name != "postgresql":
+        return
+    inspector = inspect(db.engine)
+    for table in db.metadata.sorted_tables:
+        existing = inspector.get_foreign_keys(table.name)
+        for constraint in table.foreign_key_constraints:
+            if constraint.ondelete != "CASCADE":
+                continue
+            columns = [c.name for c in constraint.columns]
+            for fk in existing:
+                if fk["constrained_columns"] != columns or \
+                        fk["options"].get("ondelete", "").upper() == "CASCADE":
+                    continue
+                try:
+                    with db.engine.begin() as conn:
+                        conn.execute(text(
+                            f'ALTER TABLE {table.name} DROP CONSTRAINT "{fk["name"]}"'
+                        ))
+                        conn.execute(AddConstraint(constraint))
+                except IntegrityError:
+                    current_app.logger.warning(
+                        "Skipped cascading %s.%s: orphaned rows in %s",
+                        table.name,
+                        ", ".join(columns),
+                        table.name
+                    )
+
+
+def create_search_indexes() -> None:
+    """
+    Creates the full-text search index for each table in
+    SEARCH_INDEXES
+    """
+    for table in SEARCH_INDEXES:
+        create_search_index(table)
+
+
+def create_version_tracking() -> None:
+    """
+    Creates the version row and triggers for each table in
+    VERSIONED_TABLES
+    """
+    for table in VERSIONED_TABLES:
+        create_version_triggers(table)
+
+
+def upgrade() -> None:
+    """
+    Applies all schema changes. Every step is idempotent so
+    this is safe to run each time the app starts
+    """
+    create_missing_indexes()
+    cascade_foreign_keys()
+    create_search_indexes()
+    create_version_tracking()
@@ -2,19 +2,10 @@
 Module creating the Cert model
 """
 
-import os
-
 from dataclasses import dataclass
 
-import requests
-
 from src.db import db
-from src.models.resource import Resource
-from src.models.section import Section
-
-from src.util.image import remove_images
-
-API_URL = f"http://127.0.0.1:5000/api/v{os.environ["API_VERSION"]}"
+from src.search import find
 
 
 @dataclass
@@ -39,77 +30,23 @@ class Cert(db.Model):
     created: str = db.Column(db.String(64), nullable=False)
 
     @classmethod
-    def exists(cls, name: str, code: str) -> str:
-        """
-        Checks to see if a Cert exists in the database
-        that would cause this creation to raise an 
-        integrity violation
-
-        Args:
-            name (str): form name value
-            code (str): form code value
-
-        Returns:
-            str: first value causing an integrity violation
-        """
-        certs = Cert.query.all()
-        for cert in certs:
-            if cert.name == name:
-                return "Name"
-            if cert.code == code:
-                return "Code"
-        return None
-
-    @classmethod
-    def find(cls, query: str) -> list:
+    def find(cls, query: str, limit: int = 20, offset: int = 0) -> list:
         """
-        Runs a query against this model to find
-        all entries that match the query string.
+        Runs a full-text query against this model to find
+        the entries that match the query string, ranked by
+        relevance.
 
         Searched fields are:
-        - path
         - name
         - code
         - tags
 
         Args:
             query (str): term to match against
+            limit (int): maximum number of entries to return
+            offset (int): number of matching entries to skip
 
         Returns:
             list: matching entries
         """
-        certs = Cert.query.all()
-        results = []
-        for cert in certs:
-            if query in cert.name:
-                results.append(cert)
-                continue
-            if query in cert.code:
-                results.append(cert)
-                continue
-            if query in cert.tags:
-                results.append(cert)
-                break
-        return results
-
-    @classmethod
-    def delete(cls, cert_id: int) -> str:
-        """
-        Deletes the Cert with the given ID
-
-        Args:
-            cert_id (int): Cert ID
-        """
-        # remove cert images
-        remove_images(cert_id)
-        # delete sections
-        sections = Section.query.filter_by(cert_id=cert_id).all()
-        for section in sections:
-            requests.delete(f"{API_URL}/section/{section.id}", timeout=2)
-        # delete resources
-        resources = Resource.query.filter_by(cert_id=cert_id).all()
-        for resource in resources:
-            requests.delete(f"{API_URL}/resource/{resource.id}", timeout=2)
-        # delete the cert
-        response = requests.delete(f"{API_URL}/cert/{cert_id}", timeout=2)
-        return response.json()
+        return find(cls, query, limit, offset)
@@ -0,0 +1,21 @@
+"""
+Module creating the Version model
+"""
+
+from dataclasses import dataclass
+
+from src.db import db
+
+
+@dataclass
+class Version(db.Model):
+    """
+    Model defining the change counter of a table. Rows are
+    kept current by database triggers, see src/versions.py
+    """
+
+    __tablename__ = "versions"
+
+    name: str = db.Column(db.String(64), primary_key=True)
+    version: int = db.Column(db.Integer, nullable=False)
+    modified: int = db.Column(db.BigInteger, nullable=False)  # unix time of the last change
@@ -0,0 +1,193 @@
+"""
+Module providing indexed full-text search. PostgreSQL
+matches a tsvector expression backed by a GIN index and
+SQLite matches an FTS5 table kept current by triggers.
+Other databases fall back to LIKE queries
+"""
+
+import re
+
+from flask_sqlalchemy.model import Model
+from sqlalchemy import select, text
+
+from src.db import db
+
+# searchable columns for each indexed table
+SEARCH_INDEXES = {
+    "certs": ("name", "code", "tags"),
+    "resources": ("title", "description", "site_name", "url"),
+    "sections": ("title",),
+}
+
+# maximum number of matches scored for relevance per query
+RANK_WINDOW = 2000
+
+
+def search_tokens(query: str) -> list:
+    """
+    Splits a search query into terms and each term into
+    lowercase alphanumeric tokens. Punctuation is dropped so
+    user input never reaches the match syntax directly
+
+    Args:
+        query (str): raw search query
+
+    Returns:
+        list: list of token lists, one per term
+    """
+    terms = []
+    for term in (query or "").split():
+        tokens = re.findall(r"[^\W_]+", term.lower())
+        if tokens:
+            terms.append(tokens)
+    return terms
+
+
+def pg_vector(table: str) -> str:
+    """
+    Builds the tsvector expression indexed for <table>.
+    Punctuation is replaced with spaces first so URLs and
+    codes split into the same tokens as search_tokens()
+
+    Args:
+        table (str): name of an indexed table
+
+    Returns:
+        str: SQL expression
+    """
+    columns = " || ' ' || ".join(
+        f"regexp_replace(coalesce({c}, ''), '[^[:alnum:]]+', ' ', 'g')"
+        for c in SEARCH_INDEXES[table]
+    )
+    return f"to_tsvector('simple', {columns})"
+
+
+def create_search_index(table: str) -> None:
+    """
+    Creates the full-text index for <table> if it does not
+    exist. The SQLite FTS5 table is populated from the
+    existing rows when it is first created
+
+    Args:
+        table (str): name of an indexed table
+    """
+    columns = SEARCH_INDEXES[table]
+    dialect = db.engine.dialect.name
+    with db.engine.begin() as conn:
+        if dialect == "postgresql":
+            conn.execute(text(
+                f"CREATE INDEX IF NOT EXISTS ix_{table}_search "
+                f"ON {table} USING GIN ({pg_vector(table)})"
+            ))
+        elif dialect == "sqlite":
+            fts = f"{table}_fts"
+            exists = conn.execute(
+                text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = :name"),
+                {"name": fts}
+            ).first()
+            if exists:
+                return
+            names = ", ".join(columns)
+            new = ", ".join(f"new.{c}" for c in columns)
+            old = ", ".join(f"old.{c}" for c in columns)
+            conn.execute(text(
+                f"CREATE VIRTUAL TABLE {fts} USING fts5("
+                f"{names}, content='{table}', content_rowid='id')"
+            ))
+            conn.execute(text(
+                f"CREATE TRIGGER {fts}_ai AFTER INSERT ON {table} BEGIN "
+                f"INSERT INTO {fts}(rowid, {names}) VALUES (new.id, {new}); END"
+            ))
+            conn.execute(text(
+                f"CREATE TRIGGER {fts}_ad AFTER DELETE ON {table} BEGIN "
+                f"INSERT INTO {fts}({fts}, rowid, {names}) "
+                f"VALUES ('delete', old.id, {old}); END"
+            ))
+            conn.execute(text(
+                f"CREATE TRIGGER {fts}_au AFTER UPDATE ON {table} BEGIN "
+                f"INSERT INTO {fts}({fts}, rowid, {names}) "
+                f"VALUES ('delete', old.id, {old}); "
+                f"INSERT INTO {fts}(rowid, {names}) VALUES (new.id, {new}); END"
+            ))
+            conn.execute(text(f"INSERT INTO {fts}({fts}) VALUES ('rebuild')"))
+
+
+def match(table: str, query: str, limit: int, offset: int = 0) -> list:
+    """
+    Finds the IDs of rows in <table> matching every term in
+    <query>. Tokens within a term must appear next to each
+    other and the last token of each term matches as a prefix.
+    Results are ordered by relevance where the database
+    supports ranking. Only the first RANK_WINDOW matches are
+    ranked, so a broad term matching most of a large table
+    does not score every row
+
+    Args:
+        table (str): name of an indexed table
+        query (str): raw search query
+        limit (int): maximum number of IDs to return
+        offset (int): number of matches to skip
+
+    Returns:
+        list: ranked list of row IDs
+    """
+    terms = search_tokens(query)
+    if not terms:
+        return []
+    dialect = db.engine.dialect.name
+    params = {
+        "limit": limit,
+        "offset": offset,
+        "window": max(RANK_WINDOW, limit + offset),
+    }
+    if dialect == "postgresql":
+        params["query"] = " & ".join(" <-> ".join(t) + ":*" for t in terms)
+        tsquery = "to_tsquery('simple', :query)"
+        sql = (
+            f"SELECT id FROM (SELECT id, {pg_vector(table)} AS vector FROM {table} "
+            f"WHERE {pg_vector(table)} @@ {tsquery} LIMIT :window) AS hits "
+            f"ORDER BY ts_rank(vector, {tsquery}) DESC, id "
+            "LIMIT :limit OFFSET :offset"
+        )
+    elif dialect == "sqlite":
+        params["query"] = " ".join('"' + " ".join(t) + '"*' for t in terms)
+        sql = (
+            f"SELECT rowid FROM (SELECT rowid, rank FROM {table}_fts "
+            f"WHERE {table}_fts MATCH :query LIMIT :window) "
+            "ORDER BY rank LIMIT :limit OFFSET :offset"
+        )
+    else:
+        clauses = []
+        for i, term in enumerate(terms):
+            params[f"term_{i}"] = f"%{'%'.join(term)}%"
+            clauses.append("(" + " OR ".join(
+                f"lower({c}) LIKE :term_{i}" for c in SEARCH_INDEXES[table]
+            ) + ")")
+        sql = (
+            f"SELECT id FROM {table} WHERE {' AND '.join(clauses)} "
+            "ORDER BY id LIMIT :limit OFFSET :offset"
+        )
+    return [row[0] for row in db.session.execute(text(sql), params)]
+
+
+def find(model: Model, query: str, limit: int, offset: int = 0) -> list:
+    """
+    Finds the rows of <model> matching <query> and reads
+    them in a single query, keeping the ranked order. Rows
+    are read-only named tuples rather than model objects
+
+    Args:
+        model (Model): model class of an indexed table
+        query (str): raw search query
+        limit (int): maximum number of rows to return
+        offset (int): number of matches to skip
+
+    Returns:
+        list: ranked list of rows
+    """
+    ids = match(model.__tablename__, query, limit, offset)
+    if not ids:
+        return []
+    statement = select(*model.__table__.columns).where(model.id.in_(ids))
+    rows = {r.id: r for r in db.session.execute(statement)}
+    return [rows[i] for i in ids if i in rows]
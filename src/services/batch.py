@@ -0,0 +1,210 @@
+"""
+Service module for running an ordered list of API operations
+in a single database transaction
+"""
+
+import re
+
+from contextlib import contextmanager
+from typing import Callable, Iterator
+
+from sqlalchemy import Connection
+from sqlalchemy.orm import Session
+
+from src.db import db
+
+MAX_BATCH_OPERATIONS = 100
+
+BATCH_METHODS = ("GET", "POST", "PUT", "PATCH", "DELETE")
+
+# "$<index>.<key>" refers to <key> in the result of an earlier operation
+REFERENCE = re.compile(r"\$(\d+)\.(\w+)")
+
+
+@contextmanager
+def single_transaction() -> Iterator[Connection]:
+    """
+    Routes every use of db.session in the block through one
+    connection and transaction. Commits and rollbacks made by
+    the services only release or roll back a savepoint, so the
+    block is saved or discarded as a whole. Nothing is saved
+    unless the caller commits the yielded connection
+
+    Yields:
+        Connection: connection holding the shared transaction
+    """
+    registry = db.session.registry
+    previous = registry() if registry.has() else None
+    connection = db.engine.connect()
+    connection.begin()
+    if connection.dialect.name == "sqlite":
+        # pysqlite only begins a transaction before DML, so the
+        # first savepoint would otherwise run outside of it
+        connection.exec_driver_sql("BEGIN")
+    session = Session(bind=connection, join_transaction_mode="create_savepoint")
+    registry.set(session)
+    try:
+        yield connection
+    finally:
+        session.close()
+        connection.close()
+        if previous is None:
+            registry.clear()
+        else:
+            registry.set(previous)
+
+
+def lookup_reference(match: re.Match, results: list) -> object:
+    """
+    Gets the value a reference to an earlier result points to
+
+    Args:
+        match (re.Match): match of REFERENCE
+        results (list): results of the operations run so far
+
+    Raises:
+        ValueError: if the reference does not match a result
+
+    Returns:
+        object: referenced value
+    """
+    index, key = int(match.group(1)), match.group(2)
+    if index >= len(results) or not isinstance(results[index], dict) \
+            or key not in results[index]:
+        raise ValueError(match.group(0))
+    return results[index][key]
+
+
+def resolve_references(value: object, results: list) -> object:
+    """
+    Replaces references to earlier results in a body. Only a
+    string that is a single reference is replaced, by the
+    referenced value itself so IDs stay integers. Other text
+    is kept as sent, so a title such as "Costs $5.99" is saved
+    unchanged
+
+    Args:
+        value (object): body or part of a body
+        results (list): results of the operations run so far
+
+    Raises:
+        ValueError: if a reference does not match a result
+
+    Returns:
+        object: value with its references replaced
+    """
+    if isinstance(value, dict):
+        return {k: resolve_references(v, results) for k, v in value.items()}
+    if isinstance(value, list):
+        return [resolve_references(v, results) for v in value]
+    if isinstance(value, str):
+        match = REFERENCE.fullmatch(value)
+        if match:
+            return lookup_reference(match, results)
+    return value
+
+
+def resolve_path(path: str, results: list) -> str:
+    """
+    Substitutes references to earlier results inside a path,
+    e.g. "/cert/$0.id"
+
+    Args:
+        path (str): operation path
+        results (list): results of the operations run so far
+
+    Raises:
+        ValueError: if a reference does not match a result
+
+    Returns:
+        str: path with its references replaced
+    """
+    return REFERENCE.sub(lambda m: str(lookup_reference(m, results)), path)
+
+
+def operation_error(operation: object) -> str:
+    """
+    Validates a single batch operation
+
+    Args:
+        operation (object): operation to check
+
+    Returns:
+        str: error message or None if the operation is valid
+    """
+    if not isinstance(operation, dict):
+        return "Operation must be an object"
+    if str(operation.get("method", "")).upper() not in BATCH_METHODS:
+        return f"Method must be one of {', '.join(BATCH_METHODS)}"
+    if not isinstance(operation.get("path"), str) or not operation["path"].startswith("/"):
+        return "Path must be a string starting with '/'"
+    return None
+
+
+def run_batch(operations: list, execute: Callable) -> dict:
+    """
+    Runs <operations> in order inside a single transaction.
+    Each operation is a 'method', a 'path' and an optional
+    'body'. Paths and body values that are a single reference
+    use values returned by earlier operations, written as
+    "$<index>.<key>", e.g. "$0.id". The batch
+    stops at the first operation that fails and nothing is
+    saved, otherwise every change is committed at once
+
+    Args:
+        operations (list): operations to run
+        execute (Callable): runs one operation given its method,
+                            path and body and returns its status
+                            code and JSON result
+
+    Returns:
+        dict: operation result message and status, plus the
+              result of each operation that ran
+    """
+    if not isinstance(operations, list) or not operations:
+        return {
+            "message": "List of 'operations' not found",
+            "status": 400,
+        }
+    if len(operations) > MAX_BATCH_OPERATIONS:
+        return {
+            "message": f"A batch can contain at most {MAX_BATCH_OPERATIONS} operations",
+            "status": 400,
+        }
+    for index, operation in enumerate(operations):
+        error = operation_error(operation)
+        if error:
+            return {
+                "message": f"Operation {index}: {error}",
+                "status": 400,
+            }
+    results = []
+    with single_transaction() as connection:
+        for index, operation in enumerate(operations):
+            try:
+                path = resolve_path(operation["path"], results)
+                body = resolve_references(operation.get("body"), results)
+            except ValueError as e:
+                return {
+                    "message": f"Operation {index}: unresolved reference '{e}'",
+                    "status": 400,
+                    "failed": index,
+                    "results": results,
+                }
+            status, result = execute(operation["method"].upper(), path, body)
+            if isinstance(result, dict):
+                status = result.get("status", status)
+            results.append(result)
+            if status >= 400:
+                return {
+                    "message": f"Operation {index} failed, no changes were saved",
+                    "status": status,
+                    "failed": index,
+                    "results": results,
+                }
+        connection.commit()
+    return {
+        "message": "Batch completed successfully",
+        "status": 200,
+        "results": results,
+    }
@@ -0,0 +1,237 @@
+"""
+Service module for Cert operations shared by the
+API and the HTML views
+"""
+
+from datetime import datetime
+
+from sqlalchemy import Row
+
+from src.db import db
+from src.models.cert import Cert
+from src.models.resource import Resource
+from src.models.section import Section
+
+from src.services.integrity import commit_unique, conflict_response
+from src.services.pagination import paginate
+from src.services.patch import apply_patch
+from src.services.records import record_select
+from src.services.resource import get_cert_resources, get_grouped_import_candidates
+from src.services.resource import RESOURCE_TYPES
+from src.services.section import get_course_sections
+
+from src.util.image import remove_images
+
+# columns behind each unique constraint, checked in order
+CERT_CONSTRAINTS = {
+    "Name": ("name",),
+    "Code": ("code",),
+}
+
+# fields that may be sent in a partial update
+CERT_FIELDS = ("name", "code", "head_img", "badge_img", "exam_date",
+               "complete", "reminder", "cost", "tags")
+
+
+def get_all_certs(fields: list = None) -> list:
+    """
+    Gets all Certs from the database as read-only rows
+
+    Args:
+        fields (list): columns to read or None for every column
+
+    Returns:
+        list: list of Cert rows
+    """
+    return db.session.execute(record_select(Cert, fields)).all()
+
+
+def get_certs_page(limit: int = None, after: int = None, fields: list = None) -> dict:
+    """
+    Gets a page of Certs ordered by ID as read-only rows
+
+    Args:
+        limit (int): maximum number of Certs to return
+        after (int): ID of the last Cert in the previous page
+        fields (list): columns to read or None for every column
+
+    Returns:
+        dict: page of Cert rows and the next cursor
+    """
+    return paginate(record_select(Cert, fields), Cert.id, limit, after)
+
+
+def get_cert(cert_id: int) -> Cert:
+    """
+    Gets a Cert from the database by ID
+
+    Args:
+        cert_id (int): id of cert
+
+    Returns:
+        Cert: Cert object or None if not found
+    """
+    return Cert.query.filter_by(id=cert_id).first()
+
+
+def get_cert_record(cert_id: int, fields: list = None) -> Row:
+    """
+    Gets a Cert from the database by ID as a read-only row
+
+    Args:
+        cert_id (int): id of cert
+        fields (list): columns to read or None for every column
+
+    Returns:
+        Row: Cert row or None if not found
+    """
+    return db.session.execute(record_select(Cert, fields).where(Cert.id == cert_id)).first()
+
+
+def get_cert_bundle(cert_id: int) -> dict:
+    """
+    Gets everything needed to render a Cert page in a
+    fixed number of queries scoped to the Cert:
+
+    - the Cert itself
+    - its Resources grouped by type
+    - its Sections grouped by course
+    - Resources from other Certs available for import,
+      grouped by type
+
+    Args:
+        cert_id (int): id of cert
+
+    Returns:
+        dict: bundle data or None if the Cert is not found
+    """
+    cert = get_cert_record(cert_id)
+    if not cert:
+        return None
+    resources = {r_type: [] for r_type in RESOURCE_TYPES}
+    for resource in get_cert_resources(cert_id):
+        resources.setdefault(resource.resource_type, []).append(resource)
+    return {
+        "cert": cert,
+        "resources": resources,
+        "sections": get_course_sections(cert_id),
+        "importable": get_grouped_import_candidates(cert_id),
+    }
+
+
+def create_cert(data: dict) -> dict:
+    """
+    Creates a Cert using the provided data
+
+    Args:
+        data (dict): cert data
+
+    Returns:
+        dict: operation result message and status,
+              plus the new Cert ID on success
+    """
+    cert = Cert(
+        name=data["name"],
+        code=data["code"],
+        head_img=data["head_img"],
+        badge_img=data["badge_img"],
+        exam_date=None,
+        reminder=False,
+        tags=data["tags"],
+        created=datetime.now().strftime("%d/%m/%Y"),
+    )
+    conflict = commit_unique(cert, CERT_CONSTRAINTS)
+    if conflict:
+        return conflict_response(conflict)
+    return {
+        "message": "Cert created successfully",
+        "status": 200,
+        "id": cert.id,
+    }
+
+
+def update_cert(cert_id: int, data: dict) -> dict:
+    """
+    Updates a Cert in the database using the
+    provided cert ID
+
+    Args:
+        cert_id (int): id of cert
+        data (dict): cert data
+
+    Returns:
+        dict: operation result message and status
+    """
+    cert = get_cert(cert_id)
+    if not cert:
+        return {
+            "message": "Cert not found",
+            "status": 404,
+        }
+    cert.name = data["name"]
+    cert.code = data["code"]
+    if data.get("head_img"):
+        cert.head_img = data["head_img"]
+    if data.get("badge_img"):
+        cert.badge_img = data["badge_img"]
+    if data.get("exam_date") is not None:
+        cert.exam_date = data["exam_date"]
+    if data.get("reminder") is not None:
+        cert.reminder = data["reminder"]
+    cert.tags = data["tags"]
+    conflict = commit_unique(cert, CERT_CONSTRAINTS)
+    if conflict:
+        return conflict_response(conflict)
+    return {
+        "message": "Cert updated successfully",
+        "status": 200,
+    }
+
+
+def patch_cert(cert_id: int, data: dict) -> dict:
+    """
+    Updates only the Cert fields sent in <data> with a
+    single UPDATE statement
+
+    Args:
+        cert_id (int): id of cert
+        data (dict): partial cert data
+
+    Returns:
+        dict: operation result message and status
+    """
+    return apply_patch(Cert, cert_id, data, CERT_FIELDS, CERT_CONSTRAINTS)
+
+
+def delete_cert(cert_id: int) -> dict:
+    """
+    Deletes a Cert from the database by ID along
+    with its resources and sections in a single
+    transaction, then removes its images
+
+    Args:
+        cert_id (int): id of cert
+
+    Returns:
+        dict: operation result message and status
+    """
+    cert = get_cert(cert_id)
+    if not cert:
+        return {
+            "message": "Cert not found",
+            "status": 404,
+        }
+    code = cert.code
+    # the foreign keys cascade these deletes, but SQLite only
+    # enforces them when asked to so children are deleted
+    # explicitly with one statement per table
+    Section.query.filter_by(cert_id=cert_id).delete()
+    Resource.query.filter_by(cert_id=cert_id).delete()
+    Cert.query.filter_by(id=cert_id).delete()
+    db.session.commit()
+    # only remove images once the rows are gone for good
+    remove_images(code)
+    return {
+        "message": "Cert deleted successfully",
+        "status": 200
+    }
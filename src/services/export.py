@@ -0,0 +1,68 @@
+"""
+Service module for exporting every Cert, Resource and Section
+as NDJSON. Rows are read from one consistent snapshot through
+a server-side cursor in batches and written out one line at a
+time, so memory use does not grow with the size of the database
+"""
+
+from typing import Iterator
+
+from flask import current_app
+
+from src.compression import compress_stream, compressor
+from src.db import db
+from src.models.cert import Cert
+from src.models.resource import Resource
+from src.models.section import Section
+from src.services.records import record_select
+
+# parents are exported before the rows that reference them
+EXPORT_MODELS = (Cert, Resource, Section)
+
+# rows fetched from the cursor at a time
+EXPORT_BATCH_SIZE = 1000
+
+
+def export_lines() -> Iterator[str]:
+    """
+    Yields one NDJSON line per row of each table in
+    EXPORT_MODELS, in table order and then by ID. Each line
+    holds the table name and the row data.
+
+    Every table is read on one connection inside a single
+    read-only transaction. On PostgreSQL it runs at REPEATABLE
+    READ, so the export is one snapshot and rows written while
+    it streams, such as a section on a new resource, cannot
+    reference parents missing from the file
+
+    Yields:
+        str: JSON document followed by a newline
+    """
+    with db.engine.connect() as connection:
+        if connection.dialect.name == "postgresql":
+            connection = connection.execution_options(
+                isolation_level="REPEATABLE READ",
+                postgresql_readonly=True
+            )
+        with connection.begin():
+            if connection.dialect.name == "sqlite":
+                # pysqlite does not begin a transaction before reads
+                connection.exec_driver_sql("BEGIN")
+            for model in EXPORT_MODELS:
+                statement = record_select(model) \
+                    .order_by(model.id) \
+                    .execution_options(yield_per=EXPORT_BATCH_SIZE)
+                table = model.__tablename__
+                for row in connection.execute(statement):
+                    yield current_app.json.dumps({"table": table, "data": row}) + "\n"
+
+
+def export_gzip() -> Iterator[bytes]:
+    """
+    Yields the export compressed as a gzip file
+
+    Yields:
+        bytes: compressed chunks
+    """
+    lines = (line.encode() for line in export_lines())
+    yield from compress_stream(lines, compressor("gzip"))
@@ -0,0 +1,30 @@
+"""
+Service module for pushing list filters down into SQL
+"""
+
+from flask_sqlalchemy.model import Model
+from sqlalchemy import false, or_, Select
+
+
+def apply_filters(statement: Select, model: Model, filters: dict = None) -> Select:
+    """
+    Adds an equality WHERE clause to <statement> for each
+    entry in <filters>. Boolean flags are nullable so a
+    False filter also matches rows where the flag was
+    never set
+
+    Args:
+        statement (Select): select statement to filter
+        model (Model): model the filtered columns belong to
+        filters (dict): mapping of column name to value
+
+    Returns:
+        Select: filtered statement
+    """
+    for field, value in (filters or {}).items():
+        column = getattr(model, field)
+        if value is False:
+            statement = statement.where(or_(column == false(), column.is_(None)))
+        else:
+            statement = statement.where(column == value)
+    return statement
@@ -0,0 +1,85 @@
+"""
+Service module for writes guarded by database unique
+constraints
+"""
+
+from flask_sqlalchemy.model import Model
+from sqlalchemy.exc import IntegrityError
+
+from src.db import db
+
+
+def conflicting_field(instance: Model, values: dict, constraints: dict) -> str:
+    """
+    Finds the first unique constraint in <constraints> that
+    <values> violates. Only called after the database has
+    rejected a write, and each lookup is served by the
+    unique index backing the constraint
+
+    Args:
+        instance (Model): model object that failed to save
+        values (dict): attempted values of the constrained columns
+        constraints (dict): mapping of field label to the columns
+                            making up the unique constraint
+
+    Returns:
+        str: label of the conflicting field or None if no
+             constraint matched
+    """
+    model = type(instance)
+    for field, columns in constraints.items():
+        query = model.query.filter_by(**{c: values[c] for c in columns})
+        if values["id"] is not None:
+            query = query.filter(model.id != values["id"])
+        if query.first():
+            return field
+    return None
+
+
+def commit_unique(instance: Model, constraints: dict) -> str:
+    """
+    Commits <instance> in a single write and relies on the
+    database unique constraints to reject duplicates instead
+    of checking for them first
+
+    Args:
+        instance (Model): new or modified model object
+        constraints (dict): mapping of field label to the columns
+                            making up the unique constraint
+
+    Raises:
+        IntegrityError: if the error is not a known unique violation
+
+    Returns:
+        str: label of the conflicting field or None on success
+    """
+    # keep the attempted values as a rollback expires the instance
+    columns = {"id"}.union(*constraints.values())
+    values = {column: getattr(instance, column) for column in columns}
+    try:
+        db.session.add(instance)
+        db.session.commit()
+    except IntegrityError:
+        db.session.rollback()
+        field = conflicting_field(instance, values, constraints)
+        if not field:
+            raise
+        return field
+    return None
+
+
+def conflict_response(field: str) -> dict:
+    """
+    Builds the result returned when a unique constraint fails
+
+    Args:
+        field (str): label of the conflicting field
+
+    Returns:
+        dict: operation result message and status
+    """
+    return {
+        "message": f"{field} must be unique",
+        "status": 409,
+        "field": field,
+    }
@@ -0,0 +1,44 @@
+"""
+Service module providing keyset pagination for list
+queries
+"""
+
+from sqlalchemy import Column, Select
+
+from src.db import db
+
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 1000
+
+
+def paginate(statement: Select, key: Column, limit: int = None, after: int = None) -> dict:
+    """
+    Returns a single page of <statement> ordered by <key>. Rows
+    are selected with a WHERE <key> > <after> seek rather
+    than an OFFSET so the cost of a page does not depend
+    on its position in the table
+
+    Args:
+        statement (Select): select statement to paginate
+        key (Column): unique, indexed column to page on
+        limit (int): maximum number of rows in the page
+        after (int): key of the last row in the previous page
+
+    Returns:
+        dict: page rows and the cursor for the next page
+    """
+    if limit is None:
+        limit = DEFAULT_PAGE_SIZE
+    limit = max(1, min(limit, MAX_PAGE_SIZE))
+    if after is not None:
+        statement = statement.where(key > after)
+    # fetch one extra row to find out if another page exists
+    rows = db.session.execute(statement.order_by(key).limit(limit + 1)).all()
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = getattr(rows[-1], key.key)
+    return {
+        "data": rows,
+        "next": next_cursor,
+    }
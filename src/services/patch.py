@@ -0,0 +1,91 @@
+"""
+Service module for partial updates applied as a single
+UPDATE statement without reading the row first
+"""
+
+from datetime import datetime
+
+from flask_sqlalchemy.model import Model
+from sqlalchemy import update
+from sqlalchemy.exc import IntegrityError
+
+from src.db import db
+from src.services.integrity import conflict_response, conflicting_field
+
+
+def apply_patch(
+    model: Model,
+    row_id: int,
+    data: dict,
+    fields: tuple,
+    constraints: dict = None
+) -> dict:
+    """
+    Updates only the columns sent in <data> on the row of
+    <model> identified by <row_id>. The row is only read if
+    the database rejects the write, to find which unique
+    constraint failed
+
+    Args:
+        model (Model): model class to update
+        row_id (int): id of the row
+        data (dict): column values to set
+        fields (tuple): columns that may be patched
+        constraints (dict): mapping of field label to the columns
+                            making up each unique constraint
+
+    Raises:
+        IntegrityError: if the error is not a known unique violation
+
+    Returns:
+        dict: operation result message and status
+    """
+    name = model.__name__
+    if not isinstance(data, dict) or not data:
+        return {
+            "message": "No fields to update",
+            "status": 400,
+        }
+    unknown = sorted(set(data) - set(fields))
+    if unknown:
+        return {
+            "message": f"Fields cannot be updated: {', '.join(unknown)}",
+            "status": 400,
+        }
+    columns = model.__table__.columns
+    required = sorted(f for f, value in data.items() if value is None and not columns[f].nullable)
+    if required:
+        return {
+            "message": f"Fields cannot be null: {', '.join(required)}",
+            "status": 400,
+        }
+    values = dict(data)
+    if "updated" in columns:
+        values["updated"] = datetime.now().strftime("%m/%d/%Y:%H:%M:%S")
+    try:
+        updated = db.session.execute(
+            update(model)
+            .where(model.id == row_id)
+            .values(**values)
+            .execution_options(synchronize_session=False)
+        ).rowcount
+        db.session.commit()
+    except IntegrityError:
+        db.session.rollback()
+        row = db.session.get(model, row_id)
+        attempted = {"id": row_id}
+        for column in set().union(*(constraints or {}).values()):
+            attempted[column] = values.get(column, getattr(row, column))
+        field = conflicting_field(row, attempted, constraints or {})
+        if not field:
+            raise
+        return conflict_response(field)
+    if not updated:
+        return {
+            "message": f"{name} not found",
+            "status": 404,
+        }
+    return {
+        "message": f"{name} updated successfully",
+        "status": 200,
+    }
@@ -0,0 +1,36 @@
+"""
+Service module for the read-only query path. Reads select
+table columns with Core statements, so rows come back as
+named tuples instead of model objects and nothing is added
+to the session identity map. Rows support attribute access
+like model objects, so templates use them unchanged, and
+the JSON provider serializes them as dicts
+"""
+
+from flask_sqlalchemy.model import Model
+from sqlalchemy import select, Select
+
+
+def record_select(model: Model, fields: list = None) -> Select:
+    """
+    Builds a select of the columns of <model>, limited to
+    <fields> if given. The ID is always selected so rows can
+    be referenced and paged
+
+    Args:
+        model (Model): model whose table is read
+        fields (list): column names or None for every column
+
+    Raises:
+        ValueError: if a name is not a column of the model
+
+    Returns:
+        Select: select statement
+    """
+    columns = model.__table__.columns
+    if fields is None:
+        return select(*columns)
+    unknown = sorted({f for f in fields if f not in columns})
+    if unknown:
+        raise ValueError(f"Unknown fields: {', '.join(unknown)}")
+    return select(*(columns[name] for name in dict.fromkeys(["id", *fields])))
@@ -0,0 +1,426 @@
+"""
+Service module for Resource operations shared by the
+API and the HTML views
+"""
+
+from datetime import datetime
+
+from sqlalchemy import exists, func, insert, literal, Row, select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import aliased
+from sqlalchemy.sql.expression import Insert
+
+from src.db import db
+from src.models.resource import Resource
+from src.models.section import Section
+
+from src.services.filters import apply_filters
+from src.services.integrity import commit_unique, conflict_response
+from src.services.pagination import paginate
+from src.services.patch import apply_patch
+from src.services.records import record_select
+
+RESOURCE_TYPES = ("course", "video", "article", "documentation")
+
+# courses are imported along with their sections
+IMPORTABLE_TYPES = ("course", "video", "article", "documentation")
+
+# columns behind each unique index, checked in order
+RESOURCE_CONSTRAINTS = {
+    "Title": ("cert_id", "title"),
+    "URL": ("cert_id", "url"),
+}
+
+# fields that may be sent in a partial update
+RESOURCE_FIELDS = ("resource_type", "url", "title", "image", "description",
+                   "site_logo", "site_name", "has_og_data", "complete")
+
+
+def get_all_resources(filters: dict = None, fields: list = None) -> list:
+    """
+    Gets all Resources from the database matching <filters>
+    as read-only rows
+
+    Args:
+        filters (dict): mapping of column name to value
+        fields (list): columns to read or None for every column
+
+    Returns:
+        list: list of Resource rows
+    """
+    statement = apply_filters(record_select(Resource, fields), Resource, filters)
+    return db.session.execute(statement).all()
+
+
+def get_resources_page(
+    limit: int = None,
+    after: int = None,
+    filters: dict = None,
+    fields: list = None
+) -> dict:
+    """
+    Gets a page of Resources matching <filters> ordered by ID
+    as read-only rows
+
+    Args:
+        limit (int): maximum number of Resources to return
+        after (int): ID of the last Resource in the previous page
+        filters (dict): mapping of column name to value
+        fields (list): columns to read or None for every column
+
+    Returns:
+        dict: page of Resource rows and the next cursor
+    """
+    statement = apply_filters(record_select(Resource, fields), Resource, filters)
+    return paginate(statement, Resource.id, limit, after)
+
+
+def get_resource(resource_id: int) -> Resource:
+    """
+    Gets a Resource from the database by ID
+
+    Args:
+        resource_id (int): id of resource
+
+    Returns:
+        Resource: Resource object or None if not found
+    """
+    return Resource.query.filter_by(id=resource_id).first()
+
+
+def get_resource_record(resource_id: int, fields: list = None) -> Row:
+    """
+    Gets a Resource from the database by ID as a read-only row
+
+    Args:
+        resource_id (int): id of resource
+        fields (list): columns to read or None for every column
+
+    Returns:
+        Row: Resource row or None if not found
+    """
+    statement = record_select(Resource, fields).where(Resource.id == resource_id)
+    return db.session.execute(statement).first()
+
+
+def get_cert_resources(cert_id: int, resource_type: str = None) -> list:
+    """
+    Gets the Resources belonging to a Cert, optionally
+    limited to a single <resource_type>
+
+    Args:
+        cert_id (int): id of cert
+        resource_type (str): type of resource to fetch
+
+    Returns:
+        list: list of Resource rows
+    """
+    statement = record_select(Resource).where(Resource.cert_id == cert_id)
+    if resource_type:
+        statement = statement.where(Resource.resource_type == resource_type)
+    return db.session.execute(statement.order_by(Resource.id)).all()
+
+
+def get_import_candidates(cert_id: int) -> list:
+    """
+    Gets the Resources from other Certs that can be imported
+    into the Cert identified by <cert_id> in a single query.
+    Only the first Resource with a given title is returned
+    (a portable DISTINCT ON), and an anti-join skips titles
+    the Cert already has
+
+    Args:
+        cert_id (int): id of cert to import into
+
+    Returns:
+        list: list of Resource rows
+    """
+    own = aliased(Resource)
+    first_ids = select(func.min(Resource.id)) \
+        .where(Resource.cert_id != cert_id) \
+        .where(Resource.resource_type.in_(IMPORTABLE_TYPES)) \
+        .where(~exists().where(own.cert_id == cert_id, own.title == Resource.title)) \
+        .group_by(Resource.title)
+    statement = record_select(Resource) \
+        .where(Resource.id.in_(first_ids)) \
+        .order_by(Resource.id)
+    return db.session.execute(statement).all()
+
+
+def get_grouped_import_candidates(cert_id: int) -> dict:
+    """
+    Gets the import candidates for a Cert grouped by type
+
+    Args:
+        cert_id (int): id of cert to import into
+
+    Returns:
+        dict: mapping of each importable type to a list
+              of Resource rows
+    """
+    importable = {r_type: [] for r_type in IMPORTABLE_TYPES}
+    for resource in get_import_candidates(cert_id):
+        importable[resource.resource_type].append(resource)
+    return importable
+
+
+def create_resource(data: dict) -> dict:
+    """
+    Creates a Resource using the provided data
+
+    Args:
+        data (dict): resource data
+
+    Returns:
+        dict: operation result message and status,
+              plus the new Resource ID on success
+    """
+    # add default images if none provided
+    image = data["image"] if data.get("image") else "default_image.jpg"
+    logo = data["site_logo"] if data.get("site_logo") else "default_logo.png"
+    resource = Resource(
+        cert_id=data["cert_id"],
+        resource_type=data["resource_type"],
+        url=data["url"],
+        title=data["title"],
+        image=image,
+        description=data["description"],
+        site_logo=logo,
+        site_name=data["site_name"],
+        has_og_data=data["has_og_data"],
+        complete=data["complete"],
+        created=datetime.now().strftime("%m/%d/%Y:%H:%M:%S"),
+    )
+    conflict = commit_unique(resource, RESOURCE_CONSTRAINTS)
+    if conflict:
+        return conflict_response(conflict)
+    return {
+        "message": "Resource created successfully",
+        "status": 200,
+        "id": resource.id,
+    }
+
+
+def find_import_conflicts(cert_id: int, sources: list) -> dict:
+    """
+    Finds the source Resources that cannot be copied into the
+    Cert identified by <cert_id> because their title or URL is
+    already on the Cert or on an earlier source. Existing rows
+    are read with a single query
+
+    Args:
+        cert_id (int): id of cert to import into
+        sources (list): (id, title, url) rows to copy
+
+    Returns:
+        dict: mapping of source ID to conflicting field label
+    """
+    titles = {title for _, title, _ in sources}
+    urls = {url for _, _, url in sources}
+    taken = {"Title": set(), "URL": set()}
+    existing = db.session.query(Resource.title, Resource.url) \
+        .filter(Resource.cert_id == cert_id) \
+        .filter(Resource.title.in_(titles) | Resource.url.in_(urls))
+    for title, url in existing:
+        taken["Title"].add(title)
+        taken["URL"].add(url)
+    conflicts = {}
+    for source_id, title, url in sources:
+        if title in taken["Title"]:
+            conflicts[source_id] = "Title"
+        elif url in taken["URL"]:
+            conflicts[source_id] = "URL"
+        else:
+            taken["Title"].add(title)
+            taken["URL"].add(url)
+    return conflicts
+
+
+def copy_course_sections(cert_id: int, resource_ids: list) -> Insert:
+    """
+    Builds an INSERT ... SELECT copying the Sections of the
+    courses in <resource_ids> to the copies of those courses
+    on the Cert identified by <cert_id>. Each copy is found by
+    title, which is unique per Cert
+
+    Args:
+        cert_id (int): id of cert the courses were copied into
+        resource_ids (list): ids of the source resources
+
+    Returns:
+        Insert: statement copying the Sections
+    """
+    source = aliased(Resource)
+    target = aliased(Resource)
+    copy = select(
+        literal(cert_id),
+        target.id,
+        Section.number,
+        Section.title,
+        Section.cards_made,
+        Section.complete,
+        literal(datetime.now().strftime("%m/%d/%Y:%H:%M:%S")),
+    ) \
+        .join(source, Section.resource_id == source.id) \
+        .join(target, (target.cert_id == cert_id) & (target.title == source.title)) \
+        .where(source.id.in_(resource_ids)) \
+        .where(source.resource_type == "course")
+    columns = ["cert_id", "resource_id", "number", "title", "cards_made",
+               "complete", "created"]
+    return insert(Section).from_select(columns, copy)
+
+
+def import_resources(cert_id: int, resource_ids: list) -> dict:
+    """
+    Copies the Resources identified by <resource_ids> into the
+    Cert identified by <cert_id> with a single INSERT ... SELECT
+    in one transaction. Courses are deep copied: a second
+    INSERT ... SELECT copies all of their Sections, remapped to
+    the new course and Cert. The number of statements does not
+    depend on the number of Resources or Sections. Resources that
+    are missing or would break a unique constraint are skipped
+    and reported
+
+    Args:
+        cert_id (int): id of cert to import into
+        resource_ids (list): ids of resources to copy
+
+    Returns:
+        dict: operation result message and status, the number
+              of Resources imported and the skipped Resources
+    """
+    cert_id = int(cert_id)
+    resource_ids = [int(r_id) for r_id in dict.fromkeys(resource_ids)]
+    sources = db.session.query(Resource.id, Resource.title, Resource.url) \
+        .filter(Resource.id.in_(resource_ids)) \
+        .order_by(Resource.id) \
+        .all()
+    found = {source_id for source_id, _, _ in sources}
+    skipped = [
+        {"id": r_id, "message": "Resource not found"}
+        for r_id in resource_ids if r_id not in found
+    ]
+    conflicts = find_import_conflicts(cert_id, sources)
+    skipped.extend(
+        {"id": source_id, **conflict_response(field)}
+        for source_id, field in conflicts.items()
+    )
+    copy_ids = [source_id for source_id in found if source_id not in conflicts]
+    columns = ["cert_id", "resource_type", "url", "title", "image", "description",
+               "site_logo", "site_name", "has_og_data", "complete", "created"]
+    copy = select(
+        literal(cert_id),
+        Resource.resource_type,
+        Resource.url,
+        Resource.title,
+        Resource.image,
+        Resource.description,
+        Resource.site_logo,
+        Resource.site_name,
+        Resource.has_og_data,
+        Resource.complete,
+        literal(datetime.now().strftime("%m/%d/%Y:%H:%M:%S")),
+    ).where(Resource.id.in_(copy_ids))
+    imported = 0
+    if copy_ids:
+        try:
+            imported = db.session.execute(
+                insert(Resource).from_select(columns, copy)
+            ).rowcount
+            db.session.execute(copy_course_sections(cert_id, copy_ids))
+            db.session.commit()
+        except IntegrityError:
+            # a concurrent write took a title or URL after the check
+            db.session.rollback()
+            return {
+                "message": "Import conflicts with a concurrent change",
+                "status": 409,
+                "imported": 0,
+                "skipped": skipped,
+            }
+    return {
+        "message": f"{imported} resources imported",
+        "status": 200,
+        "imported": imported,
+        "skipped": skipped,
+    }
+
+
+def update_resource(resource_id: int, data: dict) -> dict:
+    """
+    Updates a Resource in the database
+
+    Args:
+        resource_id (int): id of resource
+        data (dict): resource data
+
+    Returns:
+        dict: operation result message and status
+    """
+    resource = get_resource(resource_id)
+    if not resource:
+        return {
+            "message": "Resource not found",
+            "status": 404,
+        }
+    # add default images if none provided
+    image = data["image"] if data.get("image") else "default_image.jpg"
+    logo = data["site_logo"] if data.get("site_logo") else "default_logo.png"
+    resource.resource_type = data["resource_type"]
+    resource.url = data["url"]
+    resource.title = data["title"]
+    resource.image = image
+    resource.description = data["description"]
+    resource.site_logo = logo
+    resource.site_name = data["site_name"]
+    resource.complete = data["complete"]
+    resource.updated = datetime.now().strftime("%m/%d/%Y:%H:%M:%S")
+    conflict = commit_unique(resource, RESOURCE_CONSTRAINTS)
+    if conflict:
+        return conflict_response(conflict)
+    return {
+        "message": "Resource updated successfully",
+        "status": 200,
+    }
+
+
+def patch_resource(resource_id: int, data: dict) -> dict:
+    """
+    Updates only the Resource fields sent in <data> with a
+    single UPDATE statement
+
+    Args:
+        resource_id (int): id of resource
+        data (dict): partial resource data
+
+    Returns:
+        dict: operation result message and status
+    """
+    return apply_patch(Resource, resource_id, data, RESOURCE_FIELDS, RESOURCE_CONSTRAINTS)
+
+
+def delete_resource(resource_id: int) -> dict:
+    """
+    Deletes a Resource from the database by ID along
+    with its sections in a single transaction
+
+    Args:
+        resource_id (int): id of resource
+
+    Returns:
+        dict: operation result message and status
+    """
+    resource = get_resource(resource_id)
+    if not resource:
+        return {
+            "message": "Resource not found",
+            "status": 404,
+        }
+    # cascaded by the foreign key where it is enforced
+    Section.query.filter_by(resource_id=resource_id).delete()
+    Resource.query.filter_by(id=resource_id).delete()
+    db.session.commit()
+    return {
+        "message": "Resource deleted successfully",
+        "status": 200
+    }
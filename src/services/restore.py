@@ -0,0 +1,426 @@
+"""
+Service module restoring an export into the database. Records
+are streamed in batches, IDs of parents are remapped to the
+IDs they are given here, and sections are written with COPY
+on PostgreSQL or a single executemany elsewhere. Each batch
+is committed on its own, so an interrupted restore can be
+resumed from the last batch reported
+"""
+
+import csv
+import io
+import itertools
+
+from typing import Callable, Iterator, TextIO
+
+from sqlalchemy import insert, or_, select
+
+from src.db import db
+from src.models.cert import Cert
+from src.models.resource import Resource
+from src.models.section import Section
+from src.services.export import EXPORT_MODELS
+from src.util.section_import import iter_json, iter_ndjson, JSONBuffer, SNIFF_SIZE
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# records written per statement and transaction
+RESTORE_BATCH_SIZE = 5000
+
+MAX_RESTORE_ERRORS = 50
+
+RESTORE_MODELS = {model.__tablename__: model for model in EXPORT_MODELS}
+
+# columns referencing rows restored earlier, by the table referenced
+FOREIGN_KEYS = {"cert_id": "certs", "resource_id": "resources"}
+
+
+def iter_records(lines: Iterator[str]) -> Iterator[tuple]:
+    """
+    Yields one record per non-empty line of NDJSON, decoded
+    with orjson when it is installed
+
+    Args:
+        lines (Iterator[str]): lines of text
+
+    Yields:
+        tuple: line number, record and error message
+    """
+    if orjson is None:
+        yield from iter_ndjson(lines)
+        return
+    # orjson is a compiled extension pylint cannot inspect
+    # pylint: disable=no-member
+    for line, text in enumerate(lines, start=1):
+        if not text.strip():
+            continue
+        try:
+            yield line, orjson.loads(text), None
+        except orjson.JSONDecodeError:
+            yield line, None, "JSON improperly formatted"
+
+
+def parse_export(stream: TextIO) -> Iterator[tuple]:
+    """
+    Returns a lazy iterator over the records of an export,
+    given either as NDJSON or as a JSON array
+
+    Args:
+        stream (TextIO): text stream of the export
+
+    Returns:
+        Iterator[tuple]: line number, record and error message
+    """
+    first = stream.read(SNIFF_SIZE)
+    if first.lstrip().startswith("["):
+        return iter_json(JSONBuffer(stream, first), wrapped=False)
+    # complete the last line so the chunk and stream split on a line boundary
+    if first and not first.endswith("\n"):
+        first += stream.readline()
+    return iter_records(itertools.chain(io.StringIO(first), stream))
+
+
+def restore_columns(model: type) -> tuple:
+    """
+    Gets the columns of <model> restored from an export and
+    the ones that cannot be null
+
+    Args:
+        model (type): model class
+
+    Returns:
+        tuple: restored column names, required column names and
+               the foreign key columns with the table they reference
+    """
+    columns = [c for c in model.__table__.columns if c.name != "id"]
+    return (
+        tuple(c.name for c in columns),
+        tuple(c.name for c in columns if not c.nullable),
+        tuple((c.name, FOREIGN_KEYS[c.name]) for c in columns if c.name in FOREIGN_KEYS),
+    )
+
+
+def copy_rows(model: type, columns: tuple, rows: list) -> None:
+    """
+    Writes <rows> to the table of <model> with a single COPY,
+    sent as CSV with unquoted empty fields read as NULL
+
+    Args:
+        model (type): model class
+        columns (tuple): column names in row order
+        rows (list): column values of each row
+    """
+    buffer = io.StringIO()
+    csv.writer(buffer, quoting=csv.QUOTE_NOTNULL).writerows(
+        [row[c] for c in columns] for row in rows
+    )
+    buffer.seek(0)
+    cursor = db.session.connection().connection.cursor()
+    try:
+        cursor.copy_expert(
+            f"COPY {model.__tablename__} ({', '.join(columns)}) FROM STDIN WITH (FORMAT csv)",
+            buffer
+        )
+    finally:
+        cursor.close()
+
+
+class Restore:
+    """
+    State of a restore: the IDs each exported parent was given,
+    the records pending in the current batch and the counts
+    reported back
+    """
+
+    def __init__(self, start: int, batch_size: int, progress: Callable) -> None:
+        """
+        Args:
+            start (int): number of records restored by an
+                         earlier, interrupted run
+            batch_size (int): records written per batch
+            progress (Callable): called with the records done and
+                                 the counts after each batch
+        """
+        self.start = start
+        self.batch_size = batch_size
+        self.progress = progress
+        self.ids = {table: {} for table in RESTORE_MODELS}
+        # IDs of the certs and resources that existed before the restore
+        self.matched = {"certs": set(), "resources": set()}
+        self.columns = {table: restore_columns(m) for table, m in RESTORE_MODELS.items()}
+        self.table = None
+        self.batch = []
+        self.done = 0
+        self.restored = dict.fromkeys(RESTORE_MODELS, 0)
+        self.existing = dict.fromkeys(RESTORE_MODELS, 0)
+        self.errors = []
+
+    def values(self, table: str, data: object) -> tuple:
+        """
+        Validates the data of one exported row and remaps the
+        IDs it references
+
+        Args:
+            table (str): name of the table of the row
+            data (object): exported column values
+
+        Returns:
+            tuple: column values to write and error message
+        """
+        if not isinstance(data, dict) or not isinstance(data.get("id"), int):
+            return None, "Record 'data' must be an object with an integer 'id'"
+        columns, required, foreign_keys = self.columns[table]
+        values = {c: data.get(c) for c in columns}
+        missing = [c for c in required if values[c] is None]
+        if missing:
+            return None, f"Missing fields: {', '.join(missing)}"
+        for column, parent in foreign_keys:
+            old_id = values[column]
+            if old_id is not None:
+                values[column] = self.ids[parent].get(old_id)
+                if values[column] is None:
+                    return None, f"{RESTORE_MODELS[parent].__name__} {old_id} not restored"
+        return values, None
+
+    def add(self, line: int, record: object) -> str:
+        """
+        Queues one export record, writing the batch first when it
+        is full or holds another table. Sections an earlier run
+        already restored are skipped, while certs and resources
+        are still matched to find their new IDs
+
+        Args:
+            line (int): line number of the record
+            record (object): decoded record
+
+        Returns:
+            str: error message or None if the record is valid
+        """
+        if not isinstance(record, dict) or record.get("table") not in RESTORE_MODELS:
+            return f"Record must have a 'table' of {', '.join(RESTORE_MODELS)}"
+        table = record["table"]
+        # parents are written first so the IDs they reference are known
+        if table != self.table or len(self.batch) == self.batch_size:
+            self.flush()
+            self.table = table
+        values, error = self.values(table, record.get("data"))
+        if error:
+            return error
+        if table != "sections" or self.done + len(self.batch) >= self.start:
+            self.batch.append((line, record["data"]["id"], values))
+        else:
+            self.done += 1
+        return None
+
+    def match(self, rows: list) -> dict:
+        """
+        Finds certs or resources of the batch that already exist,
+        by their unique columns
+
+        Args:
+            rows (list): column values of each row of the batch
+
+        Returns:
+            dict: ID of each existing row keyed by the batch index
+        """
+        found = {}
+        if self.table == "certs":
+            existing = db.session.execute(select(Cert.id, Cert.code, Cert.name).where(or_(
+                Cert.code.in_({r["code"] for r in rows}),
+                Cert.name.in_({r["name"] for r in rows}),
+            ))).all()
+            keys = {("code", r.code): r.id for r in existing}
+            keys.update({("name", r.name): r.id for r in existing})
+            for index, row in enumerate(rows):
+                row_id = keys.get(("code", row["code"])) or keys.get(("name", row["name"]))
+                if row_id:
+                    found[index] = row_id
+            return found
+        existing = db.session.execute(
+            select(Resource.id, Resource.cert_id, Resource.url, Resource.title).where(
+                Resource.cert_id.in_({r["cert_id"] for r in rows}),
+                or_(
+                    Resource.url.in_({r["url"] for r in rows}),
+                    Resource.title.in_({r["title"] for r in rows}),
+                ),
+            )
+        ).all()
+        keys = {("url", r.cert_id, r.url): r.id for r in existing}
+        keys.update({("title", r.cert_id, r.title): r.id for r in existing})
+        for index, row in enumerate(rows):
+            row_id = keys.get(("url", row["cert_id"], row["url"])) \
+                or keys.get(("title", row["cert_id"], row["title"]))
+            if row_id:
+                found[index] = row_id
+        return found
+
+    def write_parents(self, model: type) -> None:
+        """
+        Inserts the certs or resources of the batch that do not
+        exist yet and records the ID of every row
+
+        Args:
+            model (type): Cert or Resource
+        """
+        rows = [values for _, _, values in self.batch]
+        found = self.match(rows)
+        new = [row for index, row in enumerate(rows) if index not in found]
+        new_ids = iter(db.session.scalars(
+            insert(model).returning(model.id, sort_by_parameter_order=True),
+            new
+        ).all() if new else ())
+        ids = self.ids[self.table]
+        for index, (_, old_id, _) in enumerate(self.batch):
+            ids[old_id] = found[index] if index in found else next(new_ids)
+        self.matched[self.table].update(found.values())
+        self.restored[self.table] += len(new)
+        self.existing[self.table] += len(found)
+
+    def existing_sections(self, rows: list) -> set:
+        """
+        Finds sections of the batch that already exist under a
+        cert or resource the restore matched, by their parents,
+        number and title
+
+        Args:
+            rows (list): column values of each section of the batch
+
+        Returns:
+            set: (cert_id, resource_id, number, title) of each
+                 existing section
+        """
+        resources = {
+            r["resource_id"] for r in rows if r["resource_id"] in self.matched["resources"]
+        }
+        certs = {
+            r["cert_id"] for r in rows
+            if r["resource_id"] is None and r["cert_id"] in self.matched["certs"]
+        }
+        if not resources and not certs:
+            return set()
+        existing = db.session.execute(
+            select(Section.cert_id, Section.resource_id, Section.number, Section.title).where(or_(
+                Section.resource_id.in_(resources),
+                Section.resource_id.is_(None) & Section.cert_id.in_(certs),
+            ))
+        ).all()
+        return {tuple(row) for row in existing}
+
+    def write_sections(self) -> None:
+        """
+        Inserts the sections of the batch with COPY on PostgreSQL
+        and a single executemany otherwise. Sections that already
+        exist under a matched parent are skipped
+        """
+        rows = [values for _, _, values in self.batch]
+        existing = self.existing_sections(rows)
+        if existing:
+            rows = [
+                r for r in rows
+                if (r["cert_id"], r["resource_id"], r["number"], r["title"]) not in existing
+            ]
+            self.existing["sections"] += len(self.batch) - len(rows)
+        if not rows:
+            return
+        columns = self.columns["sections"][0]
+        connection = db.session.connection()
+        if connection.dialect.driver == "psycopg2":
+            copy_rows(Section, columns, rows)
+        elif connection.dialect.name == "sqlite":
+            # values need no conversion, so the statement goes straight to the driver
+            connection.exec_driver_sql(
+                f"INSERT INTO {Section.__tablename__} ({', '.join(columns)}) "
+                f"VALUES ({', '.join('?' * len(columns))})",
+                [tuple(row[c] for c in columns) for row in rows]
+            )
+        else:
+            db.session.execute(insert(Section.__table__), rows)
+        self.restored["sections"] += len(rows)
+
+    def flush(self) -> None:
+        """
+        Writes and commits the pending batch and reports progress
+        """
+        if not self.batch:
+            return
+        if self.table == "sections":
+            self.write_sections()
+        else:
+            self.write_parents(RESTORE_MODELS[self.table])
+        db.session.commit()
+        self.done += len(self.batch)
+        self.batch = []
+        if self.progress:
+            self.progress(self.done, self.counts())
+
+    def counts(self) -> dict:
+        """
+        Gets the number of rows restored and matched so far
+
+        Returns:
+            dict: new and existing rows by table
+        """
+        return {"restored": dict(self.restored), "existing": dict(self.existing)}
+
+
+def restore(
+    stream: TextIO,
+    start: int = 0,
+    progress: Callable = None,
+    batch_size: int = RESTORE_BATCH_SIZE
+) -> dict:
+    """
+    Restores an export of certs, resources and sections given
+    as NDJSON or a JSON array. Parents must come before the
+    rows that reference them, as they do in an export. Certs
+    and resources that already exist are matched by their
+    unique columns and not written again, as are the sections
+    under them with the same number and title, so an export can
+    be restored into a database that is not empty. Invalid
+    records are skipped and reported by line until
+    MAX_RESTORE_ERRORS is reached.
+
+    Each batch is committed as it is written. To resume an
+    interrupted restore, pass the number of records the last
+    progress report gave as <start>
+
+    Args:
+        stream (TextIO): text stream of the export
+        start (int): number of records already restored
+        progress (Callable): called with the number of records
+                             done and the counts after each batch
+        batch_size (int): records written per batch
+
+    Returns:
+        dict: operation result message and status, the number of
+              records done and the rows restored and matched by
+              table, plus the per-line errors if there were any
+    """
+    state = Restore(start, batch_size, progress)
+    for line, record, error in parse_export(stream):
+        error = error or state.add(line, record)
+        if error:
+            state.errors.append({"line": line, "message": error})
+            if len(state.errors) == MAX_RESTORE_ERRORS:
+                db.session.rollback()
+                return {
+                    "message": f"Restore stopped after {MAX_RESTORE_ERRORS} errors",
+                    "status": 400,
+                    "done": state.done,
+                    **state.counts(),
+                    "errors": state.errors,
+                }
+    state.flush()
+    result = {
+        "message": "Restore completed successfully",
+        "status": 200,
+        "done": state.done,
+        **state.counts(),
+    }
+    if state.errors:
+        result["message"] = f"Restore completed, {len(state.errors)} records skipped"
+        result["errors"] = state.errors
+    return result
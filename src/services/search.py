@@ -0,0 +1,72 @@
+"""
+Service module for searching Resources and Sections
+across all Certs
+"""
+
+from src.models.cert import Cert
+from src.models.resource import Resource
+from src.models.section import Section
+
+from src.db import db
+from src.search import find
+from src.services.records import record_select
+from src.services.resource import RESOURCE_TYPES
+
+SEARCH_LIMIT = 50
+MAX_SEARCH_LIMIT = 500
+
+
+def search_library(query: str, limit: int = SEARCH_LIMIT) -> dict:
+    """
+    Finds the Resources matching <query> by title, description,
+    site name or URL and the Sections matching it by title.
+    Both lists are ranked by relevance
+
+    Args:
+        query (str): raw search query
+        limit (int): maximum number of hits of each kind
+
+    Returns:
+        dict: matching Resource and Section rows
+    """
+    return {
+        "resources": find(Resource, query, limit),
+        "sections": find(Section, query, limit),
+    }
+
+
+def group_hits(hits: dict) -> dict:
+    """
+    Groups search hits by type and then by Cert for display.
+    Resources are grouped under their resource type and
+    Sections under "section". The Certs and the courses the
+    Sections belong to are loaded in one query each
+
+    Args:
+        hits (dict): result of search_library()
+
+    Returns:
+        dict: the grouped hits along with the Certs and
+              courses they reference, keyed by ID
+    """
+    groups = {r_type: {} for r_type in [*RESOURCE_TYPES, "section"]}
+    for resource in hits["resources"]:
+        group = groups.setdefault(resource.resource_type, {})
+        group.setdefault(resource.cert_id, []).append(resource)
+    for section in hits["sections"]:
+        groups["section"].setdefault(section.cert_id, []).append(section)
+    cert_ids = {c_id for group in groups.values() for c_id in group}
+    course_ids = {s.resource_id for s in hits["sections"]}
+    return {
+        "groups": {k: v for k, v in groups.items() if v},
+        "certs": {
+            c.id: c for c in db.session.execute(
+                record_select(Cert).where(Cert.id.in_(cert_ids))
+            )
+        },
+        "courses": {
+            r.id: r for r in db.session.execute(
+                record_select(Resource).where(Resource.id.in_(course_ids))
+            )
+        },
+    }
@@ -0,0 +1,459 @@
+"""
+Service module for Section operations shared by the
+API and the HTML views
+"""
+
+from datetime import datetime
+from typing import TextIO
+
+from sqlalchemy import case, insert, Row, update
+
+from src.db import db
+from src.models.section import Section
+
+from src.services.filters import apply_filters
+from src.services.pagination import paginate
+from src.services.patch import apply_patch
+from src.services.records import record_select
+
+from src.util.section_import import parse_sections
+
+# rows sent to the database per executemany when streaming an import
+IMPORT_BATCH_SIZE = 500
+
+# errors collected before a streamed import stops reading
+MAX_IMPORT_ERRORS = 50
+
+# flags a progress update may change
+PROGRESS_FIELDS = ("complete", "cards_made")
+
+# fields that may be sent in a partial update
+SECTION_FIELDS = ("number", "title", "cards_made", "complete")
+
+
+def get_all_sections(filters: dict = None, fields: list = None) -> list:
+    """
+    Gets all Sections from the database matching <filters>
+    as read-only rows
+
+    Args:
+        filters (dict): mapping of column name to value
+        fields (list): columns to read or None for every column
+
+    Returns:
+        list: list of Section rows
+    """
+    statement = apply_filters(record_select(Section, fields), Section, filters)
+    return db.session.execute(statement).all()
+
+
+def get_sections_page(
+    limit: int = None,
+    after: int = None,
+    filters: dict = None,
+    fields: list = None
+) -> dict:
+    """
+    Gets a page of Sections matching <filters> ordered by ID
+    as read-only rows
+
+    Args:
+        limit (int): maximum number of Sections to return
+        after (int): ID of the last Section in the previous page
+        filters (dict): mapping of column name to value
+        fields (list): columns to read or None for every column
+
+    Returns:
+        dict: page of Section rows and the next cursor
+    """
+    statement = apply_filters(record_select(Section, fields), Section, filters)
+    return paginate(statement, Section.id, limit, after)
+
+
+def get_section(section_id: int) -> Section:
+    """
+    Gets a Section from the database by ID
+
+    Args:
+        section_id (int): id of section
+
+    Returns:
+        Section: Section object or None if not found
+    """
+    return Section.query.filter_by(id=section_id).first()
+
+
+def get_section_record(section_id: int, fields: list = None) -> Row:
+    """
+    Gets a Section from the database by ID as a read-only row
+
+    Args:
+        section_id (int): id of section
+        fields (list): columns to read or None for every column
+
+    Returns:
+        Row: Section row or None if not found
+    """
+    statement = record_select(Section, fields).where(Section.id == section_id)
+    return db.session.execute(statement).first()
+
+
+def get_cert_sections(cert_id: int) -> list:
+    """
+    Gets the Sections belonging to a Cert ordered by
+    course and then by section number
+
+    Args:
+        cert_id (int): id of cert
+
+    Returns:
+        list: list of Section rows
+    """
+    statement = record_select(Section) \
+        .where(Section.cert_id == cert_id) \
+        .order_by(Section.resource_id, Section.number, Section.id)
+    return db.session.execute(statement).all()
+
+
+def get_course_sections(cert_id: int) -> dict:
+    """
+    Gets the Sections belonging to a Cert grouped by the
+    ID of the course they belong to. Each group is ordered
+    by section number
+
+    Args:
+        cert_id (int): id of cert
+
+    Returns:
+        dict: mapping of resource ID to list of Section rows
+    """
+    grouped = {}
+    for section in get_cert_sections(cert_id):
+        grouped.setdefault(section.resource_id, []).append(section)
+    return grouped
+
+
+def create_section(data: dict) -> dict:
+    """
+    Creates a Section using the provided data
+
+    Args:
+        data (dict): section data
+
+    Returns:
+        dict: operation result message and status,
+              plus the new Section ID on success
+    """
+    section = Section(
+        cert_id=data["cert_id"],
+        resource_id=data["resource_id"],
+        number=data["number"],
+        title=data["title"],
+        created=datetime.now().strftime("%m/%d/%Y:%H:%M:%S"),
+    )
+    db.session.add(section)
+    db.session.commit()
+    return {
+        "message": "Section created successfully",
+        "status": 200,
+        "id": section.id,
+    }
+
+
+def section_error(section: dict) -> str:
+    """
+    Validates a single imported section
+
+    Args:
+        section (dict): section object with a number and title
+
+    Returns:
+        str: error message or None if the section is valid
+    """
+    if not isinstance(section, dict) or len(section) != 2:
+        return "Invalid number of section fields found"
+    if "number" not in section or "title" not in section:
+        return "Incorrect section fields found"
+    if isinstance(section["number"], bool) or not isinstance(section["number"], int):
+        return "Section number must be an integer"
+    if not isinstance(section["title"], str) or not section["title"].strip():
+        return "Section title must be a non-empty string"
+    if len(section["title"]) > 255:
+        return "Section title must be at most 255 characters"
+    return None
+
+
+def validate_sections(sections: list) -> list:
+    """
+    Validates every section in <sections>
+
+    Args:
+        sections (list): section objects with a number and title
+
+    Returns:
+        list: error message for each invalid row, numbered from 1
+    """
+    errors = []
+    for row, section in enumerate(sections, start=1):
+        message = section_error(section)
+        if message:
+            errors.append({"row": row, "message": message})
+    return errors
+
+
+def create_sections(cert_id: int, resource_id: int, sections: list) -> dict:
+    """
+    Creates Sections on a course from a list of section objects.
+    The whole list is validated first and then inserted with
+    one executemany in a single transaction, so either every
+    Section is created or none are
+
+    Args:
+        cert_id (int): id of cert
+        resource_id (int): id of course resource
+        sections (list): section objects with a number and title
+
+    Returns:
+        dict: operation result message and status, plus the
+              per-row errors if validation fails
+    """
+    if not isinstance(sections, list):
+        return {
+            "message": "List of 'sections' not found",
+            "status": 400,
+        }
+    errors = validate_sections(sections)
+    if errors:
+        return {
+            "message": "Invalid sections",
+            "status": 400,
+            "errors": errors,
+        }
+    created = datetime.now().strftime("%m/%d/%Y:%H:%M:%S")
+    if sections:
+        db.session.execute(insert(Section), [
+            {
+                "cert_id": cert_id,
+                "resource_id": resource_id,
+                "number": section["number"],
+                "title": section["title"],
+                "created": created,
+            } for section in sections
+        ])
+        db.session.commit()
+    return {
+        "message": f"{len(sections)} sections created",
+        "status": 200,
+        "created": len(sections),
+    }
+
+
+def import_sections(cert_id: int, resource_id: int, stream: TextIO) -> dict:
+    """
+    Streams Sections from a JSON, NDJSON or CSV import into a
+    course. Rows are parsed, validated and inserted in batches
+    of IMPORT_BATCH_SIZE inside one transaction, so memory use
+    stays bounded however large the import is. Any invalid row
+    rolls the whole import back and errors are reported by line
+
+    Args:
+        cert_id (int): id of cert
+        resource_id (int): id of course resource
+        stream (TextIO): text stream of the import
+
+    Returns:
+        dict: operation result message and status, the detected
+              format and the number of Sections created or the
+              per-line errors
+    """
+    import_format, rows = parse_sections(stream)
+    created = datetime.now().strftime("%m/%d/%Y:%H:%M:%S")
+    errors = []
+    batch = []
+    count = 0
+    for line, section, error in rows:
+        error = error or section_error(section)
+        if error:
+            errors.append({"line": line, "message": error})
+            if len(errors) == MAX_IMPORT_ERRORS:
+                break
+        elif not errors:
+            batch.append({
+                "cert_id": cert_id,
+                "resource_id": resource_id,
+                "number": section["number"],
+                "title": section["title"],
+                "created": created,
+            })
+            if len(batch) == IMPORT_BATCH_SIZE:
+                db.session.execute(insert(Section), batch)
+                count += len(batch)
+                batch = []
+    if errors:
+        db.session.rollback()
+        return {
+            "message": errors[0]["message"],
+            "status": 400,
+            "format": import_format,
+            "errors": errors,
+        }
+    if batch:
+        db.session.execute(insert(Section), batch)
+        count += len(batch)
+    db.session.commit()
+    return {
+        "message": f"{import_format} imported successfully",
+        "status": 200,
+        "format": import_format,
+        "created": count,
+    }
+
+
+def progress_error(delta: dict) -> str:
+    """
+    Validates a single section progress delta
+
+    Args:
+        delta (dict): section ID with 'complete' and/or
+                      'cards_made' flags
+
+    Returns:
+        str: error message or None if the delta is valid
+    """
+    if not isinstance(delta, dict):
+        return "Progress update must be an object"
+    section_id = delta.get("section_id")
+    if isinstance(section_id, bool) or not isinstance(section_id, int):
+        return "Section ID must be an integer"
+    flags = [f for f in PROGRESS_FIELDS if f in delta]
+    if not flags:
+        return "No progress fields found"
+    if any(not isinstance(delta[f], bool) for f in flags):
+        return "Progress fields must be true or false"
+    return None
+
+
+def update_progress(deltas: list) -> dict:
+    """
+    Applies many section progress deltas with a single UPDATE.
+    Deltas for the same Section are merged with later values
+    winning, and each flag is set with a CASE on the Section ID
+    so fields left out of a delta keep their current value
+
+    Args:
+        deltas (list): objects with a 'section_id' and the
+                       'complete' and/or 'cards_made' flags
+
+    Returns:
+        dict: operation result message and status, plus the
+              number of Sections updated or the per-item errors
+    """
+    if not isinstance(deltas, list):
+        return {
+            "message": "List of 'sections' not found",
+            "status": 400,
+        }
+    errors = []
+    for index, delta in enumerate(deltas):
+        message = progress_error(delta)
+        if message:
+            errors.append({"index": index, "message": message})
+    if errors:
+        return {
+            "message": "Invalid progress updates",
+            "status": 400,
+            "errors": errors,
+        }
+    merged = {}
+    for delta in deltas:
+        merged.setdefault(delta["section_id"], {}).update(
+            {f: delta[f] for f in PROGRESS_FIELDS if f in delta}
+        )
+    values = {}
+    for field in PROGRESS_FIELDS:
+        column = getattr(Section, field)
+        whens = {s_id: flags[field] for s_id, flags in merged.items() if field in flags}
+        if whens:
+            values[field] = case(whens, value=Section.id, else_=column)
+    updated = 0
+    if merged:
+        values["updated"] = datetime.now().strftime("%m/%d/%Y:%H:%M:%S")
+        updated = db.session.execute(
+            update(Section)
+            .where(Section.id.in_(merged))
+            .values(**values)
+            .execution_options(synchronize_session=False)
+        ).rowcount
+        db.session.commit()
+    return {
+        "message": f"{updated} sections updated",
+        "status": 200,
+        "updated": updated,
+    }
+
+
+def update_section(section_id: int, data: dict) -> dict:
+    """
+    Updates a Section in the database
+
+    Args:
+        section_id (int): id of section
+        data (dict): section data
+
+    Returns:
+        dict: operation result message and status
+    """
+    section = get_section(section_id)
+    if not section:
+        return {
+            "message": "Section not found",
+            "status": 404,
+        }
+    section.number = data["number"]
+    section.title = data["title"]
+    section.cards_made = data["cards_made"]
+    section.complete = data["complete"]
+    section.updated = datetime.now().strftime("%m/%d/%Y:%H:%M:%S")
+    db.session.commit()
+    return {
+        "message": "Section updated successfully",
+        "status": 200,
+    }
+
+
+def patch_section(section_id: int, data: dict) -> dict:
+    """
+    Updates only the Section fields sent in <data> with a
+    single UPDATE statement
+
+    Args:
+        section_id (int): id of section
+        data (dict): partial section data
+
+    Returns:
+        dict: operation result message and status
+    """
+    return apply_patch(Section, section_id, data, SECTION_FIELDS)
+
+
+def delete_section(section_id: int) -> dict:
+    """
+    Deletes a Section from the database by ID
+
+    Args:
+        section_id (int): id of section
+
+    Returns:
+        dict: operation result message and status
+    """
+    deletions = Section.query.filter_by(id=section_id).delete()
+    if deletions > 0:
+        db.session.commit()
+        return {
+            "message": "Section deleted successfully",
+            "status": 200
+        }
+    return {
+        "message": "Section not found",
+        "status": 404,
+    }
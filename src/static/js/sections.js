@@ -176,3 +176,87 @@ function hideSectionJSONForm(resourceId) {
     importJsonBtn.classList.remove("hidden");
   }
 }
+
+/**
+ * Milliseconds to wait after the last checkbox change
+ * before sending the queued section updates
+ */
+const SECTION_UPDATE_DELAY = 800;
+
+/**
+ * Section progress changes waiting to be sent, keyed by
+ * section ID so repeated changes to a section coalesce
+ */
+const sectionUpdateQueue = new Map();
+let sectionUpdateTimer = null;
+
+/**
+ * Queues the progress of a section after one of its
+ * checkboxes changes and schedules a batched update
+ *
+ * @param {number} sectionID
+ * @param {number} courseID
+ * @param {number} sectionNumber
+ */
+function queueSectionUpdate(sectionID, courseID, sectionNumber) {
+  const cardsMade = document.getElementById(
+    `course-${courseID}-section-${sectionNumber}-cards_made`
+  );
+  const complete = document.getElementById(
+    `course-${courseID}-section-${sectionNumber}-complete`
+  );
+  sectionUpdateQueue.set(sectionID, {
+    section_id: sectionID,
+    cards_made: cardsMade.checked,
+    complete: complete.checked,
+  });
+  clearTimeout(sectionUpdateTimer);
+  sectionUpdateTimer = setTimeout(flushSectionUpdates, SECTION_UPDATE_DELAY);
+}
+
+/**
+ * Sends all queued section updates in a single request.
+ * Updates that fail with a network or server error are
+ * queued again unless a newer change to the same section
+ * is already waiting
+ *
+ * @param {boolean} keepalive let the request outlive the page
+ */
+function flushSectionUpdates(keepalive = false) {
+  clearTimeout(sectionUpdateTimer);
+  if (sectionUpdateQueue.size === 0) {
+    return;
+  }
+  const sections = Array.from(sectionUpdateQueue.values());
+  sectionUpdateQueue.clear();
+  const token = document.querySelector("input[name='csrf_token']");
+  fetch("/update/sections", {
+    method: "POST",
+    keepalive: keepalive,
+    headers: {
+      "Content-Type": "application/json",
+      "X-CSRFToken": token ? token.value : "",
+    },
+    body: JSON.stringify({ sections: sections }),
+  })
+    .then((response) => {
+      // server errors are retried, rejected updates are not
+      if (response.status >= 500) {
+        throw new Error(`Section update failed: ${response.status}`);
+      }
+      if (!response.ok) {
+        console.error(`Section update rejected: ${response.status}`);
+      }
+    })
+    .catch(() => {
+      sections.forEach((section) => {
+        if (!sectionUpdateQueue.has(section.section_id)) {
+          sectionUpdateQueue.set(section.section_id, section);
+        }
+      });
+      sectionUpdateTimer = setTimeout(flushSectionUpdates, SECTION_UPDATE_DELAY);
+    });
+}
+
+// send anything still queued when the user leaves the page
+window.addEventListener("pagehide", () => flushSectionUpdates(true));
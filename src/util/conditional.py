@@ -0,0 +1,92 @@
+"""
+Utils for answering conditional GET requests from the table
+versions instead of building the response again
+"""
+
+import hashlib
+import time
+
+from datetime import datetime, timezone
+from functools import wraps
+from typing import Callable
+
+from flask import current_app, request, Response, session
+
+from src.compression import etag_variants
+from src.versions import get_versions
+
+# pages embed CSRF tokens which expire after an hour by default,
+# so a cached page is revalidated at least this often (seconds)
+PAGE_WINDOW = 1800
+
+
+def version_tag(tables: tuple, page: bool) -> tuple:
+    """
+    Builds the entity tag and last modified time of a response
+    built from <tables>
+
+    Args:
+        tables (tuple): names of the tables the response reads
+        page (bool): True if the response is a rendered page
+
+    Returns:
+        tuple: entity tag and last modified datetime
+    """
+    versions = get_versions(tables)
+    key = ";".join(f"{t}:{versions.get(t, (0, 0))[0]}" for t in sorted(tables))
+    if page:
+        window = int(time.time()) // PAGE_WINDOW
+        key += f";{session.get('csrf_token', '')};{window}"
+    modified = max((m for _, m in versions.values()), default=0)
+    return (
+        hashlib.sha1(key.encode()).hexdigest(),
+        datetime.fromtimestamp(modified, timezone.utc),
+    )
+
+
+def conditional(*tables: str, page: bool = False) -> Callable:
+    """
+    Decorates a view so GET requests carry an ETag and
+    Last-Modified derived from the versions of <tables>. When
+    the client's copy is current a 304 is returned without
+    calling the view, so nothing is queried, serialized or
+    rendered beyond the version lookup.
+
+    API responses get strong tags. Pages get weak tags as the
+    CSRF tokens they embed differ between renders, and are
+    always rendered when there are flashed messages to show
+
+    Args:
+        tables (str): names of the tables the view reads
+        page (bool): True if the view renders a page
+
+    Returns:
+        Callable: decorator
+    """
+    def decorator(view: Callable) -> Callable:
+        @wraps(view)
+        def wrapper(*args, **kwargs) -> Response:
+            if request.method not in ("GET", "HEAD") or (page and "_flashes" in session):
+                return view(*args, **kwargs)
+            etag, modified = version_tag(tables, page)
+            # compressed responses carry the tag of their encoding
+            current = None
+            if request.if_none_match:
+                current = next((
+                    tag for tag in etag_variants(etag)
+                    if request.if_none_match.contains_weak(tag)
+                ), None)
+            elif request.if_modified_since and modified <= request.if_modified_since:
+                current = etag
+            if current:
+                response = Response(status=304)
+                response.set_etag(current, weak=page)
+            else:
+                response = current_app.make_response(view(*args, **kwargs))
+                response.set_etag(etag, weak=page)
+            response.last_modified = modified
+            response.cache_control.no_cache = True
+            response.cache_control.private = page or None
+            return response
+        return wrapper
+    return decorator
@@ -7,13 +7,9 @@ import shutil
 
 from pathlib import Path
 
-import requests
-
 from werkzeug.datastructures import FileStorage
 from werkzeug.utils import secure_filename
 
-API_URL = f"http://127.0.0.1:5000/api/v{os.environ["API_VERSION"]}"
-
 PROJECT_ROOT = os.path.abspath(
     os.path.join(
         __file__,
@@ -56,17 +52,14 @@ def handle_image_upload(img: FileStorage, cert_dir: str, logo=False) -> str:
     return os.path.join(cert_dir, filename)
 
 
-def remove_images(cert_id: int) -> None:
+def remove_images(cert_code: str) -> None:
     """
     Deletes the image directory for the cert identified 
-    by <cert_id>
+    by <cert_code>
 
     Args:
-        cert_id (int): Cert object id
+        cert_code (str): Cert object code
     """
-    # get the cert code so the image directory can be deleted
-    response = requests.get(f"{API_URL}/cert/{cert_id}", timeout=2)
-    data = response.json()
-    cert_dir = data["code"].lower().replace("-", "")
+    cert_dir = cert_code.lower().replace("-", "")
     full_path = Path(os.path.join(f"{UPLOAD_PATH}", cert_dir))
     shutil.rmtree(str(full_path), ignore_errors=True)
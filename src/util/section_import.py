@@ -0,0 +1,278 @@
+"""
+Utils for parsing section imports incrementally. JSON arrays
+(optionally wrapped in {"sections": [...]}), NDJSON and CSV
+are read in fixed-size chunks so memory use does not grow
+with the size of the import
+"""
+
+import csv
+import io
+import itertools
+import json
+
+from typing import Iterator, TextIO
+
+CHUNK_SIZE = 64 * 1024
+
+# text read up front to detect the import format
+SNIFF_SIZE = 1024
+
+# largest single JSON row buffered before giving up
+MAX_ROW_SIZE = 1024 * 1024
+
+DECODER = json.JSONDecoder()
+
+
+class JSONBuffer:
+    """
+    Sliding window over a text stream that decodes one JSON
+    value at a time and tracks the current line number
+    """
+
+    def __init__(self, stream: TextIO, text: str) -> None:
+        """
+        Args:
+            stream (TextIO): stream to read further chunks from
+            text (str): text already read from the stream
+        """
+        self.stream = stream
+        self.text = text
+        self.pos = 0
+        self.line = 1
+        self.eof = False
+
+    def fill(self) -> bool:
+        """
+        Drops the consumed text and reads the next chunk
+
+        Returns:
+            bool: False if the stream is exhausted
+        """
+        chunk = self.stream.read(CHUNK_SIZE)
+        if not chunk:
+            self.eof = True
+            return False
+        self.text = self.text[self.pos:] + chunk
+        self.pos = 0
+        return True
+
+    def advance(self, end: int) -> None:
+        """
+        Moves past the text up to <end>
+
+        Args:
+            end (int): new position in the buffer
+        """
+        self.line += self.text.count("\n", self.pos, end)
+        self.pos = end
+
+    def peek(self) -> str:
+        """
+        Skips whitespace and returns the next character
+
+        Returns:
+            str: next character or "" at the end of the stream
+        """
+        while True:
+            end = self.pos
+            while end < len(self.text) and self.text[end].isspace():
+                end += 1
+            self.advance(end)
+            if self.pos < len(self.text):
+                return self.text[self.pos]
+            if not self.fill():
+                return ""
+
+    def decode(self) -> object:
+        """
+        Decodes the JSON value at the current position, reading
+        more chunks until the value is complete
+
+        Raises:
+            ValueError: if the value is invalid or too large
+
+        Returns:
+            object: decoded value
+        """
+        while True:
+            try:
+                value, end = DECODER.raw_decode(self.text, self.pos)
+                # a value ending with the buffer may continue in the next chunk
+                if end < len(self.text) or self.eof or not self.fill():
+                    self.advance(end)
+                    return value
+            except json.JSONDecodeError as e:
+                if self.eof or len(self.text) - self.pos > MAX_ROW_SIZE:
+                    raise ValueError("JSON improperly formatted") from e
+                if not self.fill():
+                    raise ValueError("JSON improperly formatted") from e
+
+
+def find_key(buffer: JSONBuffer, key: str) -> bool:
+    """
+    Moves through the object at the current position to the
+    value of <key>, skipping the values of the keys before it
+
+    Args:
+        buffer (JSONBuffer): buffer positioned at the object
+        key (str): key to find
+
+    Raises:
+        ValueError: if the object is invalid
+
+    Returns:
+        bool: True if the buffer is positioned at the value
+    """
+    if buffer.peek() != "{":
+        return False
+    buffer.advance(buffer.pos + 1)
+    while buffer.peek() not in ("}", ""):
+        name = buffer.decode()
+        if not isinstance(name, str) or buffer.peek() != ":":
+            raise ValueError("JSON improperly formatted")
+        buffer.advance(buffer.pos + 1)
+        if name == key:
+            return True
+        buffer.peek()
+        buffer.decode()
+        char = buffer.peek()
+        if char == ",":
+            buffer.advance(buffer.pos + 1)
+        elif char != "}":
+            raise ValueError("JSON improperly formatted")
+    return False
+
+
+def is_ndjson(text: str) -> bool:
+    """
+    Checks if <text> starts with a line holding a complete JSON
+    object that is a row rather than a wrapped import
+
+    Args:
+        text (str): start of the import
+
+    Returns:
+        bool: True if the import is NDJSON
+    """
+    line = next((line for line in text.splitlines() if line.strip()), "")
+    try:
+        value = json.loads(line)
+    except json.JSONDecodeError:
+        return False
+    return isinstance(value, dict) and not isinstance(value.get("sections"), list)
+
+
+def iter_json(buffer: JSONBuffer, wrapped: bool) -> Iterator[tuple]:
+    """
+    Yields the items of a JSON array one at a time. A wrapped
+    array may be under a "sections" key anywhere in the object,
+    the values of the keys before it are skipped
+
+    Args:
+        buffer (JSONBuffer): buffer positioned at the start
+        wrapped (bool): True if the array is the value of a
+                        "sections" key of an object
+
+    Yields:
+        tuple: line number, section and error message
+    """
+    try:
+        if wrapped and not find_key(buffer, "sections"):
+            yield buffer.line, None, "List of 'sections' not found"
+            return
+        if buffer.peek() != "[":
+            message = "List of 'sections' not found"
+            yield buffer.line, None, message
+            return
+        buffer.advance(buffer.pos + 1)
+        if buffer.peek() == "]":
+            return
+        while True:
+            line = buffer.line
+            yield line, buffer.decode(), None
+            char = buffer.peek()
+            if char == "]":
+                return
+            if char != ",":
+                raise ValueError("JSON improperly formatted")
+            buffer.advance(buffer.pos + 1)
+            buffer.peek()
+    except ValueError as e:
+        yield buffer.line, None, str(e)
+
+
+def iter_ndjson(lines: Iterator[str]) -> Iterator[tuple]:
+    """
+    Yields one section per non-empty line of NDJSON
+
+    Args:
+        lines (Iterator[str]): lines of text
+
+    Yields:
+        tuple: line number, section and error message
+    """
+    for line, text in enumerate(lines, start=1):
+        if not text.strip():
+            continue
+        try:
+            yield line, json.loads(text), None
+        except json.JSONDecodeError:
+            yield line, None, "JSON improperly formatted"
+
+
+def iter_csv(lines: Iterator[str]) -> Iterator[tuple]:
+    """
+    Yields one section per CSV row of number and title. A
+    "number,title" header row is skipped
+
+    Args:
+        lines (Iterator[str]): lines of text
+
+    Yields:
+        tuple: line number, section and error message
+    """
+    reader = csv.reader(lines)
+    for row in reader:
+        if not row or row == [""]:
+            continue
+        if reader.line_num == 1 and [c.strip().lower() for c in row] == ["number", "title"]:
+            continue
+        if len(row) != 2:
+            yield reader.line_num, row, None
+            continue
+        number, title = row[0].strip(), row[1].strip()
+        yield reader.line_num, {
+            "number": int(number) if number.isdigit() else number,
+            "title": title,
+        }, None
+
+
+def parse_sections(stream: TextIO) -> tuple:
+    """
+    Detects the format of a section import from its first
+    SNIFF_SIZE characters and returns a lazy iterator over its
+    rows. An object is read as NDJSON if its first line is a
+    complete row, otherwise as an object holding a "sections"
+    array. Rows are (line, section, error) tuples where error
+    is a message if the row could not be parsed
+
+    Args:
+        stream (TextIO): text stream of the import
+
+    Returns:
+        tuple: format name and row iterator
+    """
+    first = stream.read(SNIFF_SIZE)
+    stripped = first.lstrip()
+    if stripped.startswith("["):
+        return "JSON", iter_json(JSONBuffer(stream, first), wrapped=False)
+    # complete the last line so the chunk and stream split on a line
+    # boundary, reading no more than one row of a single-line document
+    if first and not first.endswith("\n"):
+        first += stream.readline(MAX_ROW_SIZE)
+    if stripped.startswith("{") and not is_ndjson(first):
+        return "JSON", iter_json(JSONBuffer(stream, first), wrapped=True)
+    lines = itertools.chain(io.StringIO(first), stream)
+    if stripped.startswith("{"):
+        return "NDJSON", iter_ndjson(lines)
+    return "CSV", iter_csv(lines)
@@ -0,0 +1,79 @@
+"""
+Module tracking a version number and last modified time for
+each table. Every insert, update or delete bumps the version
+of the table through a database trigger, so bulk statements
+are counted along with ORM writes. Reading the versions is a
+single primary key lookup, used to validate cached responses
+"""
+
+from sqlalchemy import select, text
+
+from src.db import db
+from src.models.version import Version
+
+VERSIONED_TABLES = ("certs", "resources", "sections")
+
+SQLITE_NOW = "CAST(strftime('%s', 'now') AS INTEGER)"
+
+PG_NOW = "CAST(extract(epoch FROM now()) AS BIGINT)"
+
+
+def create_version_triggers(table: str) -> None:
+    """
+    Creates the version row and the triggers bumping it for
+    <table> if they do not exist. PostgreSQL bumps the version
+    once per statement and SQLite, which only has row
+    triggers, once per changed row
+
+    Args:
+        table (str): name of a versioned table
+    """
+    dialect = db.engine.dialect.name
+    if dialect not in ("postgresql", "sqlite"):
+        return
+    now = PG_NOW if dialect == "postgresql" else SQLITE_NOW
+    bump = f"UPDATE versions SET version = version + 1, modified = {now} WHERE name = '{table}'"
+    with db.engine.begin() as conn:
+        exists = conn.execute(
+            text("SELECT 1 FROM versions WHERE name = :name"),
+            {"name": table}
+        ).first()
+        if exists:
+            return
+        conn.execute(text(
+            f"INSERT INTO versions (name, version, modified) VALUES ('{table}', 1, {now})"
+        ))
+        if dialect == "postgresql":
+            conn.execute(text(
+                f"CREATE OR REPLACE FUNCTION {table}_version() RETURNS trigger AS $$ "
+                f"BEGIN {bump}; RETURN NULL; END $$ LANGUAGE plpgsql"
+            ))
+            conn.execute(text(
+                f"CREATE TRIGGER {table}_version "
+                f"AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON {table} "
+                f"FOR EACH STATEMENT EXECUTE FUNCTION {table}_version()"
+            ))
+            return
+        for event in ("INSERT", "UPDATE", "DELETE"):
+            conn.execute(text(
+                f"CREATE TRIGGER IF NOT EXISTS {table}_version_{event.lower()} "
+                f"AFTER {event} ON {table} BEGIN {bump}; END"
+            ))
+
+
+def get_versions(tables: tuple) -> dict:
+    """
+    Gets the version and last modified time of each table in
+    <tables> in a single query
+
+    Args:
+        tables (tuple): names of versioned tables
+
+    Returns:
+        dict: (version, modified) tuples keyed by table name
+    """
+    rows = db.session.execute(
+        select(Version.name, Version.version, Version.modified)
+        .where(Version.name.in_(tables))
+    )
+    return {name: (version, modified) for name, version, modified in rows}
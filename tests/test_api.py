@@ -2,8 +2,9 @@
 API operations test module
 """
 
-# pylint: disable=duplicate-code
+# pylint: disable=duplicate-code, too-many-public-methods, too-many-lines
 
+import gzip
 import json
 import os
 
@@ -11,7 +12,9 @@ import requests
 
 from flask import Flask
 from flask.testing import FlaskClient
+from sqlalchemy import event
 
+from src.db import db
 from src.models.cert import Cert
 from src.models.resource import Resource
 from src.models.section import Section
@@ -182,6 +185,30 @@ class TestAPI:
             data["status"] == 200 and \
             section.title == "Test section"
 
+    def test_post_sections_bulk(self, client: FlaskClient) -> None:
+        """
+        Assert that a list of Sections is created in one request
+        and that invalid rows are reported by row number
+
+        Args:
+            client (FlaskClient): Flask app test client
+        """
+        sections = [{"number": 1, "title": "One"}, {"number": 2, "title": "Two"}]
+        created = client.post(
+            f"{self.api_url}/section/bulk",
+            data=json.dumps({"cert_id": 1, "resource_id": 1, "sections": sections}),
+            headers={"Content-Type": "application/json"},
+        ).json
+        invalid = client.post(
+            f"{self.api_url}/section/bulk",
+            data=json.dumps({"cert_id": 1, "resource_id": 1, "sections": [{"title": "x"}]}),
+            headers={"Content-Type": "application/json"},
+        ).json
+        assert \
+            created["created"] == 2 and \
+            invalid["status"] == 400 and \
+            invalid["errors"] == [{"row": 1, "message": "Invalid number of section fields found"}]
+
     # ========== Test Read ==========
 
     def test_get_cert_returns_all_certs(self, client: FlaskClient) -> None:
@@ -244,6 +271,112 @@ class TestAPI:
         response = client.get("/api/v1/section")
         assert len(response.json) == 2
 
+    def test_get_cert_paginates_with_limit(self, client: FlaskClient) -> None:
+        """
+        Asserts that the API returns pages of Cert objects with a
+        cursor pointing at the next page
+
+        Args:
+            client (FlaskClient): client returned by fixture
+        """
+        cert_data = [self.cert_data_1, self.cert_data_2]
+        for _, cert in enumerate(cert_data):
+            requests.post(
+                url=f"{self.api_url}/cert",
+                data=json.dumps(cert),
+                headers={"Content-Type": "application/json"},
+                timeout=2
+            )
+        first = client.get("/api/v1/cert?limit=1").json
+        second = client.get(f"/api/v1/cert?limit=1&after={first["next"]}").json
+        assert \
+            [c["name"] for c in first["data"]] == ["Test"] and \
+            first["next"] == 1 and \
+            [c["name"] for c in second["data"]] == ["Test2"] and \
+            second["next"] is None
+
+    def test_get_section_paginates_after_cursor(self, client: FlaskClient) -> None:
+        """
+        Asserts that the API returns the Section objects after the
+        given cursor using the default page size
+
+        Args:
+            client (FlaskClient): client returned by fixture
+        """
+        section_data = [self.section_data_1, self.section_data_2]
+        for _, section in enumerate(section_data):
+            requests.post(
+                url=f"{self.api_url}/section",
+                data=json.dumps(section),
+                headers={"Content-Type": "application/json"},
+                timeout=2
+            )
+        response = client.get("/api/v1/section?after=1")
+        assert \
+            [s["id"] for s in response.json["data"]] == [2] and \
+            response.json["next"] is None
+
+    def test_get_paginated_rejects_invalid_cursor(self, client: FlaskClient) -> None:
+        """
+        Asserts that the API rejects a 'limit' or 'after' that
+        is not a positive integer instead of ignoring it
+
+        Args:
+            client (FlaskClient): client returned by fixture
+        """
+        queries = ["cert?after=abc", "section?limit=0", "resource?limit=-1", "cert?limit=1.5"]
+        responses = [client.get(f"/api/v1/{query}").json for query in queries]
+        assert all(response["status"] == 400 for response in responses)
+
+    def test_get_resource_filters_by_type(self, client: FlaskClient) -> None:
+        """
+        Asserts that the API only returns Resource objects matching
+        the query string filters
+
+        Args:
+            client (FlaskClient): client returned by fixture
+        """
+        resource_data = [self.resource_data_1, self.resource_data_2]
+        for _, resource in enumerate(resource_data):
+            requests.post(
+                url=f"{self.api_url}/resource",
+                data=json.dumps(resource),
+                headers={"Content-Type": "application/json"},
+                timeout=2
+            )
+        response = client.get("/api/v1/resource?cert_id=1&resource_type=article")
+        assert [r["title"] for r in response.json] == ["Test article"]
+
+    def test_get_section_filters_unset_flag_as_false(self, client: FlaskClient) -> None:
+        """
+        Asserts that filtering on complete=false matches Section
+        objects whose flag has never been set
+
+        Args:
+            client (FlaskClient): client returned by fixture
+        """
+        requests.post(
+            url=f"{self.api_url}/section",
+            data=json.dumps(self.section_data_1),
+            headers={"Content-Type": "application/json"},
+            timeout=2
+        )
+        incomplete = client.get("/api/v1/section?complete=false")
+        complete = client.get("/api/v1/section?complete=true")
+        assert len(incomplete.json) == 1 and len(complete.json) == 0
+
+    def test_get_resource_invalid_filter_returns_400(self, client: FlaskClient) -> None:
+        """
+        Asserts 400 status is returned if a filter value is invalid
+
+        Args:
+            client (FlaskClient): client returned by fixture
+        """
+        response = client.get("/api/v1/resource?cert_id=one")
+        assert \
+            response.json["message"] == "Invalid value for 'cert_id'" and \
+            response.json["status"] == 400
+
     def test_get_cert_returns_cert_by_id(self, client: FlaskClient) -> None:
         """
         Asserts that the API gets and returns a Cert object
@@ -295,6 +428,59 @@ class TestAPI:
         response = client.get("/api/v1/section/1")
         assert response.json["title"] == "Test section"
 
+    def test_get_cert_bundle_groups_resources(self, client: FlaskClient) -> None:
+        """
+        Asserts that the API returns a Cert bundle with resources
+        grouped by type and the import candidates from other certs
+
+        Args:
+            client (FlaskClient): client returned by fixture
+        """
+        cert_data = [self.cert_data_1, self.cert_data_2]
+        for _, cert in enumerate(cert_data):
+            requests.post(
+                url=f"{self.api_url}/cert",
+                data=json.dumps(cert),
+                headers={"Content-Type": "application/json"},
+                timeout=2
+            )
+        # add the article to cert 2 so it can be imported into cert 1
+        self.resource_data_2["cert_id"] = 2
+        resource_data = [self.resource_data_1, self.resource_data_2]
+        for _, resource in enumerate(resource_data):
+            requests.post(
+                url=f"{self.api_url}/resource",
+                data=json.dumps(resource),
+                headers={"Content-Type": "application/json"},
+                timeout=2
+            )
+        requests.post(
+            url=f"{self.api_url}/section",
+            data=json.dumps(self.section_data_1),
+            headers={"Content-Type": "application/json"},
+            timeout=2
+        )
+        response = client.get("/api/v1/cert/1/bundle")
+        data = response.json
+        assert \
+            data["cert"]["name"] == "Test" and \
+            [r["title"] for r in data["resources"]["course"]] == ["Test course"] and \
+            not data["resources"]["article"] and \
+            [s["title"] for s in data["sections"]["1"]] == ["Test section"] and \
+            [r["title"] for r in data["importable"]["article"]] == ["Test article"]
+
+    def test_get_cert_bundle_returns_404(self, client: FlaskClient) -> None:
+        """
+        Asserts 404 status is returned if the Cert object does not exist
+
+        Args:
+            client (FlaskClient): client returned by fixture
+        """
+        response = client.get("/api/v1/cert/1/bundle")
+        assert \
+            response.json["message"] == "Cert not found" and \
+            response.json["status"] == 404
+
     # ========== Test Update ==========
 
     def test_put_cert_updates_correctly(self, client: FlaskClient) -> None:
@@ -322,6 +508,53 @@ class TestAPI:
             update_response.json["status"] == 200 and \
             data["name"] == "Test2"
 
+    def test_patch_cert_updates_sent_fields(self, client: FlaskClient) -> None:
+        """
+        Asserts that PATCH only changes the fields sent
+
+        Args:
+            client (FlaskClient): client returned by fixture
+        """
+        client.post(
+            f"{self.api_url}/cert",
+            data=json.dumps(self.cert_data_1),
+            headers={"Content-Type": "application/json"},
+        )
+        update_response = client.patch(
+            f"{self.api_url}/cert/1",
+            data=json.dumps({"exam_date": "30/11/2024"}),
+            headers={"Content-Type": "application/json"},
+        )
+        data = client.get(f"{self.api_url}/cert/1").json
+        assert \
+            update_response.json["message"] == "Cert updated successfully" and \
+            data["exam_date"] == "30/11/2024" and \
+            data["name"] == "Test"
+
+    def test_patch_rejects_unknown_and_missing(self, client: FlaskClient) -> None:
+        """
+        Asserts that PATCH rejects fields that cannot be updated and
+        returns 404 if the Section does not exist
+
+        Args:
+            client (FlaskClient): client returned by fixture
+        """
+        unknown = client.patch(
+            f"{self.api_url}/section/1",
+            data=json.dumps({"cert_id": 2}),
+            headers={"Content-Type": "application/json"},
+        ).json
+        missing = client.patch(
+            f"{self.api_url}/section/1",
+            data=json.dumps({"complete": True}),
+            headers={"Content-Type": "application/json"},
+        ).json
+        assert \
+            unknown["message"] == "Fields cannot be updated: cert_id" and \
+            unknown["status"] == 400 and \
+            missing["message"] == "Section not found" and \
+            missing["status"] == 404
+
     def test_put_cert_returns_404(self, client: FlaskClient) -> None:
         """
         Asserts 404 status is returned if the Cert object does not exist
@@ -485,3 +718,367 @@ class TestAPI:
         assert \
             response.json["message"] == "Section not found" and \
             response.json["status"] == 404
+
+    def test_import_resources(self, app: Flask, client: FlaskClient) -> None:
+        """
+        Asserts Resources are copied into another Cert
+
+        Args:
+            app (Flask): Flask app instance
+            client (FlaskClient): Flask app test client
+        """
+        client.post(
+            f"{self.api_url}/resource",
+            data=json.dumps(self.resource_data_2),
+            headers={"Content-Type": "application/json"},
+        )
+        response = client.post(
+            f"{self.api_url}/resource/import",
+            data=json.dumps({"cert_id": 2, "resource_ids": [1]}),
+            headers={"Content-Type": "application/json"},
+        )
+        with app.app_context():
+            copy = Resource.query.filter_by(cert_id=2).first()
+        assert \
+            response.json["imported"] == 1 and \
+            not response.json["skipped"] and \
+            copy.title == "Test article"
+
+    # ========== Test Search ==========
+
+    def test_search_finds_resources_and_sections(self, client: FlaskClient) -> None:
+        """
+        Asserts Resources are matched by site name and URL and
+        Sections by title
+
+        Args:
+            client (FlaskClient): Flask app test client
+        """
+        for path, data in (
+            ("resource", self.resource_data_1),
+            ("resource", self.resource_data_2),
+            ("section", self.section_data_1),
+        ):
+            client.post(
+                f"{self.api_url}/{path}",
+                data=json.dumps(data),
+                headers={"Content-Type": "application/json"},
+            )
+        by_site = client.get(f"{self.api_url}/search?q=test 2").json
+        by_url = client.get(f"{self.api_url}/search?q=test.test2").json
+        by_title = client.get(f"{self.api_url}/search?q=section").json
+        assert \
+            [r["title"] for r in by_site["resources"]] == ["Test article"] and \
+            [r["title"] for r in by_url["resources"]] == ["Test article"] and \
+            [s["title"] for s in by_title["sections"]] == ["Test section"] and \
+            not by_title["resources"]
+
+    def test_search_returns_400_without_term(self, client: FlaskClient) -> None:
+        """
+        Asserts a 400 status is returned if no search term is sent
+
+        Args:
+            client (FlaskClient): Flask app test client
+        """
+        response = client.get(f"{self.api_url}/search?q=")
+        assert \
+            response.json["message"] == "Missing search term 'q'" and \
+            response.json["status"] == 400
+
+    # ========== Test Sparse Fieldsets ==========
+
+    def test_get_returns_requested_fields(self, app: Flask, client: FlaskClient) -> None:
+        """
+        Asserts only the requested columns and the ID are read
+        and returned for lists, pages and single rows
+
+        Args:
+            app (Flask): Flask app instance
+            client (FlaskClient): Flask app test client
+        """
+        statements = []
+
+        def record(_conn, _cursor, statement, *_) -> None:
+            statements.append(statement)
+
+        for data in (self.resource_data_1, self.resource_data_2):
+            client.post(
+                f"{self.api_url}/resource",
+                data=json.dumps(data),
+                headers={"Content-Type": "application/json"},
+            )
+        with app.app_context():
+            event.listen(db.engine, "before_cursor_execute", record)
+            listed = client.get(f"{self.api_url}/resource?fields=title,complete").json
+            event.remove(db.engine, "before_cursor_execute", record)
+        page = client.get(f"{self.api_url}/resource?fields=title&limit=1").json
+        single = client.get(f"{self.api_url}/resource/2?fields=url").json
+        assert \
+            listed == [
+                {"id": 1, "title": "Test course", "complete": False},
+                {"id": 2, "title": "Test article", "complete": False},
+            ] and \
+            not any("description" in statement for statement in statements) and \
+            page["data"] == [{"id": 1, "title": "Test course"}] and \
+            page["next"] == 1 and \
+            single == {"id": 2, "url": "http://test.test2"}
+
+    def test_get_rejects_unknown_fields(self, client: FlaskClient) -> None:
+        """
+        Asserts a 400 status is returned for names that are not
+        columns of the model
+
+        Args:
+            client (FlaskClient): Flask app test client
+        """
+        response = client.get(f"{self.api_url}/section?fields=title,resources,foo")
+        assert \
+            response.json["message"] == "Unknown fields: foo, resources" and \
+            response.json["status"] == 400
+
+    # ========== Test Conditional GET ==========
+
+    def test_get_returns_304_until_changed(self, app: Flask, client: FlaskClient) -> None:
+        """
+        Asserts a request sending the current ETag gets a 304
+        after a single version lookup and a full response once
+        the Cert has changed
+
+        Args:
+            app (Flask): Flask app instance
+            client (FlaskClient): Flask app test client
+        """
+        statements = []
+
+        def count(*_) -> None:
+            statements.append(1)
+
+        client.post(
+            f"{self.api_url}/cert",
+            data=json.dumps(self.cert_data_1),
+            headers={"Content-Type": "application/json"},
+        )
+        first = client.get(f"{self.api_url}/cert")
+        etag = first.headers["ETag"]
+        with app.app_context():
+            event.listen(db.engine, "before_cursor_execute", count)
+            cached = client.get(f"{self.api_url}/cert", headers={"If-None-Match": etag})
+            event.remove(db.engine, "before_cursor_execute", count)
+        client.patch(
+            f"{self.api_url}/cert/1",
+            data=json.dumps({"tags": "changed"}),
+            headers={"Content-Type": "application/json"},
+        )
+        changed = client.get(f"{self.api_url}/cert", headers={"If-None-Match": etag})
+        assert \
+            not etag.startswith("W/") and \
+            cached.status_code == 304 and \
+            not cached.data and \
+            len(statements) == 1 and \
+            changed.status_code == 200 and \
+            changed.headers["ETag"] != etag and \
+            changed.json[0]["tags"] == "changed"
+
+    def test_get_honours_if_modified_since(self, client: FlaskClient) -> None:
+        """
+        Asserts a request sending the Last-Modified time of an
+        unchanged table gets a 304
+
+        Args:
+            client (FlaskClient): Flask app test client
+        """
+        first = client.get(f"{self.api_url}/resource")
+        cached = client.get(
+            f"{self.api_url}/resource",
+            headers={"If-Modified-Since": first.headers["Last-Modified"]}
+        )
+        assert \
+            first.headers["Cache-Control"] == "no-cache" and \
+            cached.status_code == 304
+
+    # ========== Test Batch ==========
+
+    def test_batch_references_earlier_results(self, app: Flask, client: FlaskClient) -> None:
+        """
+        Asserts a Cert, a course and a Section on it are created
+        in one batch with later operations using the new IDs
+
+        Args:
+            app (Flask): Flask app instance
+            client (FlaskClient): Flask app test client
+        """
+        resource = {**self.resource_data_1, "cert_id": "$0.id"}
+        section = {**self.section_data_1, "cert_id": "$0.id", "resource_id": "$1.id"}
+        response = client.post(
+            f"{self.api_url}/batch",
+            data=json.dumps({"operations": [
+                {"method": "POST", "path": "/cert", "body": self.cert_data_1},
+                {"method": "POST", "path": "/resource", "body": resource},
+                {"method": "POST", "path": "/section", "body": section},
+                {"method": "GET", "path": "/resource/$1.id"},
+            ]}),
+            headers={"Content-Type": "application/json"},
+        ).json
+        with app.app_context():
+            saved = Section.query.filter_by(title="Test section").first()
+            course = db.session.get(Resource, saved.resource_id)
+        assert \
+            response["status"] == 200 and \
+            len(response["results"]) == 4 and \
+            response["results"][3]["title"] == "Test course" and \
+            course.cert_id == response["results"][0]["id"]
+
+    def test_batch_saves_nothing_on_failure(self, app: Flask, client: FlaskClient) -> None:
+        """
+        Asserts every change in a batch is discarded when an
+        operation fails and the failing result is returned
+
+        Args:
+            app (Flask): Flask app instance
+            client (FlaskClient): Flask app test client
+        """
+        response = client.post(
+            f"{self.api_url}/batch",
+            data=json.dumps({"operations": [
+                {"method": "POST", "path": "/cert", "body": self.cert_data_1},
+                {"method": "PATCH", "path": "/cert/$0.id", "body": {"tags": "batch"}},
+                {"method": "POST", "path": "/cert", "body": self.cert_data_1},
+                {"method": "POST", "path": "/cert", "body": self.cert_data_2},
+            ]}),
+            headers={"Content-Type": "application/json"},
+        ).json
+        with app.app_context():
+            certs = Cert.query.count()
+        assert \
+            response["status"] == 409 and \
+            response["failed"] == 2 and \
+            response["results"][2]["field"] == "Name" and \
+            len(response["results"]) == 3 and \
+            certs == 0
+
+    def test_batch_keeps_dollar_signs_in_text(self, app: Flask, client: FlaskClient) -> None:
+        """
+        Asserts text containing '$' in a title or description is
+        saved as sent rather than read as a reference
+
+        Args:
+            app (Flask): Flask app instance
+            client (FlaskClient): Flask app test client
+        """
+        cert = {**self.cert_data_1, "name": "Cert costs $5.99"}
+        resource = {**self.resource_data_1, "cert_id": "$0.id",
+                    "description": "price $0.id here"}
+        response = client.post(
+            f"{self.api_url}/batch",
+            data=json.dumps({"operations": [
+                {"method": "POST", "path": "/cert", "body": cert},
+                {"method": "POST", "path": "/resource", "body": resource},
+            ]}),
+            headers={"Content-Type": "application/json"},
+        ).json
+        with app.app_context():
+            saved_cert = Cert.query.first()
+            saved_resource = Resource.query.first()
+        assert \
+            response["status"] == 200 and \
+            saved_cert.name == "Cert costs $5.99" and \
+            saved_resource.description == "price $0.id here" and \
+            saved_resource.cert_id == saved_cert.id
+
+    def test_batch_reports_operations_that_raise(self, app: Flask, client: FlaskClient) -> None:
+        """
+        Asserts an operation missing a required field or sent
+        without a body fails the batch with a JSON result and
+        nothing is saved
+
+        Args:
+            app (Flask): Flask app instance
+            client (FlaskClient): Flask app test client
+        """
+        def post(operations: list) -> dict:
+            response = client.post(
+                f"{self.api_url}/batch",
+                data=json.dumps({"operations": operations}),
+                headers={"Content-Type": "application/json"},
+            )
+            return response.is_json and response.json
+
+        cert = {key: value for key, value in self.cert_data_1.items() if key != "name"}
+        missing = post([
+            {"method": "POST", "path": "/cert", "body": self.cert_data_2},
+            {"method": "POST", "path": "/cert", "body": cert},
+        ])
+        no_body = post([
+            {"method": "POST", "path": "/cert", "body": self.cert_data_2},
+            {"method": "POST", "path": "/cert"},
+        ])
+        with app.app_context():
+            certs = Cert.query.count()
+        assert \
+            missing["status"] == 400 and \
+            missing["failed"] == 1 and \
+            missing["results"][1]["message"] == "Missing field: name" and \
+            400 <= no_body["status"] < 500 and \
+            no_body["failed"] == 1 and \
+            len(no_body["results"]) == 2 and \
+            certs == 0
+
+    def test_batch_rejects_invalid_operations(self, client: FlaskClient) -> None:
+        """
+        Asserts invalid operations, unknown paths and references
+        to missing results are rejected
+
+        Args:
+            client (FlaskClient): Flask app test client
+        """
+        def post(operations: list) -> dict:
+            return client.post(
+                f"{self.api_url}/batch",
+                data=json.dumps({"operations": operations}),
+                headers={"Content-Type": "application/json"},
+            ).json
+
+        invalid = post([{"method": "TRACE", "path": "/cert"}])
+        unknown = post([{"method": "GET", "path": "/unknown"}])
+        nested = post([{"method": "POST", "path": "/batch", "body": {"operations": []}}])
+        reference = post([{"method": "GET", "path": "/cert/$1.id"}])
+        assert \
+            invalid["message"].startswith("Operation 0: Method must be one of") and \
+            unknown["status"] == 404 and \
+            nested["results"][0]["message"] == "Operation not allowed in a batch" and \
+            reference["message"] == "Operation 0: unresolved reference '$1.id'"
+
+    # ========== Test Export ==========
+
+    def test_export_streams_ndjson(self, client: FlaskClient) -> None:
+        """
+        Asserts every row is exported as one line, parents first,
+        and that the gzip export holds the same lines
+
+        Args:
+            client (FlaskClient): Flask app test client
+        """
+        for path, data in (
+            ("cert", self.cert_data_1),
+            ("resource", self.resource_data_1),
+            ("section", self.section_data_1),
+            ("section", self.section_data_2),
+        ):
+            client.post(
+                f"{self.api_url}/{path}",
+                data=json.dumps(data),
+                headers={"Content-Type": "application/json"},
+            )
+        # read each streamed body before the next request
+        response = client.get(f"{self.api_url}/export")
+        streamed = response.is_streamed
+        body = response.data
+        compressed = client.get(f"{self.api_url}/export?gzip=true")
+        tables = [json.loads(line)["table"] for line in body.splitlines()]
+        assert \
+            streamed and \
+            response.mimetype == "application/x-ndjson" and \
+            tables == ["certs", "resources", "sections", "sections"] and \
+            json.loads(body.splitlines()[3])["data"]["title"] == "Test section 2" and \
+            compressed.mimetype == "application/gzip" and \
+            gzip.decompress(compressed.data) == body
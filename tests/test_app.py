@@ -2,8 +2,17 @@
 Test module for the Flask app
 """
 
+import gzip
+import json
+
+from flask import Flask, Response
+from flask.json.provider import DefaultJSONProvider
 from flask.testing import FlaskClient
 
+from src import compression, json_provider
+from src.db import db
+from src.models.cert import Cert
+
 
 class TestApp:
     """
@@ -61,3 +70,149 @@ class TestApp:
         """
         response = client.get("/")
         assert "X-Frame-Options" in response.headers
+
+    # ===== Test JSON Provider =====
+
+    def test_json_provider_matches_default_provider(self, app: Flask, monkeypatch) -> None:
+        """
+        Assert models and integer keys are serialized to the same
+        document with orjson, the standard library fallback and
+        Flask's default provider
+
+        Args:
+            app (Flask): Flask app instance
+            monkeypatch (MonkeyPatch): pytest monkeypatch fixture
+        """
+        cert = Cert(id=1, name="Test", code="tst-101", head_img="h.png",
+                    badge_img="b.png", tags="test", created="01/01/2000")
+        data = {"certs": [cert], "groups": {1: [cert]}}
+        with app.app_context():
+            expected = json.loads(DefaultJSONProvider(app).dumps(data))
+            fast = json.loads(app.json.response(data).get_data())
+            monkeypatch.setattr(json_provider, "orjson", None)
+            fallback = json.loads(app.json.response(data).get_data())
+        assert \
+            fast == expected and \
+            fallback == expected and \
+            fast["groups"]["1"][0]["name"] == "Test"
+
+    # ===== Test Compression =====
+
+    def test_response_compressed_with_gzip(self, client: FlaskClient) -> None:
+        """
+        Assert a large response is gzipped for a client accepting
+        gzip, keeps the security headers and is revalidated with
+        the tag of its encoding
+
+        Args:
+            client (FlaskClient): client returned by fixture
+        """
+        plain = client.get("/certs")
+        response = client.get("/certs", headers={"Accept-Encoding": "gzip"})
+        cached = client.get("/certs", headers={
+            "Accept-Encoding": "gzip",
+            "If-None-Match": response.headers["ETag"],
+        })
+        assert \
+            response.headers["Content-Encoding"] == "gzip" and \
+            "Accept-Encoding" in response.headers["Vary"] and \
+            "Content-Security-Policy" in response.headers and \
+            gzip.decompress(response.data) == plain.data and \
+            response.headers["ETag"].endswith('-gzip"') and \
+            cached.status_code == 304
+
+    def test_response_prefers_brotli(self, client: FlaskClient) -> None:
+        """
+        Assert brotli is chosen over gzip when the client accepts
+        both and the brotli package is installed
+
+        Args:
+            client (FlaskClient): client returned by fixture
+        """
+        response = client.get("/certs", headers={"Accept-Encoding": "gzip, br"})
+        expected = "br" if compression.brotli else "gzip"
+        assert response.headers["Content-Encoding"] == expected
+
+    def test_small_response_not_compressed(self, client: FlaskClient) -> None:
+        """
+        Assert bodies below the size threshold are sent as they are
+
+        Args:
+            client (FlaskClient): client returned by fixture
+        """
+        response = client.get("/api/v1/cert", headers={"Accept-Encoding": "gzip"})
+        assert \
+            "Content-Encoding" not in response.headers and \
+            response.json == []
+
+    def test_streamed_response_compressed(self, app: Flask) -> None:
+        """
+        Assert a streamed body is compressed chunk by chunk and
+        sent without a Content-Length
+
+        Args:
+            app (Flask): Flask app instance
+        """
+        lines = [f'{{"line": {i}}}\n' for i in range(100)]
+
+        @app.route("/stream")
+        def stream() -> Response:
+            return Response((line for line in lines), mimetype="application/x-ndjson")
+
+        response = app.test_client().get("/stream", headers={"Accept-Encoding": "gzip"})
+        assert \
+            response.headers["Content-Encoding"] == "gzip" and \
+            "Content-Length" not in response.headers and \
+            gzip.decompress(response.data).decode() == "".join(lines)
+
+    # ===== Test CLI =====
+
+    def test_export_command_writes_file(self, app: Flask, tmp_path) -> None:
+        """
+        Assert the export command writes the NDJSON export to a
+        gzip file
+
+        Args:
+            app (Flask): Flask app instance
+            tmp_path (Path): pytest temporary directory
+        """
+        with app.app_context():
+            db.session.add(Cert(name="Test", code="tst-101", head_img="h.png",
+                                badge_img="b.png", tags="test", created="01/01/2000"))
+            db.session.commit()
+        output = tmp_path / "export.ndjson.gz"
+        result = app.test_cli_runner().invoke(args=["export", "--gzip", "-o", str(output)])
+        lines = gzip.decompress(output.read_bytes()).decode().splitlines()
+        assert \
+            result.exit_code == 0 and \
+            len(lines) == 1 and \
+            json.loads(lines[0])["data"]["code"] == "tst-101"
+
+    def test_restore_command_restores_export(self, app: Flask, tmp_path) -> None:
+        """
+        Assert a gzipped export is restored by the restore command
+        and the checkpoint file is removed once it completes
+
+        Args:
+            app (Flask): Flask app instance
+            tmp_path (Path): pytest temporary directory
+        """
+        with app.app_context():
+            db.session.add(Cert(name="Test", code="tst-101", head_img="h.png",
+                                badge_img="b.png", tags="test", created="01/01/2000"))
+            db.session.commit()
+        export = tmp_path / "export.ndjson.gz"
+        checkpoint = tmp_path / "restore.checkpoint"
+        runner = app.test_cli_runner()
+        runner.invoke(args=["export", "--gzip", "-o", str(export)])
+        with app.app_context():
+            Cert.query.delete()
+            db.session.commit()
+        result = runner.invoke(args=["restore", str(export), "--checkpoint", str(checkpoint)])
+        with app.app_context():
+            codes = [cert.code for cert in Cert.query.all()]
+        assert \
+            result.exit_code == 0 and \
+            "Restore completed successfully" in result.output and \
+            codes == ["tst-101"] and \
+            not checkpoint.exists()
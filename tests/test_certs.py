@@ -84,6 +84,64 @@ class TestCerts:
             result = Cert.find("test_tag")
         assert isinstance(result, list) and result[0].name == "Test"
 
+    def test_find_returns_all_tag_matches(self, app: Flask, client: FlaskClient) -> None:
+        """
+        Assert find() returns every cert with a matching tag rather
+        than stopping at the first one
+
+        Args:
+            app (Flask): Flask app instance
+            client (FlaskClient): Flask app test client
+        """
+        client.post("/create/cert", data=self.form_data)
+        self.form_data["name"] = "Another test"
+        self.form_data["code"] = "tst-102"
+        client.post("/create/cert", data=self.form_data)
+        with app.app_context():
+            result = Cert.find("test_tag")
+        assert sorted(c.code for c in result) == ["tst-101", "tst-102"]
+
+    def test_find_matches_prefix_and_paginates(self, app: Flask, client: FlaskClient) -> None:
+        """
+        Assert find() matches the start of a word and returns the
+        requested page of results
+
+        Args:
+            app (Flask): Flask app instance
+            client (FlaskClient): Flask app test client
+        """
+        client.post("/create/cert", data=self.form_data)
+        self.form_data["name"] = "Another test"
+        self.form_data["code"] = "tst-102"
+        client.post("/create/cert", data=self.form_data)
+        with app.app_context():
+            first = Cert.find("tst", limit=1)
+            second = Cert.find("tst", limit=1, offset=1)
+            missing = Cert.find("tst-103")
+        assert \
+            len(first) == 1 and \
+            len(second) == 1 and \
+            first[0].id != second[0].id and \
+            not missing
+
+    def test_find_uses_updated_values(self, app: Flask, client: FlaskClient) -> None:
+        """
+        Assert the search index is updated when a cert changes
+
+        Args:
+            app (Flask): Flask app instance
+            client (FlaskClient): Flask app test client
+        """
+        self.form_data["name"] = "Original"
+        client.post("/create/cert", data=self.form_data)
+        with app.app_context():
+            cert = Cert.query.filter_by(code="tst-101").first()
+            cert.name = "Renamed"
+            db.session.commit()
+            old = Cert.find("original")
+            new = Cert.find("renamed")
+        assert not old and new[0].code == "tst-101"
+
     # ===== /create/cert =====
 
     def test_create_new_creates_object(self, app: Flask, client: FlaskClient) -> None:
@@ -14,8 +14,11 @@ import requests
 
 from flask import Flask
 from flask.testing import FlaskClient
+from sqlalchemy import event
 from werkzeug.datastructures import FileStorage
 
+from src.db import db
+
 API_URL = f"http://127.0.0.1:5000/api/v{os.environ["API_VERSION"]}"
 
 PROJECT_ROOT = os.path.abspath(
@@ -766,6 +769,47 @@ class TestContent:
             data["tst101"]["name"] == "Test" and \
             data["tst101"]["code"] == "tst-101"
 
+    def test_content_update_cert_exam_reminder_patches_reminder(self, app: Flask, client: FlaskClient) -> None:
+        """
+        Assert setting a reminder updates only the reminder
+        columns, so other fields are not written back
+
+        Args:
+            app (Flask): Flask app instance
+            client (FlaskClient): Flask app test client
+        """
+        requests.post(
+            url=f"{API_URL}/cert",
+            data=json.dumps(self.cert_data),
+            headers={"Content-Type": "application/json"},
+            timeout=2
+        )
+        client.post("/update/cert/exam_date", data={
+            "cert_id": 1,
+            "exam-date": "2025-01-01",
+        })
+        updates = []
+
+        def record(_conn, _cursor, statement, *_) -> None:
+            if statement.startswith("UPDATE certs"):
+                updates.append(statement)
+
+        # the fields sent by the reminder form
+        form_data = {
+            "cert_id": 1,
+            "frequency": "weekly",
+            "starting_from": "2025-01-01",
+            "testing": True  # target the test_data.json file
+        }
+        with app.app_context():
+            event.listen(db.engine, "before_cursor_execute", record)
+            client.post("/update/cert/exam_reminder", data=form_data)
+            event.remove(db.engine, "before_cursor_execute", record)
+        columns = updates[0].split(" SET ")[1].split(" WHERE ")[0] if updates else ""
+        assert \
+            len(updates) == 1 and \
+            sorted(c.split("=")[0].strip() for c in columns.split(",")) == ["reminder"]
+
     def test_content_update_cert_exam_reminder_deletes_reminder(self, client: FlaskClient) -> None:
         """
         Assert a cert entry is removed from the data file
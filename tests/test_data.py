@@ -7,7 +7,11 @@ import os
 
 import requests
 
-from src.data.views import get_cert_resources, get_importable_resources
+from flask import Flask
+
+from src.models.cert import Cert
+from src.services import resource as resource_service
+from src.services import section as section_service
 
 API_URL = f"http://127.0.0.1:5000/api/v{os.environ["API_VERSION"]}"
 
@@ -35,7 +39,7 @@ class TestData:
         Setup class before all tests run
         """
         # dummy cert data
-        self.cert = {"id": 1}
+        self.cert = Cert(id=1)
         # section data
         self.section_data = {
             "cert_id": 1,
@@ -95,12 +99,15 @@ class TestData:
             "complete": None,
         }
 
-    # ===== get_cert_resources() =====
+    # ===== resource_service.get_cert_resources() =====
 
-    def test_get_cert_resources_returns_sections(self) -> None:
+    def test_get_cert_sections_returns_sections(self, app: Flask) -> None:
         """
-        Assert get_cert_resources() returns list of 'section'
-        type Resource objects
+        Assert section_service.get_cert_sections() returns the
+        Sections of the cert
+
+        Args:
+            app (Flask): Flask app instance
         """
         requests.post(
             url=f"{API_URL}/section",
@@ -108,15 +115,19 @@ class TestData:
             headers={"Content-Type": "application/json"},
             timeout=2,
         )
-        result = get_cert_resources(self.cert, "section")
+        with app.app_context():
+            result = section_service.get_cert_sections(self.cert.id)
         assert \
             len(result) == 1 and \
-            result[0]["title"] == "Test section"
+            result[0].title == "Test section"
 
-    def test_get_cert_resources_returns_courses(self) -> None:
+    def test_get_cert_resources_returns_courses(self, app: Flask) -> None:
         """
-        Assert get_cert_resources() returns list of 'course'
+        Assert resource_service.get_cert_resources() returns list of 'course'
         type Resource objects
+
+        Args:
+            app (Flask): Flask app instance
         """
         requests.post(
             url=f"{API_URL}/resource",
@@ -124,15 +135,19 @@ class TestData:
             headers={"Content-Type": "application/json"},
             timeout=2,
         )
-        result = get_cert_resources(self.cert, "course")
+        with app.app_context():
+            result = resource_service.get_cert_resources(self.cert.id, "course")
         assert \
             len(result) == 1 and \
-            result[0]["title"] == "Test course"
+            result[0].title == "Test course"
 
-    def test_get_cert_resources_returns_videos(self) -> None:
+    def test_get_cert_resources_returns_videos(self, app: Flask) -> None:
         """
-        Assert get_cert_resources() returns list of 'video'
+        Assert resource_service.get_cert_resources() returns list of 'video'
         type Resource objects
+
+        Args:
+            app (Flask): Flask app instance
         """
         requests.post(
             url=f"{API_URL}/resource",
@@ -140,15 +155,19 @@ class TestData:
             headers={"Content-Type": "application/json"},
             timeout=2,
         )
-        result = get_cert_resources(self.cert, "video")
+        with app.app_context():
+            result = resource_service.get_cert_resources(self.cert.id, "video")
         assert \
             len(result) == 1 and \
-            result[0]["title"] == "Test video"
+            result[0].title == "Test video"
 
-    def test_get_cert_resources_returns_articles(self) -> None:
+    def test_get_cert_resources_returns_articles(self, app: Flask) -> None:
         """
-        Assert get_cert_resources() returns list of 'article'
+        Assert resource_service.get_cert_resources() returns list of 'article'
         type Resource objects
+
+        Args:
+            app (Flask): Flask app instance
         """
         requests.post(
             url=f"{API_URL}/resource",
@@ -156,15 +175,19 @@ class TestData:
             headers={"Content-Type": "application/json"},
             timeout=2,
         )
-        result = get_cert_resources(self.cert, "article")
+        with app.app_context():
+            result = resource_service.get_cert_resources(self.cert.id, "article")
         assert \
             len(result) == 1 and \
-            result[0]["title"] == "Test article"
+            result[0].title == "Test article"
 
-    def test_get_cert_resources_returns_documents(self) -> None:
+    def test_get_cert_resources_returns_documents(self, app: Flask) -> None:
         """
-        Assert get_cert_resources() returns list of 'documentation'
+        Assert resource_service.get_cert_resources() returns list of 'documentation'
         type Resource objects
+
+        Args:
+            app (Flask): Flask app instance
         """
         requests.post(
             url=f"{API_URL}/resource",
@@ -172,24 +195,32 @@ class TestData:
             headers={"Content-Type": "application/json"},
             timeout=2,
         )
-        result = get_cert_resources(self.cert, "documentation")
+        with app.app_context():
+            result = resource_service.get_cert_resources(self.cert.id, "documentation")
         assert \
             len(result) == 1 and \
-            result[0]["title"] == "Test document"
+            result[0].title == "Test document"
 
-    # ===== get_importable_resources() =====
+    # ===== resource_service.get_import_candidates() =====
 
-    def test_get_importable_resources_returns_empty_list(self) -> None:
+    def test_get_import_candidates_returns_empty_list(self, app: Flask) -> None:
         """
         Assert that an empty list is returned if no resources exist
+
+        Args:
+            app (Flask): Flask app instance
         """
-        result = get_importable_resources(self.cert)
+        with app.app_context():
+            result = resource_service.get_import_candidates(self.cert.id)
         assert len(result) == 0 and isinstance(result, list)
 
-    def test_get_importable_resources_returns_empty_list_id(self) -> None:
+    def test_get_import_candidates_returns_empty_list_id(self, app: Flask) -> None:
         """
         Assert that an empty list is returned if only resources with a 
         matching cert id exist
+
+        Args:
+            app (Flask): Flask app instance
         """
         requests.post(
             url=f"{API_URL}/resource",
@@ -197,12 +228,16 @@ class TestData:
             headers={"Content-Type": "application/json"},
             timeout=2,
         )
-        result = get_importable_resources(self.cert)
+        with app.app_context():
+            result = resource_service.get_import_candidates(self.cert.id)
         assert len(result) == 0 and isinstance(result, list)
 
-    def test_get_importable_resources_returns_resources(self) -> None:
+    def test_get_import_candidates_returns_resources(self, app: Flask) -> None:
         """
         Assert that all resources with a non-matching cert id are returned
+
+        Args:
+            app (Flask): Flask app instance
         """
         requests.post(
             url=f"{API_URL}/resource",
@@ -218,8 +253,11 @@ class TestData:
             headers={"Content-Type": "application/json"},
             timeout=2,
         )
-        result = get_importable_resources(self.cert)
+        with app.app_context():
+            result = resource_service.get_import_candidates(self.cert.id)
+            grouped = resource_service.get_grouped_import_candidates(self.cert.id)
         assert \
             len(result) == 1 and \
             isinstance(result, list) and \
-            result[0]["title"] == "Test video"
+            result[0].title == "Test video" and \
+            [r.title for r in grouped["video"]] == ["Test video"]
@@ -0,0 +1,146 @@
+"""
+Schema migration and index usage test module
+"""
+
+from flask import Flask
+from flask_sqlalchemy.query import Query
+from sqlalchemy import inspect, text
+
+from src.db import db
+from src.migrations import upgrade
+from src.models.resource import Resource
+from src.models.section import Section
+from src.versions import get_versions, VERSIONED_TABLES
+
+
+def query_plan(query: Query) -> str:
+    """
+    Gets the SQLite query plan for <query>
+
+    Args:
+        query (Query): query to explain
+
+    Returns:
+        str: query plan details joined into a single string
+    """
+    sql = query.statement.compile(
+        dialect=db.engine.dialect,
+        compile_kwargs={"literal_binds": True}
+    )
+    rows = db.session.execute(text(f"EXPLAIN QUERY PLAN {sql}")).all()
+    return " ".join(row[-1] for row in rows)
+
+
+class TestMigrations:
+    """
+    Migration testing class
+    """
+
+    def test_upgrade_creates_missing_index(self, app: Flask) -> None:
+        """
+        Assert an index missing from an existing database is
+        created by upgrade()
+
+        Args:
+            app (Flask): Flask app instance
+        """
+        with app.app_context():
+            db.session.execute(text("DROP INDEX ix_sections_cert_id"))
+            db.session.commit()
+            upgrade()
+            indexes = inspect(db.engine).get_indexes("sections")
+        assert "ix_sections_cert_id" in [i["name"] for i in indexes]
+
+    def test_cert_resources_query_uses_index(self, app: Flask) -> None:
+        """
+        Assert resources are looked up by cert and type with an index
+
+        Args:
+            app (Flask): Flask app instance
+        """
+        with app.app_context():
+            plan = query_plan(
+                Resource.query.filter_by(cert_id=1, resource_type="video")
+            )
+        assert "USING INDEX ix_resources_cert_id_resource_type" in plan
+
+    def test_cert_sections_query_uses_index(self, app: Flask) -> None:
+        """
+        Assert sections are looked up by cert with an index
+
+        Args:
+            app (Flask): Flask app instance
+        """
+        with app.app_context():
+            plan = query_plan(Section.query.filter_by(cert_id=1))
+        assert "USING INDEX ix_sections_cert_id" in plan
+
+    def test_course_sections_query_uses_index(self, app: Flask) -> None:
+        """
+        Assert a course's sections are read in number order
+        from an index
+
+        Args:
+            app (Flask): Flask app instance
+        """
+        with app.app_context():
+            plan = query_plan(
+                Section.query.filter_by(resource_id=1).order_by(Section.number)
+            )
+        assert \
+            "USING INDEX ix_sections_resource_id_number" in plan and \
+            "TEMP B-TREE" not in plan
+
+    def test_foreign_keys_cascade_deletes(self, app: Flask) -> None:
+        """
+        Assert deleting a Cert deletes its Resources and Sections
+        in the database when foreign keys are enforced
+
+        Args:
+            app (Flask): Flask app instance
+        """
+        with app.app_context():
+            with db.engine.connect() as conn:
+                conn.exec_driver_sql("PRAGMA foreign_keys = ON")
+                conn.exec_driver_sql(
+                    "INSERT INTO certs (id, name, code, head_img, badge_img, created) "
+                    "VALUES (1, 'Test', 'tst-101', 'h.png', 'b.png', '01/01/2000')"
+                )
+                conn.exec_driver_sql(
+                    "INSERT INTO resources (id, cert_id, resource_type, url, title, image, "
+                    "description, site_logo, site_name) "
+                    "VALUES (1, 1, 'course', 'u', 't', 'i', 'd', 'l', 's')"
+                )
+                conn.exec_driver_sql(
+                    "INSERT INTO sections (cert_id, resource_id, number, title) "
+                    "VALUES (1, 1, 1, 'Test section')"
+                )
+                conn.exec_driver_sql("DELETE FROM certs WHERE id = 1")
+                conn.commit()
+                conn.exec_driver_sql("PRAGMA foreign_keys = OFF")
+            assert \
+                not Resource.query.all() and \
+                not Section.query.all()
+
+    def test_version_bumped_by_bulk_statements(self, app: Flask) -> None:
+        """
+        Assert statements issued outside the ORM bump the version
+        of the table they change and only that table
+
+        Args:
+            app (Flask): Flask app instance
+        """
+        with app.app_context():
+            before = get_versions(VERSIONED_TABLES)
+            db.session.execute(text(
+                "INSERT INTO resources (cert_id, resource_type, url, title, image, "
+                "description, site_logo, site_name) "
+                "VALUES (1, 'course', 'u', 't', 'i', 'd', 'l', 's')"
+            ))
+            db.session.execute(text("UPDATE resources SET title = 'changed'"))
+            db.session.commit()
+            after = get_versions(VERSIONED_TABLES)
+        assert \
+            after["resources"][0] == before["resources"][0] + 2 and \
+            after["certs"] == before["certs"] and \
+            after["sections"] == before["sections"]
@@ -2,6 +2,8 @@
 App routes test module
 """
 
+# pylint: disable=too-many-public-methods
+
 import json
 import os
 
@@ -163,6 +165,76 @@ class TestRoutes:
         response = client.post("/results?search=test")
         assert response.status_code == 200
 
+    def test_certs_results_returns_results_page_with_get_params(self, client: FlaskClient) -> None:
+        """
+        Asserts the results page is returned by certs.results when
+        following a pagination link
+
+        Args:
+            client (FlaskClient): client returned by fixture
+        """
+        response = client.get("/results?search=test&page=2")
+        assert b"Results" in response.data
+
+    # ===== /library =====
+
+    def test_certs_search_redirects_to_library(self, client: FlaskClient) -> None:
+        """
+        Asserts certs.search redirects to certs.library when the
+        library scope is selected
+
+        Args:
+            client (FlaskClient): client returned by fixture
+        """
+        response = client.post("/search", data={"search": "test", "scope": "library"})
+        assert response.location.startswith("/library?search=test")
+
+    def test_certs_library_returns_library_page(self, client: FlaskClient) -> None:
+        """
+        Asserts the library results page is returned by certs.library
+
+        Args:
+            client (FlaskClient): client returned by fixture
+        """
+        response = client.get("/library?search=test")
+        assert b"Library results" in response.data
+
+    def test_certs_library_labels_resource_types(self, client: FlaskClient) -> None:
+        """
+        Asserts library headings use the label of each resource
+        type rather than the type with an 's' appended
+
+        Args:
+            client (FlaskClient): client returned by fixture
+        """
+        requests.post(
+            url=f"{API_URL}/cert",
+            data=json.dumps(self.cert_data),
+            headers={"Content-Type": "application/json"},
+            timeout=2
+        )
+        requests.post(
+            url=f"{API_URL}/resource",
+            data=json.dumps({
+                "cert_id": 1,
+                "resource_type": "documentation",
+                "url": "http://docs.test",
+                "title": "Library docs",
+                "image": "test/test.png",
+                "description": "Test documentation",
+                "site_logo": "test.svg",
+                "site_name": "Test",
+                "has_og_data": False,
+                "complete": False,
+            }),
+            headers={"Content-Type": "application/json"},
+            timeout=2
+        )
+        response = client.get("/library?search=library")
+        assert \
+            b">Documentation</h2>" in response.data and \
+            b"documentations" not in response.data.lower()
+
     # ===== /create/cert =====
 
     def test_content_create_returns_search_page(self, client: FlaskClient) -> None:
@@ -254,3 +326,34 @@ class TestRoutes:
         assert \
             response.status_code == 404 and \
             b"not found" in response.data
+
+    def test_certs_certs_returns_304_when_unchanged(self, client: FlaskClient) -> None:
+        """
+        Assert the certs page is not rendered again for a client
+        holding the current weak ETag
+
+        Args:
+            client (FlaskClient): client returned by fixture
+        """
+        first = client.get("/certs")
+        cached = client.get("/certs", headers={"If-None-Match": first.headers["ETag"]})
+        assert \
+            first.headers["ETag"].startswith("W/") and \
+            cached.status_code == 304 and \
+            not cached.data
+
+    def test_certs_certs_renders_flashed_messages(self, client: FlaskClient) -> None:
+        """
+        Assert the certs page is rendered when there are flashed
+        messages even if the client holds the current ETag
+
+        Args:
+            client (FlaskClient): client returned by fixture
+        """
+        etag = client.get("/certs").headers["ETag"]
+        with client.session_transaction() as session:
+            session["_flashes"] = [("message", "Flashed message")]
+        response = client.get("/certs", headers={"If-None-Match": etag})
+        assert \
+            response.status_code == 200 and \
+            b"Flashed message" in response.data
@@ -4,6 +4,7 @@ Section operations test module
 
 # pylint: disable=duplicate-code
 
+import io
 import json
 import os
 
@@ -166,6 +167,72 @@ class TestSection:
             flashes = session.get("_flashes")
         assert ("error", "Incorrect section fields found") in flashes
 
+    def test_create_section_import_csv_file(self, client: FlaskClient) -> None:
+        """
+        Asserts that sections are created from an uploaded CSV file
+
+        Args:
+            client (FlaskClient): Flask app test client
+        """
+        csv_file = io.BytesIO(b"number,title\n1,First\n2,\"Second, with comma\"\n")
+        self.section_import["file"] = (csv_file, "sections.csv")
+        client.post(
+            "/create/section",
+            data=self.section_import,
+            content_type="multipart/form-data"
+        )
+        with client.session_transaction() as session:
+            flashes = session.get("_flashes")
+        response = requests.get(f"{API_URL}/section", timeout=2)
+        assert \
+            ("message", "CSV imported successfully") in flashes and \
+            [s["title"] for s in response.json()] == ["First", "Second, with comma"]
+
+    def test_create_section_import_flashes_error_lines(self, client: FlaskClient) -> None:
+        """
+        Asserts that NDJSON import errors are flashed with their line
+
+        Args:
+            client (FlaskClient): Flask app test client
+        """
+        self.section_import["text_area"] = \
+            '{"number": 1, "title": "One"}\n{"number": 2}\n'
+        client.post("/create/section", data=self.section_import)
+        with client.session_transaction() as session:
+            flashes = session.get("_flashes")
+        assert ("error", "Line 2: Invalid number of section fields found") in flashes
+
+    # ===== /update/sections =====
+
+    def test_update_sections_applies_batch(self, client: FlaskClient) -> None:
+        """
+        Asserts a batch of progress changes is applied
+
+        Args:
+            client (FlaskClient): Flask app test client
+        """
+        client.post("/create/section", data=self.section_data)
+        response = client.post(
+            "/update/sections",
+            json={"sections": [{"section_id": 1, "complete": True, "cards_made": True}]}
+        )
+        section = requests.get(f"{API_URL}/section/1", timeout=2).json()
+        assert \
+            response.json["updated"] == 1 and \
+            section["complete"] and section["cards_made"]
+
+    def test_update_sections_returns_400(self, client: FlaskClient) -> None:
+        """
+        Asserts a 400 status is returned for an invalid batch
+
+        Args:
+            client (FlaskClient): Flask app test client
+        """
+        response = client.post("/update/sections", json={"sections": [{"section_id": 1}]})
+        assert \
+            response.status_code == 400 and \
+            response.json["errors"][0]["message"] == "No progress fields found"
+
     # ===== /update/section =====
 
     def test_content_update_section_updates_section(self, client: FlaskClient) -> None:
@@ -0,0 +1,810 @@
+"""
+Service layer test module
+"""
+
+# pylint: disable=duplicate-code, too-many-public-methods
+
+import io
+import json
+
+from flask import Flask
+from sqlalchemy import event, select
+
+from src.db import db
+from src.models.cert import Cert
+
+from src.services import cert as cert_service
+from src.services import export as export_service
+from src.services import resource as resource_service
+from src.services import restore as restore_service
+from src.services import search as search_service
+from src.services import section as section_service
+from src.util import section_import
+
+
+class TestServices:
+    """
+    Service layer testing class
+    """
+
+    @classmethod
+    def setup_class(cls) -> None:
+        """
+        Setup class before all tests run
+        """
+        cls.cert_data = None
+        cls.resource_data = None
+        cls.section_data = None
+
+    def setup_method(self) -> None:
+        """
+        Setup methods before each test runs
+        """
+        self.cert_data = {
+            "name": "Test",
+            "code": "tst-101",
+            "head_img": "test/test.jpg",
+            "badge_img": "test/BADGE_test.png",
+            "tags": "test",
+        }
+        self.resource_data = {
+            "cert_id": 1,
+            "resource_type": "course",
+            "url": "http://test.test",
+            "title": "Test course",
+            "image": "test/test.png",
+            "description": "This is a test course",
+            "site_logo": "test.svg",
+            "site_name": "Test",
+            "complete": False,
+            "has_og_data": False,
+        }
+        self.section_data = {
+            "cert_id": 1,
+            "resource_id": 1,
+            "number": 1,
+            "title": "Test section",
+        }
+
+    def test_create_cert_saves_cert(self, app: Flask) -> None:
+        """
+        Assert a Cert is created in-process and can be read back
+
+        Args:
+            app (Flask): Flask app instance
+        """
+        with app.app_context():
+            result = cert_service.create_cert(self.cert_data)
+            cert = cert_service.get_cert(1)
+            assert \
+                result["status"] == 200 and \
+                cert.name == "Test"
+
+    def test_update_section_returns_404(self, app: Flask) -> None:
+        """
+        Assert a 404 status is returned if the Section doesn't exist
+
+        Args:
+            app (Flask): Flask app instance
+        """
+        with app.app_context():
+            result = section_service.update_section(1, self.section_data)
+        assert \
+            result["message"] == "Section not found" and \
+            result["status"] == 404
+
+    def test_delete_cert_removes_resources_and_sections(self, app: Flask) -> None:
+        """
+        Assert deleting a Cert also deletes its resources and sections
+
+        Args:
+            app (Flask): Flask app instance
+        """
+        with app.app_context():
+            cert_service.create_cert(self.cert_data)
+            resource_service.create_resource(self.resource_data)
+            section_service.create_section(self.section_data)
+            result = cert_service.delete_cert(1)
+            assert \
+                result["message"] == "Cert deleted successfully" and \
+                not resource_service.get_all_resources() and \
+                not section_service.get_all_sections()
+
+    def test_delete_course_removes_sections(self, app: Flask) -> None:
+        """
+        Assert deleting a course Resource also deletes its sections
+
+        Args:
+            app (Flask): Flask app instance
+        """
+        with app.app_context():
+            resource_service.create_resource(self.resource_data)
+            section_service.create_section(self.section_data)
+            result = resource_service.delete_resource(1)
+            assert \
+                result["message"] == "Resource deleted successfully" and \
+                not section_service.get_all_sections()
+
+    def test_cert_bundle_uses_fixed_number_of_queries(self, app: Flask) -> None:
+        """
+        Assert the Cert bundle query count does not grow with
+        the number of resources and sections
+
+        Args:
+            app (Flask): Flask app instance
+        """
+        statements = []
+
+        def count(*_) -> None:
+            statements.append(1)
+
+        with app.app_context():
+            cert_service.create_cert(self.cert_data)
+            counts = []
+            for i in range(2):
+                self.resource_data["title"] = f"Test course {i}"
+                self.resource_data["url"] = f"http://test.test/{i}"
+                resource_service.create_resource(self.resource_data)
+                section_service.create_section(self.section_data)
+                db.session.expire_all()
+                statements.clear()
+                event.listen(db.engine, "before_cursor_execute", count)
+                bundle = cert_service.get_cert_bundle(1)
+                event.remove(db.engine, "before_cursor_execute", count)
+                counts.append(len(statements))
+            assert \
+                len(bundle["resources"]["course"]) == 2 and \
+                len(bundle["sections"][1]) == 2 and \
+                counts[0] == counts[1] <= 4
+
+    def test_course_sections_grouped_and_ordered(self, app: Flask) -> None:
+        """
+        Assert Sections are scoped to the Cert, grouped by course
+        and ordered by section number
+
+        Args:
+            app (Flask): Flask app instance
+        """
+        sections = [
+            {**self.section_data, "number": 2, "title": "Second"},
+            {**self.section_data, "number": 1, "title": "First"},
+            {**self.section_data, "resource_id": 2, "title": "Other course"},
+            {**self.section_data, "cert_id": 2, "title": "Other cert"},
+        ]
+        with app.app_context():
+            for section in sections:
+                section_service.create_section(section)
+            grouped = section_service.get_course_sections(1)
+            titles = {k: [s.title for s in v] for k, v in grouped.items()}
+        assert titles == {1: ["First", "Second"], 2: ["Other course"]}
+
+    def test_create_cert_reports_unique_conflict(self, app: Flask) -> None:
+        """
+        Assert a duplicate Cert code is rejected by the database
+        and reported against the "Code" field
+
+        Args:
+            app (Flask): Flask app instance
+        """
+        with app.app_context():
+            cert_service.create_cert(self.cert_data)
+            self.cert_data["name"] = "Another test"
+            result = cert_service.create_cert(self.cert_data)
+            certs = cert_service.get_all_certs()
+        assert \
+            result["message"] == "Code must be unique" and \
+            result["status"] == 409 and \
+            len(certs) == 1
+
+    def test_update_resource_reports_unique_conflict(self, app: Flask) -> None:
+        """
+        Assert updating a Resource to another Resource's URL on the
+        same Cert is reported against the "URL" field
+
+        Args:
+            app (Flask): Flask app instance
+        """
+        with app.app_context():
+            resource_service.create_resource(self.resource_data)
+            other = {**self.resource_data, "title": "Other", "url": "http://other"}
+            resource_service.create_resource(other)
+            other["url"] = self.resource_data["url"]
+            result = resource_service.update_resource(2, other)
+            resource = resource_service.get_resource(2)
+            assert \
+                result["field"] == "URL" and \
+                result["status"] == 409 and \
+                resource.url == "http://other"
+
+    def test_search_index_follows_updates_and_deletes(self, app: Flask) -> None:
+        """
+        Assert the search index is kept current when a Resource
+        is updated and when its course Sections are deleted
+
+        Args:
+            app (Flask): Flask app instance
+        """
+        with app.app_context():
+            resource_service.create_resource(self.resource_data)
+            section_service.create_section(self.section_data)
+            resource_service.update_resource(1, {**self.resource_data, "title": "Renamed"})
+            renamed = search_service.search_library("renamed")
+            resource_service.delete_resource(1)
+            deleted = search_service.search_library("section")
+            assert \
+                [r.id for r in renamed["resources"]] == [1] and \
+                not deleted["resources"] and \
+                not deleted["sections"]
+
+    def test_group_hits_by_type_and_cert(self, app: Flask) -> None:
+        """
+        Assert search hits are grouped by type and then by Cert
+
+        Args:
+            app (Flask): Flask app instance
+        """
+        with app.app_context():
+            cert_service.create_cert(self.cert_data)
+            resource_service.create_resource(self.resource_data)
+            resource_service.create_resource({
+                **self.resource_data,
+                "cert_id": 2,
+                "resource_type": "video",
+                "title": "Test video",
+            })
+            section_service.create_section(self.section_data)
+            grouped = search_service.group_hits(search_service.search_library("test"))
+            assert \
+                list(grouped["groups"]) == ["course", "video", "section"] and \
+                list(grouped["groups"]["video"]) == [2] and \
+                grouped["groups"]["section"][1][0].title == "Test section" and \
+                list(grouped["certs"]) == [1] and \
+                grouped["courses"][1].title == "Test course"
+
+    def test_delete_cert_uses_fixed_number_of_statements(self, app: Flask) -> None:
+        """
+        Assert deleting a Cert issues the same statements however
+        many Sections it has
+
+        Args:
+            app (Flask): Flask app instance
+        """
+        statements = []
+
+        def count(*_) -> None:
+            statements.append(1)
+
+        with app.app_context():
+            counts = []
+            for sections in (1, 50):
+                cert_service.create_cert(self.cert_data)
+                resource_service.create_resource(self.resource_data)
+                for number in range(sections):
+                    section_service.create_section({**self.section_data, "number": number})
+                cert_id = cert_service.get_all_certs()[0].id
+                statements.clear()
+                event.listen(db.engine, "before_cursor_execute", count)
+                cert_service.delete_cert(cert_id)
+                event.remove(db.engine, "before_cursor_execute", count)
+                counts.append(len(statements))
+            assert \
+                counts[0] == counts[1] and \
+                not section_service.get_all_sections()
+
+    def test_import_candidates_skip_own_titles_and_duplicates(self, app: Flask) -> None:
+        """
+        Assert import candidates exclude titles already on the
+        Cert and all but the first Resource with a title
+
+        Args:
+            app (Flask): Flask app instance
+        """
+        resources = [
+            {"cert_id": 2, "resource_type": "video", "title": "Shared"},
+            {"cert_id": 3, "resource_type": "video", "title": "Shared"},
+            {"cert_id": 2, "resource_type": "article", "title": "Owned"},
+            {"cert_id": 1, "resource_type": "article", "title": "Owned"},
+            {"cert_id": 2, "resource_type": "course", "title": "Course"},
+            {"cert_id": 3, "resource_type": "documentation", "title": "Docs"},
+        ]
+        with app.app_context():
+            for i, resource in enumerate(resources):
+                resource_service.create_resource({
+                    **self.resource_data, **resource, "url": f"http://test.test/{i}"
+                })
+            grouped = resource_service.get_grouped_import_candidates(1)
+            result = {k: [(r.cert_id, r.title) for r in v] for k, v in grouped.items()}
+        assert result == {
+            "course": [(2, "Course")],
+            "video": [(2, "Shared")],
+            "article": [],
+            "documentation": [(3, "Docs")],
+        }
+
+    def test_import_resources_copies_and_reports_conflicts(self, app: Flask) -> None:
+        """
+        Assert selected Resources are copied into the Cert while
+        missing IDs and unique conflicts are skipped and reported
+
+        Args:
+            app (Flask): Flask app instance
+        """
+        resources = [
+            {"cert_id": 2, "resource_type": "video", "title": "New"},
+            {"cert_id": 2, "resource_type": "video", "title": "Taken"},
+            {"cert_id": 1, "resource_type": "video", "title": "Taken"},
+        ]
+        with app.app_context():
+            for i, resource in enumerate(resources):
+                resource_service.create_resource({
+                    **self.resource_data, **resource, "url": f"http://test.test/{i}"
+                })
+            result = resource_service.import_resources(1, [1, 2, 99])
+            titles = [r.title for r in resource_service.get_cert_resources(1)]
+        assert \
+            result["imported"] == 1 and \
+            {(s["id"], s["message"]) for s in result["skipped"]} == {
+                (2, "Title must be unique"),
+                (99, "Resource not found"),
+            } and \
+            titles == ["Taken", "New"]
+
+    def test_import_resources_uses_fixed_number_of_statements(self, app: Flask) -> None:
+        """
+        Assert importing Resources issues the same statements
+        however many are selected
+
+        Args:
+            app (Flask): Flask app instance
+        """
+        statements = []
+
+        def count(*_) -> None:
+            statements.append(1)
+
+        with app.app_context():
+            for i in range(20):
+                resource_service.create_resource({
+                    **self.resource_data, "cert_id": 2,
+                    "title": f"Test {i}", "url": f"http://test.test/{i}"
+                })
+            counts = []
+            for cert_id, resource_ids in ((3, [1]), (4, list(range(1, 21)))):
+                statements.clear()
+                event.listen(db.engine, "before_cursor_execute", count)
+                result = resource_service.import_resources(cert_id, resource_ids)
+                event.remove(db.engine, "before_cursor_execute", count)
+                counts.append(len(statements))
+            assert \
+                result["imported"] == 20 and \
+                counts[0] == counts[1]
+
+    def test_import_course_copies_sections(self, app: Flask) -> None:
+        """
+        Assert importing a course copies its Sections onto the new
+        course and Cert with the same statements however many
+        Sections it has
+
+        Args:
+            app (Flask): Flask app instance
+        """
+        statements = []
+
+        def count(*_) -> None:
+            statements.append(1)
+
+        with app.app_context():
+            for course, sections in ((1, 1), (2, 30)):
+                resource_service.create_resource({
+                    **self.resource_data,
+                    "title": f"Course {course}",
+                    "url": f"http://test.test/{course}",
+                })
+                for number in range(1, sections + 1):
+                    section_service.create_section({
+                        **self.section_data, "resource_id": course, "number": number
+                    })
+            counts = []
+            for course in (1, 2):
+                statements.clear()
+                event.listen(db.engine, "before_cursor_execute", count)
+                resource_service.import_resources(2, [course])
+                event.remove(db.engine, "before_cursor_execute", count)
+                counts.append(len(statements))
+            copies = {r.title: r.id for r in resource_service.get_cert_resources(2)}
+            copied = section_service.get_course_sections(2)
+            assert \
+                counts[0] == counts[1] and \
+                len(copied[copies["Course 1"]]) == 1 and \
+                [s.number for s in copied[copies["Course 2"]]] == list(range(1, 31)) and \
+                len(section_service.get_cert_sections(1)) == 31
+
+    def test_create_sections_inserts_in_one_statement(self, app: Flask) -> None:
+        """
+        Assert a list of Sections is inserted with one statement
+        and one commit
+
+        Args:
+            app (Flask): Flask app instance
+        """
+        statements = []
+
+        def count(*_) -> None:
+            statements.append(1)
+
+        sections = [{"number": n, "title": f"Lecture {n}"} for n in range(1, 401)]
+        with app.app_context():
+            event.listen(db.engine, "before_cursor_execute", count)
+            result = section_service.create_sections(1, 1, sections)
+            event.remove(db.engine, "before_cursor_execute", count)
+            assert \
+                result["created"] == 400 and \
+                len(section_service.get_cert_sections(1)) == 400 and \
+                len(statements) <= 2
+
+    def test_create_sections_reports_row_errors(self, app: Flask) -> None:
+        """
+        Assert invalid rows are reported by row number and no
+        Sections are created
+
+        Args:
+            app (Flask): Flask app instance
+        """
+        sections = [
+            {"number": 1, "title": "Valid"},
+            {"number": "2", "title": "Bad number"},
+            {"number": 3},
+            {"number": 4, "title": ""},
+        ]
+        with app.app_context():
+            result = section_service.create_sections(1, 1, sections)
+            assert \
+                result["status"] == 400 and \
+                [e["row"] for e in result["errors"]] == [2, 3, 4] and \
+                not section_service.get_all_sections()
+
+    def test_import_sections_streams_json_in_batches(self, app: Flask, monkeypatch) -> None:
+        """
+        Assert a JSON array read in chunks smaller than a row is
+        inserted in fixed-size batches
+
+        Args:
+            app (Flask): Flask app instance
+            monkeypatch (MonkeyPatch): pytest monkeypatch fixture
+        """
+        monkeypatch.setattr(section_import, "CHUNK_SIZE", 7)
+        monkeypatch.setattr(section_service, "IMPORT_BATCH_SIZE", 40)
+        sections = [{"number": n, "title": f"Lecture {n}"} for n in range(1, 101)]
+        stream = io.StringIO(json.dumps({"sections": sections}, indent=2))
+        statements = []
+
+        def count(*_) -> None:
+            statements.append(1)
+
+        with app.app_context():
+            event.listen(db.engine, "before_cursor_execute", count)
+            result = section_service.import_sections(1, 1, stream)
+            event.remove(db.engine, "before_cursor_execute", count)
+            numbers = [s.number for s in section_service.get_cert_sections(1)]
+        assert \
+            result["format"] == "JSON" and \
+            result["created"] == 100 and \
+            numbers == list(range(1, 101)) and \
+            len(statements) <= 4
+
+    def test_import_sections_finds_sections_key_anywhere(self, app: Flask) -> None:
+        """
+        Assert a wrapped import is read whether or not "sections"
+        is its first key, on one line or pretty-printed
+
+        Args:
+            app (Flask): Flask app instance
+        """
+        sections = [{"number": n, "title": f"Lecture {n}"} for n in range(1, 4)]
+        document = {"course": {"title": "Course", "tags": ["a", "b"]}, "sections": sections}
+        with app.app_context():
+            results = [
+                section_service.import_sections(1, 1, io.StringIO(text))
+                for text in (json.dumps(document), json.dumps(document, indent=2))
+            ]
+            missing = section_service.import_sections(1, 1, io.StringIO('{\n"course": {}\n}'))
+        assert \
+            [(r["format"], r.get("created")) for r in results] == [("JSON", 3), ("JSON", 3)] and \
+            missing["errors"] == [{"line": 3, "message": "List of 'sections' not found"}]
+
+    def test_import_sections_reports_errors_by_line(self, app: Flask) -> None:
+        """
+        Assert invalid rows are reported with their line number
+        and nothing is imported
+
+        Args:
+            app (Flask): Flask app instance
+        """
+        imports = {
+            "JSON": '[\n  {"number": 1, "title": "One"},\n  {"number": "x", "title": "Two"}\n]',
+            "NDJSON": '{"number": 1, "title": "One"}\n\n{"number": 3, "title": "3"\n',
+            "CSV": "number,title\n1,One\n2\n",
+        }
+        with app.app_context():
+            results = {
+                name: section_service.import_sections(1, 1, io.StringIO(text))
+                for name, text in imports.items()
+            }
+            sections = section_service.get_all_sections()
+        assert \
+            {n: r["format"] for n, r in results.items()} == {n: n for n in imports} and \
+            results["JSON"]["errors"] == [
+                {"line": 3, "message": "Section number must be an integer"}
+            ] and \
+            results["NDJSON"]["errors"] == [
+                {"line": 3, "message": "JSON improperly formatted"}
+            ] and \
+            results["CSV"]["errors"] == [
+                {"line": 3, "message": "Invalid number of section fields found"}
+            ] and \
+            not sections
+
+    def test_update_progress_uses_one_statement(self, app: Flask) -> None:
+        """
+        Assert progress deltas are merged per Section and applied
+        with a single UPDATE that leaves omitted flags unchanged
+
+        Args:
+            app (Flask): Flask app instance
+        """
+        statements = []
+
+        def count(*_) -> None:
+            statements.append(1)
+
+        deltas = [
+            {"section_id": 1, "complete": True},
+            {"section_id": 2, "cards_made": True},
+            {"section_id": 1, "cards_made": True},
+            {"section_id": 2, "cards_made": False, "complete": True},
+        ]
+        with app.app_context():
+            section_service.create_sections(1, 1, [
+                {"number": n, "title": f"Lecture {n}"} for n in range(1, 4)
+            ])
+            event.listen(db.engine, "before_cursor_execute", count)
+            result = section_service.update_progress(deltas)
+            event.remove(db.engine, "before_cursor_execute", count)
+            progress = [
+                (s.complete, s.cards_made) for s in section_service.get_cert_sections(1)
+            ]
+        assert \
+            result["updated"] == 2 and \
+            len(statements) == 1 and \
+            progress == [(True, True), (True, False), (None, None)]
+
+    def test_update_progress_reports_invalid_deltas(self, app: Flask) -> None:
+        """
+        Assert invalid deltas are reported by index and nothing
+        is updated
+
+        Args:
+            app (Flask): Flask app instance
+        """
+        with app.app_context():
+            result = section_service.update_progress([
+                {"section_id": 1, "complete": True},
+                {"section_id": "1", "complete": True},
+                {"section_id": 1},
+                {"section_id": 1, "complete": "yes"},
+            ])
+        assert [(e["index"], e["message"]) for e in result["errors"]] == [
+            (1, "Section ID must be an integer"),
+            (2, "No progress fields found"),
+            (3, "Progress fields must be true or false"),
+        ]
+
+    def test_patch_resource_uses_one_statement(self, app: Flask) -> None:
+        """
+        Assert a partial update is a single UPDATE with no SELECT
+
+        Args:
+            app (Flask): Flask app instance
+        """
+        statements = []
+
+        def record(_conn, _cursor, statement, *_) -> None:
+            statements.append(statement.split()[0])
+
+        with app.app_context():
+            resource_service.create_resource(self.resource_data)
+            event.listen(db.engine, "before_cursor_execute", record)
+            result = resource_service.patch_resource(1, {"complete": True})
+            event.remove(db.engine, "before_cursor_execute", record)
+            resource = resource_service.get_resource(1)
+            assert \
+                result["status"] == 200 and \
+                statements == ["UPDATE"] and \
+                resource.complete and \
+                resource.title == "Test course"
+
+    def test_patch_resource_reports_unique_conflict(self, app: Flask) -> None:
+        """
+        Assert a partial update clashing with another Resource's
+        title on the same Cert is reported against "Title"
+
+        Args:
+            app (Flask): Flask app instance
+        """
+        with app.app_context():
+            resource_service.create_resource(self.resource_data)
+            resource_service.create_resource(
+                {**self.resource_data, "title": "Other", "url": "http://other"}
+            )
+            result = resource_service.patch_resource(2, {"title": "Test course"})
+        assert \
+            result["message"] == "Title must be unique" and \
+            result["status"] == 409
+
+    def test_list_reads_bypass_identity_map(self, app: Flask) -> None:
+        """
+        Assert list reads return read-only rows with attribute
+        access without adding objects to the session
+
+        Args:
+            app (Flask): Flask app instance
+        """
+        with app.app_context():
+            cert_service.create_cert(self.cert_data)
+            resource_service.create_resource(self.resource_data)
+            section_service.create_section(self.section_data)
+            db.session.remove()
+            bundle = cert_service.get_cert_bundle(1)
+            sections = section_service.get_all_sections(fields=["title"])
+            tracked = len(db.session.identity_map)
+        assert \
+            tracked == 0 and \
+            bundle["cert"].name == "Test" and \
+            bundle["resources"]["course"][0].title == "Test course" and \
+            sections[0]._asdict() == {"id": 1, "title": "Test section"}
+
+    def test_export_reads_one_transaction(self, app: Flask) -> None:
+        """
+        Assert every table is exported from a single transaction
+        on one connection, so the export is one snapshot
+
+        Args:
+            app (Flask): Flask app instance
+        """
+        transactions = []
+
+        def begin(connection) -> None:
+            transactions.append(connection)
+
+        with app.app_context():
+            cert_service.create_cert(self.cert_data)
+            resource_service.create_resource(self.resource_data)
+            section_service.create_section(self.section_data)
+            event.listen(db.engine, "begin", begin)
+            lines = list(export_service.export_lines())
+            event.remove(db.engine, "begin", begin)
+        assert \
+            [json.loads(line)["table"] for line in lines] == \
+            ["certs", "resources", "sections"] and \
+            len(transactions) == 1
+
+    # ===== Test Restore =====
+
+    @staticmethod
+    def export_text(sections: int) -> list:
+        """
+        Builds the NDJSON lines of an export of one cert, one
+        course and its sections, with IDs the test database
+        would not give them
+
+        Args:
+            sections (int): number of sections
+
+        Returns:
+            list: NDJSON lines
+        """
+        records = [
+            {"table": "certs", "data": {
+                "id": 7, "name": "Restored", "code": "rst-101", "head_img": "h.png",
+                "badge_img": "b.png", "tags": "test", "created": "01/01/2000",
+            }},
+            {"table": "resources", "data": {
+                "id": 9, "cert_id": 7, "resource_type": "course", "url": "https://course",
+                "title": "Course", "image": "i.png", "description": "d", "site_logo": "l.png",
+                "site_name": "s", "created": "01/01/2000",
+            }},
+        ]
+        records += [
+            {"table": "sections", "data": {
+                "id": 20 + n, "cert_id": 7, "resource_id": 9, "number": n,
+                "title": f"Lecture {n}", "complete": False,
+            }}
+            for n in range(1, sections + 1)
+        ]
+        return [json.dumps(record) + "\n" for record in records]
+
+    def test_restore_remaps_ids_in_batches(self, app: Flask) -> None:
+        """
+        Assert a restore gives rows new IDs, remaps the IDs they
+        reference and reports progress after each batch
+
+        Args:
+            app (Flask): Flask app instance
+        """
+        lines = self.export_text(12)
+        reports = []
+        with app.app_context():
+            cert_service.create_cert(self.cert_data)
+            result = restore_service.restore(
+                io.StringIO("".join(lines)),
+                progress=lambda done, counts: reports.append(done),
+                batch_size=5
+            )
+            cert_id = db.session.scalar(select(Cert.id).where(Cert.code == "rst-101"))
+            resource = resource_service.get_resource_record(1)
+            sections = section_service.get_course_sections(cert_id)[resource.id]
+        assert \
+            result["status"] == 200 and \
+            result["restored"] == {"certs": 1, "resources": 1, "sections": 12} and \
+            reports == [1, 2, 7, 12, 14] and \
+            cert_id == 2 and resource.cert_id == 2 and \
+            [s.number for s in sections] == list(range(1, 13))
+
+    def test_restore_resumes_without_duplicates(self, app: Flask) -> None:
+        """
+        Assert resuming an interrupted restore matches the parents
+        written before and only adds the remaining sections
+
+        Args:
+            app (Flask): Flask app instance
+        """
+        lines = self.export_text(10)
+        with app.app_context():
+            first = restore_service.restore(io.StringIO("".join(lines[:6])))
+            result = restore_service.restore(io.StringIO("".join(lines)), start=first["done"])
+            sections = section_service.get_course_sections(1)[1]
+        assert \
+            first["done"] == 6 and \
+            result["existing"] == {"certs": 1, "resources": 1, "sections": 0} and \
+            result["restored"] == {"certs": 0, "resources": 0, "sections": 6} and \
+            [s.number for s in sections] == list(range(1, 11))
+
+    def test_restore_twice_adds_nothing(self, app: Flask) -> None:
+        """
+        Assert restoring an export into the database that already
+        holds it matches every row instead of duplicating sections
+
+        Args:
+            app (Flask): Flask app instance
+        """
+        text = "".join(self.export_text(3))
+        with app.app_context():
+            restore_service.restore(io.StringIO(text))
+            result = restore_service.restore(io.StringIO(text))
+            sections = section_service.get_all_sections()
+        assert \
+            result["restored"] == {"certs": 0, "resources": 0, "sections": 0} and \
+            result["existing"] == {"certs": 1, "resources": 1, "sections": 3} and \
+            len(sections) == 3
+
+    def test_restore_reports_errors_by_line(self, app: Flask) -> None:
+        """
+        Assert invalid records are skipped and reported with their
+        line number while valid ones are restored
+
+        Args:
+            app (Flask): Flask app instance
+        """
+        lines = self.export_text(2)
+        lines[3] = lines[3].replace('"resource_id": 9', '"resource_id": 4')
+        lines.insert(1, '{"table": "users", "data": {"id": 1}}\n')
+        lines.append('{"table": "sections"\n')
+        with app.app_context():
+            result = restore_service.restore(io.StringIO("".join(lines)))
+        assert \
+            result["restored"] == {"certs": 1, "resources": 1, "sections": 1} and \
+            result["errors"] == [
+                {"line": 2, "message": "Record must have a 'table' of certs, resources, sections"},
+                {"line": 5, "message": "Resource 4 not restored"},
+                {"line": 6, "message": "JSON improperly formatted"},
+            ]